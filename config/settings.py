@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 from environs import Env
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "main.middleware.RequestMetricsMiddleware",
     "main.middleware.TimezoneMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -58,7 +60,7 @@ ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "main.metrics.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -67,6 +69,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "main.context_processors.timezones",
             ],
         },
     },
@@ -89,6 +92,96 @@ DATABASES = {
     )
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Shared between worker processes so the schedule snapshot is only built once per update.
+CACHES = {
+    "default": env.dj_cache_url("CACHE_URL", default="file:///tmp/django_cache"),
+}
+
+# Sessions are read from the cache, the database is only hit when one drops out of it.
+SESSION_ENGINE = env.str(
+    "SESSION_ENGINE", default="django.contrib.sessions.backends.cached_db"
+)
+
+# Seconds to keep a schedule snapshot. Snapshots are keyed on the schedule version,
+# so this only limits how long outdated versions stick around.
+SCHEDULE_CACHE_TIMEOUT = env.int("SCHEDULE_CACHE_TIMEOUT", default=60 * 60 * 24)
+
+# Most rendered schedule day tables kept in each process, one per version, day and timezone.
+SCHEDULE_FRAGMENT_CACHE_SIZE = env.int("SCHEDULE_FRAGMENT_CACHE_SIZE", default=200)
+
+# Admin lists of tables with more rows than this show Postgres' estimate of the row count
+# instead of counting them, unless they're filtered.
+ADMIN_ESTIMATED_COUNT_MIN = env.int("ADMIN_ESTIMATED_COUNT_MIN", default=10000)
+
+# Events on each page of search results, and the most matches of a search that are
+# ranked and paged through.
+SEARCH_PAGE_SIZE = env.int("SEARCH_PAGE_SIZE", default=20)
+SEARCH_MAX_MATCHES = env.int("SEARCH_MAX_MATCHES", default=1000)
+
+# Most events whose selection can be set in one batch request.
+SELECTION_BATCH_MAX = env.int("SELECTION_BATCH_MAX", default=1000)
+
+# Number of most attended events listed on the attendance dashboard.
+ATTENDANCE_TOP_EVENTS = env.int("ATTENDANCE_TOP_EVENTS", default=20)
+
+# The conference whose schedule is shown. It's created with this name and timezone
+# the first time its schedule is ingested, they can be changed in the admin after.
+CONFERENCE_SLUG = env.str("CONFERENCE_SLUG", default="djangocon-us-2024")
+CONFERENCE_NAME = env.str("CONFERENCE_NAME", default="DjangoCon US 2024")
+CONFERENCE_TIME_ZONE = env.str("CONFERENCE_TIME_ZONE", default="America/New_York")
+
+# Number of worker processes used to parse schedule data files.
+INGEST_WORKERS = env.int("INGEST_WORKERS", default=os.cpu_count() or 1)
+
+# Seconds after which a running ingest job is assumed dead, so a new one can start.
+INGEST_JOB_TIMEOUT = env.int("INGEST_JOB_TIMEOUT", default=60 * 60)
+
+# Where the sync_schedule command downloads the schedule data files from.
+SCHEDULE_SYNC_REPO = env.str(
+    "SCHEDULE_SYNC_REPO", default="djangocon/2024.djangocon.us"
+)
+SCHEDULE_SYNC_REF = env.str("SCHEDULE_SYNC_REF", default="main")
+SCHEDULE_SYNC_TALKS_PATH = env.str(
+    "SCHEDULE_SYNC_TALKS_PATH", default="src/_content/schedule/talks"
+)
+SCHEDULE_SYNC_PRESENTERS_PATH = env.str(
+    "SCHEDULE_SYNC_PRESENTERS_PATH", default="src/_content/presenters"
+)
+SCHEDULE_SYNC_API_URL = env.str(
+    "SCHEDULE_SYNC_API_URL", default="https://api.github.com"
+)
+SCHEDULE_SYNC_RAW_URL = env.str(
+    "SCHEDULE_SYNC_RAW_URL", default="https://raw.githubusercontent.com"
+)
+# Optional GitHub token, for a higher rate limit.
+SCHEDULE_SYNC_TOKEN = env.str("SCHEDULE_SYNC_TOKEN", default="")
+# Maximum number of files downloaded at once, and seconds before a request times out.
+SCHEDULE_SYNC_CONCURRENCY = env.int("SCHEDULE_SYNC_CONCURRENCY", default=8)
+SCHEDULE_SYNC_TIMEOUT = env.float("SCHEDULE_SYNC_TIMEOUT", default=30)
+
+# Requests slower than this many milliseconds log their slowest query and where it
+# was made from. Unset to turn off.
+METRICS_SLOW_REQUEST_MS = env.int("METRICS_SLOW_REQUEST_MS", default=None)
+
+# Logging
+# https://docs.djangoproject.com/en/4.2/topics/logging/
+# Per-request metrics are logged by main.metrics at INFO.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "main": {
+            "handlers": ["console"],
+            "level": env.str("LOG_LEVEL", default="INFO"),
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
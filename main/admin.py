@@ -1,28 +1,333 @@
-from django.contrib import admin
+from datetime import datetime, time, timedelta
 
-from .models import Event, Presenter, SelectEvent, TableUpdate
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.functions import Substr
+from django.utils.dateparse import parse_date
+from django.utils.formats import date_format
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
+from django.utils.timezone import get_current_timezone
 
+from .attendance import change_attendance, count_by_event
+from .models import Conference, Event, Presenter, Room, SelectEvent, TableUpdate
+from .schedule import (
+    bump_schedule_version,
+    get_presenter_event_ids,
+    get_schedule_days,
+    update_presenter_names,
+)
+from .selections import bump_selection_version
 
-class PresenterAdmin(admin.ModelAdmin):
-    list_display = ("name", "bio")
+# Characters of long text shown in admin lists
+PREVIEW_LENGTH = 80
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginates admin lists of big tables without counting all their rows.
+    Counting is a full scan in Postgres, so unfiltered lists use the planner's
+    estimate of the table's size once it's over ADMIN_ESTIMATED_COUNT_MIN rows.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # The estimate is -1 until the table is first analyzed
+            if row and row[0] >= settings.ADMIN_ESTIMATED_COUNT_MIN:
+                return row[0]
+        return super().count
+
+
+class ListQuerySetChangeList(ChangeList):
+    """
+    Lets the admin narrow down the queryset of its list, without changing the
+    queryset its other pages use.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return self.model_admin.get_list_queryset(queryset)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Admin of a table that can have many rows.
+    Lists only load the columns they show and don't count the whole table twice.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return ListQuerySetChangeList
+
+    def get_list_queryset(self, queryset):
+        """
+        Narrows down the queryset of the list to what it shows.
+        """
+        return queryset
+
+
+class ScheduleAdminMixin:
+    """
+    Invalidates the cached schedule when schedule data is edited in the admin.
+    """
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        self.update_events(form.instance)
+        bump_schedule_version()
+
+    def update_events(self, obj) -> None:
+        """
+        Updates what events copy from the saved object, once its relations are saved.
+        """
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_schedule_version()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_schedule_version()
+
+
+class DayFilter(admin.SimpleListFilter):
+    """
+    Filters by the day an event starts on, in the active timezone.
+    Days are those of the shown conference's schedule, and the filter is a range
+    on the start time, so it can use its index.
+    """
+
+    title = "day"
+    parameter_name = "day"
+    start_time_field = "start_time"
+
+    def lookups(self, request, model_admin):
+        return [
+            (day.isoformat(), date_format(day, "D m/d")) for day in get_schedule_days()
+        ]
+
+    def queryset(self, request, queryset):
+        day = parse_date(self.value() or "")
+        if day is None:
+            return queryset
+
+        tz = get_current_timezone()
+        start = datetime.combine(day, time.min, tzinfo=tz)
+        end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+        return queryset.filter(
+            **{
+                f"{self.start_time_field}__gte": start,
+                f"{self.start_time_field}__lt": end,
+            }
+        )
+
+
+class RoomFilter(admin.SimpleListFilter):
+    """
+    Filters by the room an event is in.
+    """
+
+    title = "room"
+    parameter_name = "room"
+    location_field = "location"
+
+    def lookups(self, request, model_admin):
+        rooms = (
+            Event.objects.order_by("location")
+            .values_list("location", flat=True)
+            .distinct()
+        )
+        return [(room, room) for room in rooms]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.filter(**{self.location_field: self.value()})
+
+
+class EventDayFilter(DayFilter):
+    start_time_field = "event__start_time"
+
+
+class EventRoomFilter(RoomFilter):
+    location_field = "event__location"
+
+
+class ConferenceAdmin(ScheduleAdminMixin, admin.ModelAdmin):
+    list_display = ("name", "slug", "time_zone")
+
+
+class PresenterAdmin(ScheduleAdminMixin, LargeTableAdmin):
+    list_display = ("name", "bio_preview")
     ordering = ("name",)
+    search_fields = ("name",)
+
+    def update_events(self, obj):
+        # Presenters are copied onto their events, which are reindexed
+        update_presenter_names(get_presenter_event_ids([obj.pk]))
+
+    def get_list_queryset(self, queryset):
+        # Only the start of the bio is read, not the whole bio and its HTML
+        return queryset.only("id", "name").annotate(
+            bio_start=Substr("bio", 1, PREVIEW_LENGTH + 1)
+        )
+
+    @admin.display(description="bio")
+    def bio_preview(self, obj):
+        return Truncator(obj.bio_start or "").chars(PREVIEW_LENGTH)
 
 
 class TableUpdateAdmin(admin.ModelAdmin):
     list_display = ("table_name", "last_updated")
 
 
-class EventAdmin(admin.ModelAdmin):
-    list_display = ("title", "start_time", "end_time", "location", "presenter_names")
+class EventAdmin(ScheduleAdminMixin, LargeTableAdmin):
+    list_display = (
+        "title",
+        "start_time",
+        "end_time",
+        "location",
+        "presenters_preview",
+        "attendees",
+    )
+    list_filter = ("conference", DayFilter, RoomFilter)
     ordering = ("start_time",)
     search_fields = ("title", "location")
+    actions = ["clear_selections"]
+
+    def update_events(self, obj):
+        update_presenter_names([obj.pk])
+
+    def get_list_queryset(self, queryset):
+        return queryset.defer(
+            "description", "description_html", "presenter_slugs", "presenter_bios"
+        ).annotate(attendee_count=F("attendance__attendees"))
+
+    @admin.display(description="presenters")
+    def presenters_preview(self, obj):
+        return Truncator(obj.presenter_names).chars(PREVIEW_LENGTH)
+
+    @admin.display(description="attendees")
+    def attendees(self, obj):
+        return obj.attendee_count or 0
+
+    @admin.action(description="Clear selections of the selected events")
+    def clear_selections(self, request, queryset):
+        selections = SelectEvent.objects.filter(
+            event__in=queryset.values("pk"), selected=True
+        )
+        with transaction.atomic():
+            counts = count_by_event(selections)
+            user_ids = list(selections.values_list("user_id", flat=True).distinct())
+            cleared = selections.update(selected=False)
+            bump_selection_version(user_ids)
+            change_attendance({event_id: -count for event_id, count in counts.items()})
+        self.message_user(request, f"Cleared {cleared} selections.", messages.SUCCESS)
+
+
+class SelectEventAdmin(LargeTableAdmin):
+    list_display = ("user", "event", "start_time", "location", "selected")
+    list_filter = ("selected", EventDayFilter, EventRoomFilter)
+    list_select_related = ("user", "event")
+    raw_id_fields = ("user", "event")
+    search_fields = ("=user__username", "=event__id")
+    actions = ["select", "unselect"]
+
+    def get_list_queryset(self, queryset):
+        return queryset.only(
+            "selected",
+            "user__username",
+            "event__title",
+            "event__start_time",
+            "event__location",
+        )
+
+    @admin.display(description="start time", ordering="event__start_time")
+    def start_time(self, obj):
+        return obj.event.start_time
+
+    @admin.display(description="location", ordering="event__location")
+    def location(self, obj):
+        return obj.event.location
+
+    def set_selected(self, request, queryset, selected: bool):
+        """
+        Selects or unselects the rows in a single statement.
+        """
+        queryset = queryset.exclude(selected=selected).order_by()
+        sign = 1 if selected else -1
+        with transaction.atomic():
+            counts = count_by_event(queryset)
+            user_ids = list(queryset.values_list("user_id", flat=True).distinct())
+            changed = queryset.update(selected=selected)
+            bump_selection_version(user_ids)
+            change_attendance(
+                {event_id: sign * count for event_id, count in counts.items()}
+            )
+        self.message_user(
+            request,
+            f"{'Selected' if selected else 'Unselected'} {changed} events.",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Select the selected events")
+    def select(self, request, queryset):
+        self.set_selected(request, queryset, True)
+
+    @admin.action(description="Unselect the selected events")
+    def unselect(self, request, queryset):
+        self.set_selected(request, queryset, False)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_selection_version([obj.user_id])
+        changes = {obj.event_id: int(obj.selected)}
+        if change:
+            event_id = form.initial["event"]
+            changes[event_id] = changes.get(event_id, 0) - int(form.initial["selected"])
+        change_attendance(changes)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_selection_version([obj.user_id])
+        change_attendance({obj.event_id: -int(obj.selected)})
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        counts = count_by_event(queryset.filter(selected=True))
+        user_ids = list(
+            queryset.order_by().values_list("user_id", flat=True).distinct()
+        )
+        super().delete_queryset(request, queryset)
+        bump_selection_version(user_ids)
+        change_attendance({event_id: -count for event_id, count in counts.items()})
 
 
-class SelectEventAdmin(admin.ModelAdmin):
-    list_display = ("user", "event", "selected")
+class RoomAdmin(admin.ModelAdmin):
+    list_display = ("name", "conference", "capacity")
+    list_editable = ("capacity",)
+    list_filter = ("conference",)
+    ordering = ("conference", "name")
 
 
+admin.site.register(Conference, ConferenceAdmin)
 admin.site.register(Presenter, PresenterAdmin)
 admin.site.register(Event, EventAdmin)
+admin.site.register(Room, RoomAdmin)
 admin.site.register(TableUpdate, TableUpdateAdmin)
 admin.site.register(SelectEvent, SelectEventAdmin)
@@ -0,0 +1,102 @@
+"""
+Compact JSON versions of the schedule, which the browser renders and localizes itself.
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Event
+from .schedule import get_snapshot
+
+# Layout of each event in the schedule payload
+EVENT_FIELDS = ["id", "title", "start", "end", "room", "presenters"]
+
+# Process-local copy of the latest encoded schedule, saves reading it from the cache.
+_local_schedule_json: tuple[str, Optional[tuple[bytes, bytes]]] = ("", None)
+
+
+def schedule_tag(version: str) -> str:
+    """
+    Gets a short tag of the shown conference's schedule version, for URLs.
+    """
+    state = f"{settings.CONFERENCE_SLUG}|{version}"
+    return hashlib.sha256(state.encode()).hexdigest()[:16]
+
+
+def build_schedule_payload(version: str) -> dict:
+    """
+    Builds the schedule of the shown conference, shared by all users.
+    Times are Unix timestamps in UTC. Rooms and presenter names are listed once
+    and events refer to them by position, so repeated strings aren't sent again.
+    Takes one query on top of the cached snapshot.
+
+    :param version: The schedule version.
+    :return: The version's tag, the layout of each event, rooms, presenter names
+        and events as lists, ordered by start time.
+    """
+    presenter_names = {}
+    event_presenters = {}
+    links = (
+        Event.presenters.through.objects.filter(
+            event__conference__slug=settings.CONFERENCE_SLUG
+        )
+        .order_by("id")
+        .values_list("event_id", "presenter__name")
+    )
+    for event_id, name in links:
+        position = presenter_names.setdefault(name, len(presenter_names))
+        event_presenters.setdefault(event_id, []).append(position)
+
+    rooms = {}
+    events = [
+        [
+            event["id"],
+            event["title"],
+            int(event["start_time"].timestamp()),
+            int(event["end_time"].timestamp()),
+            rooms.setdefault(event["location"], len(rooms)),
+            event_presenters.get(event["id"], []),
+        ]
+        for event in get_snapshot(version)
+    ]
+
+    return {
+        "version": schedule_tag(version),
+        "fields": EVENT_FIELDS,
+        "rooms": list(rooms),
+        "presenters": list(presenter_names),
+        "events": events,
+    }
+
+
+def get_schedule_json(version: str) -> tuple[bytes, bytes]:
+    """
+    Gets the encoded schedule payload of a version.
+    It's encoded and compressed once per version and shared between processes
+    through the cache.
+
+    :param version: The schedule version.
+    :return: A tuple of the payload as JSON and as gzipped JSON.
+    """
+    global _local_schedule_json
+
+    key = f"schedule-json:{settings.CONFERENCE_SLUG}:{version}"
+    local_key, encoded = _local_schedule_json
+    if local_key == key:
+        return encoded
+
+    encoded = cache.get(key)
+    if encoded is None:
+        data = json.dumps(
+            build_schedule_payload(version), separators=(",", ":")
+        ).encode()
+        encoded = (data, gzip.compress(data, mtime=0))
+        cache.set(key, encoded, settings.SCHEDULE_CACHE_TIMEOUT)
+
+    _local_schedule_json = (key, encoded)
+    return encoded
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "main"
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .metrics import install_query_timer
+        from .preferences import load_preferences
+        from .timezones import get_registry
+
+        connection_created.connect(install_query_timer)
+        user_logged_in.connect(load_preferences)
+
+        # Scans the tzdata files once at startup rather than on the first request.
+        get_registry()
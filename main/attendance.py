@@ -0,0 +1,168 @@
+"""
+Counts of how many users plan to attend each event, for organizers planning rooms.
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils.timezone import localtime
+
+from .models import Event, EventAttendance, Room, SelectEvent
+
+
+def change_attendance(changes: dict[str, int]) -> None:
+    """
+    Adds to the attendee counts of events, using a single statement.
+    Run it in the transaction that changes the selections, so the counts are
+    changed along with them. The rows are written in event ID order, so concurrent
+    changes always lock them in the same order and can't deadlock.
+
+    :param changes: Event ID -> change in the number of users who selected it.
+    """
+    changes = {
+        event_id: change for event_id, change in sorted(changes.items()) if change
+    }
+    if not changes:
+        return
+
+    table = connection.ops.quote_name(EventAttendance._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (event_id, attendees)
+            VALUES {", ".join(["(%s, %s)"] * len(changes))}
+            ON CONFLICT (event_id)
+            DO UPDATE SET attendees = {table}.attendees + EXCLUDED.attendees
+            """,
+            [value for item in changes.items() for value in item],
+        )
+
+
+def count_by_event(selections) -> dict[str, int]:
+    """
+    Counts the selections of each event in a queryset of selections.
+
+    :return: Event ID -> number of selections.
+    """
+    return dict(
+        selections.order_by().values_list("event_id").annotate(count=Count("pk"))
+    )
+
+
+def reconcile_attendance(event_ids: Iterable[str] = None, batch_size: int = 500) -> int:
+    """
+    Recounts the attendees of events from their selections, correcting the counts
+    that drifted. Selections that are deleted along with their users don't change
+    the counts, for example.
+    Events are recounted in batches, each in its own transaction. A batch's counts
+    are locked while it's recounted, so selection changes that commit meanwhile
+    are added after the recount instead of being overwritten by it.
+
+    :param event_ids: The events to recount. Defaults to all events.
+    :param batch_size: Number of events recounted in each transaction.
+    :return: The number of counts that were corrected.
+    """
+    if event_ids is None:
+        event_ids = Event.objects.order_by("id").values_list("id", flat=True)
+    event_ids = list(event_ids)
+
+    table = connection.ops.quote_name(EventAttendance._meta.db_table)
+    event_table = connection.ops.quote_name(Event._meta.db_table)
+    selection_table = connection.ops.quote_name(SelectEvent._meta.db_table)
+
+    corrected = 0
+    for start in range(0, len(event_ids), batch_size):
+        batch = event_ids[start : start + batch_size]
+        with transaction.atomic():
+            list(
+                EventAttendance.objects.select_for_update()
+                .filter(event_id__in=batch)
+                .values_list("pk", flat=True)
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table} (event_id, attendees)
+                    SELECT id, attendees FROM (
+                        SELECT e.id,
+                            (SELECT COUNT(*) FROM {selection_table} s
+                             WHERE s.event_id = e.id AND s.selected = %s) AS attendees,
+                            a.attendees AS counted
+                        FROM {event_table} e
+                        LEFT JOIN {table} a ON a.event_id = e.id
+                        WHERE e.id IN ({", ".join(["%s"] * len(batch))})
+                    ) AS counts
+                    WHERE attendees <> COALESCE(counted, 0)
+                    ON CONFLICT (event_id) DO UPDATE SET attendees = EXCLUDED.attendees
+                    """,
+                    [True, *batch],
+                )
+                corrected += cursor.rowcount
+
+    return corrected
+
+
+def get_attendance_report(top: int = None) -> dict:
+    """
+    Builds the organizers' view of the shown conference's attendance from the counts,
+    in two queries. Times are in the active timezone.
+
+    :param top: Number of most attended events listed.
+        Defaults to the ATTENDANCE_TOP_EVENTS setting.
+    :return: The most attended events, the events that have more attendees than
+        their room fits, most crowded first, and the total attendees of each time slot.
+    """
+    top = top or settings.ATTENDANCE_TOP_EVENTS
+
+    capacities = dict(
+        Room.objects.filter(conference__slug=settings.CONFERENCE_SLUG).values_list(
+            "name", "capacity"
+        )
+    )
+    events = [
+        {
+            **event,
+            "start_time": localtime(event["start_time"]),
+            "end_time": localtime(event["end_time"]),
+            "attendees": event["attendees"] or 0,
+            "capacity": capacities.get(event["location"]),
+        }
+        for event in Event.objects.filter(conference__slug=settings.CONFERENCE_SLUG)
+        .order_by("start_time", "location")
+        .values(
+            "id",
+            "title",
+            "start_time",
+            "end_time",
+            "location",
+            attendees=F("attendance__attendees"),
+        )
+    ]
+
+    over_capacity = sorted(
+        (
+            {**event, "overflow": event["attendees"] - event["capacity"]}
+            for event in events
+            if event["capacity"] is not None and event["attendees"] > event["capacity"]
+        ),
+        key=lambda event: event["attendees"] / max(event["capacity"], 1),
+        reverse=True,
+    )
+
+    slots: dict[datetime, dict] = {}
+    for event in events:
+        slot = slots.setdefault(
+            event["start_time"],
+            {"start_time": event["start_time"], "events": 0, "attendees": 0},
+        )
+        slot["events"] += 1
+        slot["attendees"] += event["attendees"]
+
+    return {
+        "top_events": sorted(events, key=lambda event: -event["attendees"])[:top],
+        "over_capacity": over_capacity,
+        "slots": list(slots.values()),
+    }
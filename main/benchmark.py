@@ -0,0 +1,280 @@
+"""
+Measures how long the main code paths take and how many queries they make.
+"""
+
+import asyncio
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from .ingest import ingest_schedule
+from .models import Event, Presenter, SelectEvent, SelectionVersion
+from .views import get_context, get_feed_token
+
+CONTEXT_PIECES = (
+    "events_exist",
+    "all_events",
+    "all_selected_events",
+    "conflicts",
+    "happening_now",
+    "up_next",
+)
+
+PAGES = (
+    "home",
+    "select_events",
+    "selected_events",
+    "selected_events_feed",
+    "schedule_status",
+)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict:
+    """
+    Runs a function several times, recording its wall time and query count.
+    The first run is reported separately, as it's the one that fills any caches.
+
+    :return: Times are in milliseconds, queries are those of the last run.
+    """
+    times = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            func()
+            times.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "runs": repeat,
+        "first_ms": round(times[0], 3),
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "max_ms": round(max(times), 3),
+        "queries": len(queries),
+    }
+
+
+def read_response(response) -> None:
+    # Streaming responses only do their work as they're read
+    if getattr(response, "is_async", False):
+        async_to_sync(read_async_response)(response)
+    elif response.streaming:
+        b"".join(response.streaming_content)
+
+
+async def read_async_response(response) -> None:
+    async for _ in response.streaming_content:
+        pass
+
+
+def benchmark_ingest(
+    talks_dir: str, presenters_dir: str, repeat: int = 5, workers: int = None
+) -> dict:
+    """
+    Benchmarks a full ingest of the schedule, then ingests where nothing changed.
+
+    :param talks_dir: Directory of talks to ingest.
+    :param presenters_dir: Directory of presenters to ingest.
+    :param repeat: Number of times the incremental ingest is run.
+    :param workers: Number of worker processes used for parsing.
+    :return: Benchmark name -> measurements.
+    """
+    return {
+        "parse_data (full)": measure(
+            lambda: ingest_schedule(presenters_dir, talks_dir, False, workers), 1
+        ),
+        "parse_data (incremental)": measure(
+            lambda: ingest_schedule(presenters_dir, talks_dir, True, workers), repeat
+        ),
+    }
+
+
+def benchmark_requests(user, repeat: int = 5) -> dict:
+    """
+    Benchmarks building each piece of page context, toggling a selection and each page,
+    against the current database.
+
+    :param user: The attendee pages are loaded for. Should have some selections.
+    :param repeat: Number of times each benchmark is run.
+    :return: Benchmark name -> measurements.
+    """
+    results = {}
+
+    factory = RequestFactory()
+    for piece in CONTEXT_PIECES:
+
+        def load_piece(piece=piece):
+            request = factory.get("/")
+            request.user = user
+            str(get_context(request, piece)[piece])
+
+        results[f"get_context ({piece})"] = measure(load_piece, repeat)
+
+    client = Client()
+    client.force_login(user)
+
+    event_id = Event.objects.order_by("id").values_list("id", flat=True).first()
+    url = reverse("select_event", args=[event_id])
+    results["select_event"] = measure(lambda: client.post(url), repeat)
+
+    token = get_feed_token(user)
+    for page in PAGES:
+        params = {"token": token} if page == "selected_events_feed" else {}
+        url = reverse(page)
+        results[page] = measure(lambda: read_response(client.get(url, params)), repeat)
+
+    return results
+
+
+def load_results(
+    latencies: list[float], wall_time: float, failed: int, concurrency: int
+) -> dict:
+    """
+    Summarizes a load test. Times are in milliseconds.
+    """
+    latencies = sorted(latencies)
+    return {
+        "runs": len(latencies),
+        "concurrency": concurrency,
+        "requests_per_second": round(len(latencies) / wall_time, 1),
+        "median_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "max_ms": round(latencies[-1], 3),
+        "failed": failed,
+    }
+
+
+def client_cookies(user) -> tuple[dict, dict]:
+    """
+    Logs a user in for a client that goes through the real request handlers.
+
+    :return: A tuple of the cookies and headers to send.
+    """
+    client = Client()
+    client.force_login(user)
+    # The handlers check CSRF tokens, the test client doesn't
+    token = get_random_string(32)
+    cookies = {
+        settings.SESSION_COOKIE_NAME: client.cookies[
+            settings.SESSION_COOKIE_NAME
+        ].value,
+        settings.CSRF_COOKIE_NAME: token,
+    }
+    return cookies, {"X-CSRFToken": token}
+
+
+def benchmark_concurrency(user, concurrency: int = 50, total: int = 200) -> dict:
+    """
+    Compares how many requests a single worker serves through the ASGI and WSGI
+    request handlers. The ASGI worker keeps up to `concurrency` requests in flight
+    on its event loop, while a WSGI worker handles one request at a time.
+    Both toggle a selection, the changeover rush, and load a schedule day.
+
+    :param user: The attendee requests are made for.
+    :param concurrency: Requests in flight at once on the ASGI worker.
+    :param total: Number of requests made to each endpoint on each handler.
+    :return: Benchmark name -> load test results.
+    """
+    cookies, headers = client_cookies(user)
+    event = Event.objects.order_by("start_time").only("id", "start_time").first()
+    day = event.start_time.date().isoformat()
+    endpoints = {
+        "select_event": ("POST", reverse("select_event", args=[event.id])),
+        "select_events_day": ("GET", reverse("select_events_day", args=[day])),
+    }
+
+    results = {}
+    for name, (method, url) in endpoints.items():
+        results[f"{name} (asgi, {concurrency} concurrent)"] = asyncio.run(
+            load_asgi(method, url, cookies, headers, concurrency, total)
+        )
+        results[f"{name} (wsgi, 1 at a time)"] = load_wsgi(
+            method, url, cookies, headers, total
+        )
+    return results
+
+
+async def load_asgi(
+    method: str, url: str, cookies: dict, headers: dict, concurrency: int, total: int
+) -> dict:
+    transport = httpx.ASGITransport(app=ASGIHandler())
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+    failed = 0
+
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://testserver",
+        cookies=cookies,
+        headers=headers,
+    ) as client:
+
+        async def send():
+            nonlocal failed
+            async with limit:
+                start = time.perf_counter()
+                response = await client.request(method, url)
+                latencies.append((time.perf_counter() - start) * 1000)
+                failed += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(total)))
+        wall_time = time.perf_counter() - start
+
+    return load_results(latencies, wall_time, failed, concurrency)
+
+
+def load_wsgi(method: str, url: str, cookies: dict, headers: dict, total: int) -> dict:
+    transport = httpx.WSGITransport(app=WSGIHandler())
+    latencies = []
+    failed = 0
+
+    with httpx.Client(
+        transport=transport,
+        base_url="http://testserver",
+        cookies=cookies,
+        headers=headers,
+    ) as client:
+        start = time.perf_counter()
+        for _ in range(total):
+            request_start = time.perf_counter()
+            response = client.request(method, url)
+            latencies.append((time.perf_counter() - request_start) * 1000)
+            failed += response.status_code != 200
+        wall_time = time.perf_counter() - start
+
+    return load_results(latencies, wall_time, failed, 1)
+
+
+def dataset_size() -> dict:
+    return {
+        "events": Event.objects.count(),
+        "presenters": Presenter.objects.count(),
+        "users": SelectionVersion.objects.count(),
+        "selections": SelectEvent.objects.filter(selected=True).count(),
+    }
+
+
+def compare(results: dict, baseline: dict) -> list[tuple[str, float, float]]:
+    """
+    Compares median times with an earlier run.
+
+    :return: Tuples of benchmark name, baseline median and current median,
+        for the benchmarks in both runs.
+    """
+    return [
+        (name, baseline[name]["median_ms"], result["median_ms"])
+        for name, result in results.items()
+        if name in baseline
+    ]
@@ -0,0 +1,15 @@
+from django.utils.timezone import get_current_timezone_name
+
+from .timezones import current_tz_option, get_registry
+
+
+def timezones(request):
+    """
+    Adds the timezone picker options, which are shown on every page.
+    """
+    current_tz = get_current_timezone_name()
+    return {
+        "current_tz": current_tz,
+        "current_tz_option": current_tz_option(current_tz),
+        "tz_options": get_registry().options_html,
+    }
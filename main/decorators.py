@@ -0,0 +1,50 @@
+import functools
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.admin.views import decorators as admin_decorators
+from django.contrib.auth import decorators
+from django.contrib.auth.views import redirect_to_login
+from django.urls import reverse
+
+
+def login_required(function=None, login_url: str = None):
+    """
+    Redirects to the log-in page unless the user is logged in, like Django's decorator.
+    Also works on async views, where the user is loaded without blocking and then set
+    on the request, so later code can use request.user without running a query.
+    """
+
+    def decorator(view):
+        if not iscoroutinefunction(view):
+            return decorators.login_required(view, login_url=login_url)
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            request.user = await request.auser()
+            if not request.user.is_authenticated:
+                return redirect_to_login(request.get_full_path(), login_url)
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    if function:
+        return decorator(function)
+    return decorator
+
+
+def staff_member_required(view):
+    """
+    Redirects to the admin log-in page unless the user is logged in as staff,
+    like the admin's decorator. Also works on async views, see login_required.
+    """
+    if not iscoroutinefunction(view):
+        return admin_decorators.staff_member_required(view)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        if not (request.user.is_active and request.user.is_staff):
+            return redirect_to_login(request.get_full_path(), reverse("admin:login"))
+        return await view(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,80 @@
+"""
+Rendered events tables of schedule days, shared by all users in a timezone.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Optional
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+from django.utils.timezone import get_current_timezone_name
+
+from .schedule import load_day
+
+# Rendered in place of each event's checkbox state, which is filled in per user
+CHECKED_MARKER = "\x00"
+
+
+class FragmentCache:
+    """
+    Process-local cache that drops the least recently used entries once it holds
+    more than the SCHEDULE_FRAGMENT_CACHE_SIZE setting, so rarely used timezones
+    and outdated schedule versions don't pile up.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.SCHEDULE_FRAGMENT_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+_fragments = FragmentCache()
+
+
+def render_day(day: date, version: str, selected_ids: set[str]) -> SafeString:
+    """
+    Renders the events table of a day in the active timezone for a user.
+    The table is rendered once per schedule version, day and timezone, then only
+    the user's checked boxes are filled in.
+
+    :param day: The day to render.
+    :param version: The schedule version.
+    :param selected_ids: IDs of the events the user has selected.
+    """
+    key = (settings.CONFERENCE_SLUG, version, day, get_current_timezone_name())
+    fragment = _fragments.get(key)
+    if fragment is None:
+        events = [
+            {**event, "selected": CHECKED_MARKER}
+            for event in load_day(None, day, version, set())
+        ]
+        html = render_to_string("schedule_day.html", {"date": day, "events": events})
+        fragment = (html.split(CHECKED_MARKER), [event["id"] for event in events])
+        _fragments.set(key, fragment)
+
+    parts, event_ids = fragment
+    html = [parts[0]]
+    for event_id, part in zip(event_ids, parts[1:]):
+        html.append("checked" if event_id in selected_ids else "")
+        html.append(part)
+    return mark_safe("".join(html))
@@ -0,0 +1,95 @@
+"""
+Builds iCalendar (RFC 5545) feeds of events.
+"""
+
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from datetime import datetime, timezone
+
+from .models import Event
+
+DATE_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
+def escape_text(value: str) -> str:
+    """
+    Escapes a value for use in a TEXT property.
+    """
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def format_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime(DATE_FORMAT)
+
+
+def fold_line(line: str) -> str:
+    """
+    Splits a content line into lines of at most 75 octets, as iCalendar requires.
+    Continuation lines start with a space.
+    """
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Don't split multibyte characters
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74  # Leaves room for the leading space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def event_lines(event: Event, stamp: str, domain: str) -> Iterator[str]:
+    """
+    Yields the content lines of a VEVENT.
+    """
+    yield "BEGIN:VEVENT"
+    yield f"UID:{escape_text(event.id)}@{domain}"
+    yield f"DTSTAMP:{stamp}"
+    yield f"DTSTART:{format_datetime(event.start_time)}"
+    yield f"DTEND:{format_datetime(event.end_time)}"
+    yield f"SUMMARY:{escape_text(event.title)}"
+    yield f"LOCATION:{escape_text(event.location)}"
+
+    description = event.description or ""
+    if presenters := event.presenter_names:
+        description = f"Presenters: {presenters}\n\n{description}"
+    yield f"DESCRIPTION:{escape_text(description.strip())}"
+    yield "END:VEVENT"
+
+
+async def calendar(
+    events: AsyncIterable[Event], name: str, stamp: datetime, domain: str
+) -> AsyncIterator[str]:
+    """
+    Yields a calendar one folded line at a time, so it never has to be held in memory.
+    The events are read asynchronously, so an ASGI server can stream the calendar
+    without loading them all first.
+
+    :param events: The events to include.
+    :param name: Name shown by calendar apps.
+    :param stamp: When the calendar data last changed.
+    :param domain: Domain used to make the event UIDs globally unique.
+    """
+    stamp = format_datetime(stamp)
+
+    yield fold_line("BEGIN:VCALENDAR")
+    yield fold_line("VERSION:2.0")
+    yield fold_line("PRODID:-//schedule_maker_9000//EN")
+    yield fold_line("CALSCALE:GREGORIAN")
+    yield fold_line(f"X-WR-CALNAME:{escape_text(name)}")
+    async for event in events:
+        for line in event_lines(event, stamp, domain):
+            yield fold_line(line)
+    yield fold_line("END:VCALENDAR")
@@ -0,0 +1,491 @@
+import hashlib
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Conference, Event, Presenter, SourceFile, TableUpdate
+from .parsing import IngestError, IngestWarning, ParsedFile, parse_files
+from .schedule import (
+    bump_schedule_version,
+    get_conference,
+    get_presenter_event_ids,
+    update_presenter_names,
+)
+from .search import update_search_index
+from .timezones import get_zone
+
+
+@dataclass
+class IngestResult:
+    """
+    Summary of parsing one directory of schedule data.
+    """
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    errors: list[IngestError] = field(default_factory=list)
+    warnings: list[IngestWarning] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+@dataclass
+class SourceChanges:
+    """
+    Files in a directory that need to be parsed, compared to the last time it was parsed.
+    """
+
+    changed: dict[str, str] = field(default_factory=dict)  # Filename -> content hash
+    new: set[str] = field(default_factory=set)
+    removed: list[str] = field(default_factory=list)
+
+
+def read_filenames(directory: str, extension: str = None) -> list[str]:
+    """
+    Reads all filenames in a directory.
+
+    :param directory: Directory to read filenames from.
+    :param extension: Optional extension to filter by. Example: ".md"
+    :return: A list of filenames, if any.
+    """
+    if extension:
+        try:
+            return [f for f in os.listdir(directory) if f.endswith(extension)]
+        except FileNotFoundError:
+            return []
+
+    try:
+        return [f for f in os.listdir(directory)]
+    except FileNotFoundError:
+        return []
+
+
+def hash_file(filename: str) -> str:
+    """
+    Gets the SHA-256 hash of a file's contents.
+    """
+    with open(filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def find_changes(
+    kind: str, directory: str, files: list[str], incremental: bool = True
+) -> SourceChanges:
+    """
+    Compares the files in a directory with the manifest of the last parse.
+
+    :param kind: Conference and type of data in the directory. Example: "djangocon-us-2024/talks"
+    :param directory: Directory the files are in.
+    :param files: Filenames currently in the directory.
+    :param incremental: If False, all files are treated as changed.
+    :return: The files that were changed or added and the files that were removed.
+    """
+    manifest = dict(
+        SourceFile.objects.filter(kind=kind).values_list("filename", "content_hash")
+    )
+
+    changes = SourceChanges()
+    for file in files:
+        content_hash = hash_file(os.path.join(directory, file))
+        if file not in manifest:
+            changes.new.add(file)
+        if not incremental or manifest.get(file) != content_hash:
+            changes.changed[file] = content_hash
+
+    changes.removed = [file for file in manifest if file not in files]
+    return changes
+
+
+def save_manifest(kind: str, changes: SourceChanges, parsed: list[str]) -> None:
+    """
+    Records the hashes of the files that were parsed and forgets removed files.
+
+    :param kind: Conference and type of data the files hold. Example: "djangocon-us-2024/talks"
+    :param changes: The changes found before parsing.
+    :param parsed: Filenames that were parsed successfully.
+    """
+    SourceFile.objects.bulk_create(
+        [
+            SourceFile(kind=kind, filename=file, content_hash=changes.changed[file])
+            for file in parsed
+        ],
+        update_conflicts=True,
+        unique_fields=["kind", "filename"],
+        update_fields=["content_hash"],
+    )
+    SourceFile.objects.filter(kind=kind, filename__in=changes.removed).delete()
+
+
+def file_id(file: str) -> str:
+    """
+    Gets the ID of a presenter or event from its filename.
+    """
+    try:
+        return file.split(".md")[0]
+    except ValueError:
+        return "0"
+
+
+def parse_changed_files(
+    directory: str,
+    changes: SourceChanges,
+    workers: int = None,
+    progress: Callable[[int], None] = None,
+    rendered_hashes: dict[str, str] = None,
+) -> list[ParsedFile]:
+    """
+    Parses the files that changed in a directory.
+
+    :param directory: Directory the files are in.
+    :param changes: The changes found in the directory.
+    :param workers: Number of worker processes. Defaults to the INGEST_WORKERS setting.
+    :param progress: Optional callback, called with 1 after each file is parsed.
+    :param rendered_hashes: Filename -> hash of the body last rendered for it.
+        Bodies that didn't change aren't rendered again.
+    :return: The parsed files.
+    """
+    if workers is None:
+        workers = settings.INGEST_WORKERS
+
+    rendered_hashes = rendered_hashes or {}
+    paths = [os.path.join(directory, file) for file in changes.changed]
+    path_hashes = {
+        os.path.join(directory, file): rendered_hashes[file]
+        for file in changes.changed
+        if file in rendered_hashes
+    }
+    return parse_files(paths, workers, progress, path_hashes)
+
+
+def get_rendered_hashes(queryset, hash_field: str, changes: SourceChanges) -> dict:
+    """
+    Gets the hashes of the bodies last rendered for the changed files.
+
+    :param queryset: The presenters or events the files could be for.
+    :param hash_field: Field holding the hash of the rendered body.
+    :return: Filename -> hash of the body last rendered for it.
+    """
+    ids = {file_id(file): file for file in changes.changed}
+    return {
+        ids[row_id]: rendered_hash
+        for row_id, rendered_hash in queryset.filter(id__in=ids).values_list(
+            "id", hash_field
+        )
+    }
+
+
+def save_rendered(
+    model, rows: list, rendered: list[bool], fields: list[str], html_fields: list[str]
+) -> None:
+    """
+    Inserts or updates rows, only updating the rendered HTML of those whose body changed.
+
+    :param model: Presenter or Event.
+    :param rows: The rows to save.
+    :param rendered: Whether each row's body was rendered.
+    :param fields: Fields to update, other than the rendered HTML.
+    :param html_fields: The rendered HTML and body hash fields.
+    """
+    for was_rendered, update_fields in ((True, fields + html_fields), (False, fields)):
+        model.objects.bulk_create(
+            [row for row, flag in zip(rows, rendered) if flag == was_rendered],
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=update_fields,
+        )
+
+
+def parse_presenter_data(
+    presenters_dir: str = "presenters",
+    incremental: bool = True,
+    workers: int = None,
+    progress: Callable[[int], None] = None,
+    conference: Conference = None,
+) -> IngestResult:
+    """
+    Parses the latest presenter data and updates the database.
+    Only files that changed since the last parse are read, unless incremental is False.
+    Presenters are shared between conferences, a removed presenter is kept while
+    another conference's data still lists them.
+
+    :param presenters_dir: Directory where the presenter info is located.
+    :param incremental: Whether to skip files that haven't changed.
+    :param workers: Number of worker processes used for parsing.
+    :param progress: Optional callback, called with 1 after each file is parsed.
+    :param conference: The conference the data is for. Defaults to the shown conference.
+    :return: The IDs of presenters added, updated and removed, and any errors.
+    TODO: Fix the issue with loading bio data for Jacob and Simon.
+    """
+    result = IngestResult()
+    conference = conference or get_conference()
+    kind = f"{conference.slug}/presenters"
+
+    current_dir = os.path.abspath(presenters_dir)
+    files = read_filenames(current_dir, ".md")
+    if not files:
+        result.errors.append(IngestError(presenters_dir, "No files found."))
+        return result
+
+    changes = find_changes(kind, current_dir, files, incremental)
+
+    rendered_hashes = get_rendered_hashes(Presenter.objects, "bio_hash", changes)
+
+    presenters = []
+    rendered = []
+    parsed = []
+    for parsed_file in parse_changed_files(
+        current_dir, changes, workers, progress, rendered_hashes
+    ):
+        file = parsed_file.filename
+        result.errors.extend(parsed_file.errors)
+        if not parsed_file.ok:
+            continue
+
+        presenter_id = file_id(file)
+        presenters.append(
+            Presenter(
+                id=presenter_id,
+                name=parsed_file.attributes.get("name", "ERROR"),
+                bio=parsed_file.body,
+                bio_html=parsed_file.html or "",
+                bio_hash=parsed_file.body_hash,
+            )
+        )
+        rendered.append(parsed_file.html is not None)
+        parsed.append(file)
+        if file in changes.new:
+            result.added.append(presenter_id)
+        else:
+            result.updated.append(presenter_id)
+
+    save_rendered(
+        Presenter, presenters, rendered, ["name", "bio"], ["bio_html", "bio_hash"]
+    )
+    # Renamed presenters are copied onto their events
+    update_presenter_names(get_presenter_event_ids(result.updated))
+
+    still_listed = set(
+        SourceFile.objects.filter(
+            kind__endswith="/presenters", filename__in=changes.removed
+        )
+        .exclude(kind=kind)
+        .values_list("filename", flat=True)
+    )
+    result.removed = [
+        file_id(file) for file in changes.removed if file not in still_listed
+    ]
+    Presenter.objects.filter(id__in=result.removed).delete()
+
+    save_manifest(kind, changes, parsed)
+
+    if Presenter.objects.exists():
+        TableUpdate.objects.update_or_create(table_name="PresentersExist")
+    else:
+        result.errors.append(IngestError(presenters_dir, "No presenter data found."))
+
+    return result
+
+
+def link_presenters(
+    event_presenter_map: dict[str, tuple[Event, list[str]]], result: IngestResult
+) -> None:
+    """
+    Replaces the presenters of the given events using a fixed number of queries,
+    and copies their names onto the events.
+    Presenter slugs that don't match a presenter are reported as warnings.
+
+    :param event_presenter_map: Filename -> the event and its presenter slugs.
+    :param result: Result to add warnings to.
+    """
+    through = Event.presenters.through
+    presenter_ids = set(Presenter.objects.values_list("id", flat=True))
+
+    links = []
+    for file, (event, presenter_slugs) in event_presenter_map.items():
+        for slug in dict.fromkeys(presenter_slugs):  # Drops duplicates, keeps order
+            if slug in presenter_ids:
+                links.append(through(event_id=event.id, presenter_id=slug))
+            else:
+                result.warnings.append(
+                    IngestWarning(file, f"Unknown presenter: {slug}")
+                )
+
+    event_ids = [event.id for event, _ in event_presenter_map.values()]
+    through.objects.filter(event_id__in=event_ids).delete()
+    through.objects.bulk_create(links)
+    update_presenter_names(event_ids)
+
+
+def event_ids_of_other_conferences(
+    conference: Conference, changes: SourceChanges
+) -> set[str]:
+    """
+    Finds which of the changed files would get an event ID another conference already uses.
+    """
+    return set(
+        Event.objects.filter(id__in=[file_id(file) for file in changes.changed])
+        .exclude(conference=conference)
+        .values_list("id", flat=True)
+    )
+
+
+def localize(value: datetime, tz) -> datetime:
+    """
+    Puts a naive time from a data file in the given timezone.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=tz)
+    return value
+
+
+def parse_event_data(
+    events_dir: str = "talks",
+    incremental: bool = True,
+    workers: int = None,
+    progress: Callable[[int], None] = None,
+    conference: Conference = None,
+) -> IngestResult:
+    """
+    Parses the latest event data and updates the database.
+    Only files that changed since the last parse are read, unless incremental is False.
+    Events are updated in place, so attendee selections are kept.
+    Times without a UTC offset are taken to be in the conference's timezone.
+
+    :param events_dir: Directory where the event info is located.
+    :param incremental: Whether to skip files that haven't changed.
+    :param workers: Number of worker processes used for parsing.
+    :param progress: Optional callback, called with 1 after each file is parsed.
+    :param conference: The conference the data is for. Defaults to the shown conference.
+    :return: The IDs of events added, updated and removed, and any errors.
+    TODO: Fix parsing issues with descriptions with things like colons.
+    """
+    result = IngestResult()
+    conference = conference or get_conference()
+    kind = f"{conference.slug}/talks"
+    tz = get_zone(conference.time_zone)
+
+    current_dir = os.path.abspath(events_dir)
+    files = read_filenames(current_dir, ".md")
+    if not files:
+        result.errors.append(IngestError(events_dir, "No files found."))
+        return result
+
+    changes = find_changes(kind, current_dir, files, incremental)
+    taken_ids = event_ids_of_other_conferences(conference, changes)
+    rendered_hashes = get_rendered_hashes(
+        Event.objects.filter(conference=conference), "description_hash", changes
+    )
+
+    events = []
+    rendered = []
+    event_presenter_map = {}
+    parsed = []
+    for parsed_file in parse_changed_files(
+        current_dir, changes, workers, progress, rendered_hashes
+    ):
+        file = parsed_file.filename
+        result.errors.extend(parsed_file.errors)
+        if not parsed_file.ok:
+            continue
+
+        attributes = parsed_file.attributes
+        start_time = attributes.get("start_datetime")
+        end_time = attributes.get("end_datetime")
+        if not isinstance(start_time, datetime) or not isinstance(end_time, datetime):
+            result.errors.append(IngestError(file, "Missing start or end time."))
+            continue
+
+        event_id = file_id(file)
+        if event_id in taken_ids:
+            result.errors.append(
+                IngestError(file, "Event ID is already used by another conference.")
+            )
+            continue
+
+        event = Event(
+            id=event_id,
+            conference=conference,
+            title=attributes.get("title", "ERROR"),
+            description=parsed_file.body,
+            description_html=parsed_file.html or "",
+            description_hash=parsed_file.body_hash,
+            start_time=localize(start_time, tz),
+            end_time=localize(end_time, tz),
+            location=attributes.get("room", "ERROR"),
+        )
+        events.append(event)
+        rendered.append(parsed_file.html is not None)
+        event_presenter_map[file] = (event, attributes.get("presenter_slugs") or [])
+        parsed.append(file)
+        if file in changes.new:
+            result.added.append(event_id)
+        else:
+            result.updated.append(event_id)
+
+    save_rendered(
+        Event,
+        events,
+        rendered,
+        ["title", "description", "start_time", "end_time", "location"],
+        ["description_html", "description_hash"],
+    )
+
+    link_presenters(event_presenter_map, result)
+
+    # Selections of removed events are deleted along with them
+    result.removed = [file_id(file) for file in changes.removed]
+    Event.objects.filter(conference=conference, id__in=result.removed).delete()
+    update_search_index(result.removed)
+
+    save_manifest(kind, changes, parsed)
+
+    if Event.objects.exists():
+        TableUpdate.objects.update_or_create(table_name="EventsExist")
+    else:
+        result.errors.append(IngestError(events_dir, "No event data found."))
+
+    return result
+
+
+@transaction.atomic
+def ingest_schedule(
+    presenters_dir: str = "presenters",
+    events_dir: str = "talks",
+    incremental: bool = True,
+    workers: int = None,
+    progress: Callable[[int], None] = None,
+    conference: Conference = None,
+) -> list[IngestError]:
+    """
+    Parses the latest schedule data for presenters and events.
+    The schedule version is only bumped if something changed.
+
+    :param presenters_dir: Directory where the presenter info is located.
+    :param events_dir: Directory where the event info is located.
+    :param incremental: Whether to skip files that haven't changed.
+    :param workers: Number of worker processes used for parsing.
+    :param progress: Optional callback, called with 1 after each file is parsed.
+    :param conference: The conference the data is for. Defaults to the shown conference.
+    :return: A list of errors and warnings if any occurred. Otherwise, an empty list.
+    """
+    conference = conference or get_conference()
+    presenters = parse_presenter_data(
+        presenters_dir, incremental, workers, progress, conference
+    )
+
+    # Events that weren't changed could list the presenters that were just added
+    events = parse_event_data(
+        events_dir, incremental and not presenters.added, workers, progress, conference
+    )
+
+    if presenters.changed or events.changed:
+        bump_schedule_version()
+
+    return presenters.errors + events.errors + events.warnings
@@ -0,0 +1,202 @@
+import heapq
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from django.utils.timezone import now
+
+from .schedule import get_schedule_version, get_snapshot
+
+# Process-local index of the latest schedule version.
+_local_index: tuple[str, Optional["ScheduleIndex"]] = ("", None)
+
+
+@dataclass
+class IntervalNode:
+    """
+    A node of a centered interval tree.
+    Holds the events that contain its center point, sorted both ways for stabbing queries.
+    """
+
+    center: datetime
+    by_start: list[dict]  # Ascending start time
+    by_end: list[dict]  # Descending end time
+    left: Optional["IntervalNode"] = None
+    right: Optional["IntervalNode"] = None
+
+
+def build_tree(events: list[dict]) -> Optional[IntervalNode]:
+    """
+    Builds a centered interval tree over events with "start_time" and "end_time" keys.
+    Each event is treated as the half open interval [start_time, end_time).
+    """
+    if not events:
+        return None
+
+    endpoints = sorted(
+        [event["start_time"] for event in events]
+        + [event["end_time"] for event in events]
+    )
+    center = endpoints[(len(endpoints) - 1) // 2]
+
+    left, right, overlapping = [], [], []
+    for event in events:
+        if event["end_time"] <= center:
+            left.append(event)
+        elif event["start_time"] > center:
+            right.append(event)
+        else:
+            overlapping.append(event)
+
+    # Only happens with zero length events, which would otherwise never be split up
+    if len(left) == len(events):
+        left, overlapping = [], left
+
+    return IntervalNode(
+        center=center,
+        by_start=sorted(overlapping, key=lambda e: e["start_time"]),
+        by_end=sorted(overlapping, key=lambda e: e["end_time"], reverse=True),
+        left=build_tree(left),
+        right=build_tree(right),
+    )
+
+
+def stab(node: Optional[IntervalNode], moment: datetime) -> list[dict]:
+    """
+    Finds the events in the tree that are happening at a moment, in O(log n + k).
+    """
+    found = []
+    while node:
+        if moment < node.center:
+            for event in node.by_start:
+                if event["start_time"] > moment:
+                    break
+                if event["end_time"] > moment:
+                    found.append(event)
+            node = node.left
+        else:
+            for event in node.by_end:
+                if event["end_time"] <= moment:
+                    break
+                found.append(event)
+            node = node.right
+    return found
+
+
+def find_conflicts(events: list[dict]) -> list[tuple[dict, dict]]:
+    """
+    Finds every pair of overlapping events with a sweep over their start times,
+    in O(n log n + k).
+
+    :param events: Events with "start_time" and "end_time" keys.
+    :return: Pairs of overlapping events, the earlier starting event first.
+    """
+    conflicts = []
+    active = []  # Heap of (end time, position, event) of events still going on
+
+    ordered = sorted(events, key=lambda e: (e["start_time"], e["end_time"]))
+    for position, event in enumerate(ordered):
+        while active and active[0][0] <= event["start_time"]:
+            heapq.heappop(active)
+        conflicts.extend((other, event) for _, _, other in active)
+        heapq.heappush(active, (event["end_time"], position, event))
+
+    return conflicts
+
+
+@dataclass
+class ScheduleIndex:
+    """
+    Time based lookups over the whole schedule, built once per schedule version.
+    """
+
+    tree: Optional[IntervalNode]
+    rooms: dict[str, tuple[list[datetime], list[dict]]] = field(default_factory=dict)
+    by_id: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, events: list[dict]) -> "ScheduleIndex":
+        """
+        :param events: Snapshot events, ordered by start time.
+        """
+        rooms = {}
+        for event in events:
+            starts, room_events = rooms.setdefault(event["location"], ([], []))
+            starts.append(event["start_time"])
+            room_events.append(event)
+
+        return cls(
+            tree=build_tree(events),
+            rooms=rooms,
+            by_id={event["id"]: event for event in events},
+        )
+
+    def happening_at(self, moment: datetime) -> list[dict]:
+        """
+        Gets the events happening at a moment, ordered by start time.
+        """
+        return sorted(stab(self.tree, moment), key=lambda e: e["start_time"])
+
+    def next_by_room(self, moment: datetime) -> dict[str, dict]:
+        """
+        Gets the next event to start after a moment in each room, in O(rooms * log n).
+        Rooms with nothing left are left out.
+        """
+        upcoming = {}
+        for room, (starts, room_events) in self.rooms.items():
+            position = bisect_right(starts, moment)
+            if position < len(starts):
+                upcoming[room] = room_events[position]
+        return dict(sorted(upcoming.items(), key=lambda item: item[1]["start_time"]))
+
+    def conflicts(self, event_ids: set[str]) -> list[tuple[dict, dict]]:
+        """
+        Gets the pairs of overlapping events among the given events.
+        """
+        return find_conflicts(
+            [self.by_id[event_id] for event_id in event_ids if event_id in self.by_id]
+        )
+
+
+def get_schedule_index(version: str = None) -> ScheduleIndex:
+    """
+    Gets the index for the given schedule version, building it on first use in this process.
+
+    :param version: The schedule version. Looked up if not passed.
+    """
+    global _local_index
+
+    if version is None:
+        version = get_schedule_version()
+
+    local_version, index = _local_index
+    if local_version != version or index is None:
+        index = ScheduleIndex.build(get_snapshot(version))
+        _local_index = (version, index)
+
+    return index
+
+
+def get_schedule_status(
+    selected_ids: set[str], version: str = None, moment: datetime = None
+) -> dict:
+    """
+    Gets what a user needs to know about the schedule at a moment:
+        - conflicts: Pairs of the user's selected events that overlap.
+        - happening_now: Events happening at the moment.
+        - up_next: The next event in each room.
+
+    :param selected_ids: IDs of the events the user has selected.
+    :param version: The schedule version. Looked up if not passed.
+    :param moment: The moment to check. Defaults to now.
+    :return: Snapshot events, with times in UTC.
+    """
+    index = get_schedule_index(version)
+    moment = moment or now()
+
+    return {
+        "conflicts": index.conflicts(selected_ids),
+        "happening_now": index.happening_at(moment),
+        "up_next": index.next_by_room(moment),
+    }
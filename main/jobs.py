@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.utils.timezone import now
+
+from .ingest import ingest_schedule
+from .models import IngestJob
+
+logger = logging.getLogger(__name__)
+
+
+def progress_key(job_id: int) -> str:
+    return f"ingest-job-progress:{job_id}"
+
+
+class JobProgress:
+    """
+    Counts parsed files for a job and shares the count through the cache.
+    The cache is used instead of the job row, which isn't visible to other
+    connections until the ingest transaction commits.
+    """
+
+    interval = 0.5  # Seconds between cache writes
+
+    def __init__(self, job_id: int):
+        self.key = progress_key(job_id)
+        self.files_parsed = 0
+        self.last_saved = 0.0
+
+    def __call__(self, count: int = 1) -> None:
+        self.files_parsed += count
+        if time.monotonic() - self.last_saved > self.interval:
+            self.save()
+
+    def save(self) -> None:
+        cache.set(self.key, self.files_parsed, settings.INGEST_JOB_TIMEOUT)
+        self.last_saved = time.monotonic()
+
+
+def files_parsed(job: IngestJob) -> int:
+    """
+    Gets the number of files parsed so far by a job.
+    """
+    if job.is_running:
+        return cache.get(progress_key(job.pk), job.files_parsed)
+    return job.files_parsed
+
+
+def elapsed_seconds(job: IngestJob) -> float:
+    """
+    Gets how long a job has been running, or how long it ran if it's finished.
+    """
+    return ((job.finished_at or now()) - job.started_at).total_seconds()
+
+
+def ingest_pending(changed_at: Optional[datetime]) -> bool:
+    """
+    Checks whether data that changed at a time still has to be ingested, because no
+    job that started after the change has finished.
+
+    :param changed_at: When the data last changed, or None if it never did.
+    """
+    if changed_at is None:
+        return False
+    return not IngestJob.objects.filter(
+        status=IngestJob.DONE, started_at__gte=changed_at
+    ).exists()
+
+
+def claim_ingest_job() -> tuple[IngestJob, bool]:
+    """
+    Creates a new running job, unless one is already running.
+    Jobs running for longer than INGEST_JOB_TIMEOUT are assumed dead and marked as failed.
+
+    :return: A tuple of the job and whether it was created.
+    """
+    timed_out = now() - timedelta(seconds=settings.INGEST_JOB_TIMEOUT)
+    IngestJob.objects.filter(status=IngestJob.RUNNING, started_at__lt=timed_out).update(
+        status=IngestJob.FAILED, finished_at=now(), errors=["Error: Timed out."]
+    )
+
+    try:
+        with transaction.atomic():
+            return IngestJob.objects.create(), True
+    except IntegrityError:
+        running = IngestJob.objects.filter(status=IngestJob.RUNNING).first()
+        # The running job may have finished in the meantime
+        return running or IngestJob.objects.latest("started_at"), False
+
+
+def run_ingest_job(job: IngestJob, **ingest_kwargs) -> IngestJob:
+    """
+    Runs the schedule ingestion for a claimed job and records the outcome on it.
+
+    :param job: The job to run.
+    :param ingest_kwargs: Passed on to ingest_schedule.
+    :return: The finished job.
+    """
+    progress = JobProgress(job.pk)
+
+    try:
+        errors = ingest_schedule(progress=progress, **ingest_kwargs)
+    except Exception as e:
+        logger.exception("Ingest job %s failed", job.pk)
+        job.status = IngestJob.FAILED
+        job.errors = [f"Error: {e}"]
+    else:
+        job.status = IngestJob.DONE
+        job.errors = [str(error) for error in errors]
+
+    job.files_parsed = progress.files_parsed
+    job.finished_at = now()
+    job.save()
+    cache.delete(progress.key)
+
+    return job
+
+
+def start_ingest_job(**ingest_kwargs) -> tuple[IngestJob, bool]:
+    """
+    Starts the schedule ingestion in a background thread, unless a job is already running.
+
+    :param ingest_kwargs: Passed on to ingest_schedule.
+    :return: A tuple of the job and whether it was started.
+    """
+    job, created = claim_ingest_job()
+    if created:
+        thread = threading.Thread(
+            target=run_in_thread, args=(job,), kwargs=ingest_kwargs, daemon=True
+        )
+        transaction.on_commit(thread.start)
+
+    return job, created
+
+
+def run_in_thread(job: IngestJob, **ingest_kwargs) -> None:
+    """
+    Runs a job in a background thread, closing the thread's database connection after.
+    """
+    try:
+        run_ingest_job(job, **ingest_kwargs)
+    finally:
+        connection.close()
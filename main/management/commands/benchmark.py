@@ -0,0 +1,136 @@
+import json
+import platform
+import subprocess
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils.timezone import now
+
+from main.benchmark import (
+    benchmark_concurrency,
+    benchmark_ingest,
+    benchmark_requests,
+    compare,
+    dataset_size,
+)
+from main.synthetic import generate_conference, generate_selections
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the app against a synthetic conference in a throwaway database "
+        "and writes the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--talks", type=int, default=5000)
+        parser.add_argument("--presenters", type=int, default=2000)
+        parser.add_argument("--paragraphs", type=int, default=3)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--selections", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Requests in flight at once when load testing the ASGI handler.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests made to each endpoint when load testing.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of worker processes used for parsing.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default="benchmark.json")
+        parser.add_argument(
+            "--compare",
+            metavar="BASELINE",
+            help="Results of an earlier run to compare against.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                results = self.run_benchmarks(tmp, options)
+                size = dataset_size()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "commit": current_commit(),
+            "date": now().isoformat(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "size": size,
+            "results": results,
+        }
+        with open(options["output"], "w") as f:
+            json.dump(report, f, indent=2)
+
+        for name, result in results.items():
+            if "requests_per_second" in result:
+                detail = f"{result['requests_per_second']:>8.1f} req/s"
+            else:
+                detail = f"{result['queries']:>5} queries"
+            self.stdout.write(f"{name:40} {result['median_ms']:>10.2f} ms {detail}")
+        if options["compare"]:
+            self.write_comparison(results, options["compare"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Results written to {options['output']}.")
+        )
+
+    def run_benchmarks(self, tmp: str, options: dict) -> dict:
+        talks_dir, presenters_dir = generate_conference(
+            tmp,
+            talks=options["talks"],
+            presenters=options["presenters"],
+            paragraphs_per_file=options["paragraphs"],
+            seed=options["seed"],
+        )
+        results = benchmark_ingest(
+            talks_dir, presenters_dir, options["repeat"], options["workers"]
+        )
+
+        generate_selections(options["users"], options["selections"], options["seed"])
+        user = get_user_model().objects.order_by("username").first()
+        results.update(benchmark_requests(user, options["repeat"]))
+        results.update(
+            benchmark_concurrency(user, options["concurrency"], options["requests"])
+        )
+        return results
+
+    def write_comparison(self, results: dict, baseline_path: str) -> None:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+        self.stdout.write(f"\nCompared to {baseline.get('commit') or baseline_path}:")
+        for name, before, after in compare(results, baseline["results"]):
+            change = (after - before) / before * 100 if before else 0
+            line = f"{name:40} {before:>10.2f} -> {after:>10.2f} ms ({change:+.1f}%)"
+            self.stdout.write(self.style.ERROR(line) if change > 10 else line)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from main.synthetic import generate_conference
+
+
+class Command(BaseCommand):
+    help = "Writes synthetic talks and presenters directories, for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="Where to create the directories.")
+        parser.add_argument("--talks", type=int, default=5000)
+        parser.add_argument("--presenters", type=int, default=2000)
+        parser.add_argument("--days", type=int, default=3)
+        parser.add_argument(
+            "--paragraphs",
+            type=int,
+            default=3,
+            help="Paragraphs in each description and bio.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        talks_dir, presenters_dir = generate_conference(
+            options["output_dir"],
+            talks=options["talks"],
+            presenters=options["presenters"],
+            days=options["days"],
+            paragraphs_per_file=options["paragraphs"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['talks']} talks to {talks_dir} and "
+                f"{options['presenters']} presenters to {presenters_dir}."
+            )
+        )
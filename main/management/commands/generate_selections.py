@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import Event
+from main.synthetic import generate_selections
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates synthetic attendees who have selected random events, for benchmarking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--selections",
+            type=int,
+            default=20,
+            help="Number of events each attendee selects.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if not Event.objects.exists():
+            raise CommandError("There are no events to select, ingest some first.")
+
+        users, selections = generate_selections(
+            options["users"], options["selections"], options["seed"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {users} attendees and {selections} selections."
+            )
+        )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.jobs import claim_ingest_job, elapsed_seconds, run_ingest_job
+from main.schedule import get_conference
+
+
+class Command(BaseCommand):
+    help = "Parses the schedule data in the talks and presenters directories."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Parse all files, not just the ones that changed since the last run.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of worker processes used for parsing.",
+        )
+        parser.add_argument(
+            "--conference",
+            help="Slug of the conference the data is for. Defaults to the shown conference.",
+        )
+        parser.add_argument("--presenters-dir", default="presenters")
+        parser.add_argument("--talks-dir", default="talks")
+
+    def handle(self, *args, **options):
+        job, created = claim_ingest_job()
+        if not created:
+            raise CommandError(f"Ingest job {job.pk} is already running.")
+
+        job = run_ingest_job(
+            job,
+            presenters_dir=options["presenters_dir"],
+            events_dir=options["talks_dir"],
+            incremental=not options["full"],
+            workers=options["workers"],
+            conference=get_conference(options["conference"]),
+        )
+
+        for error in job.errors:
+            self.stderr.write(error)
+
+        summary = (
+            f"Ingest job {job.pk} {job.status}: {job.files_parsed} files parsed "
+            f"in {elapsed_seconds(job):.2f}s."
+        )
+        if job.status == job.DONE:
+            self.stdout.write(self.style.SUCCESS(summary))
+        else:
+            raise CommandError(summary)
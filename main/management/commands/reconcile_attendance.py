@@ -0,0 +1,43 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from main.attendance import reconcile_attendance
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Recounts the attendees of each event from the selections, correcting drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="Keep running, recounting again after this many seconds.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of events recounted in each transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["interval"]:
+            self.reconcile(options)
+            return
+
+        while True:
+            try:
+                self.reconcile(options)
+            except DatabaseError:
+                # Counts that weren't corrected are corrected by the next run
+                logger.exception("Attendance reconciliation failed")
+            time.sleep(options["interval"])
+
+    def reconcile(self, options):
+        corrected = reconcile_attendance(batch_size=options["batch_size"])
+        self.stdout.write(f"Corrected the attendee counts of {corrected} events.")
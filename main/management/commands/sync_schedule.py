@@ -0,0 +1,107 @@
+import logging
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+from main.jobs import (
+    claim_ingest_job,
+    elapsed_seconds,
+    ingest_pending,
+    run_ingest_job,
+)
+from main.schedule import get_conference
+from main.sync import sync_schedule
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Downloads the schedule data that changed in the upstream conference repo, "
+        "then ingests it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="Keep running, syncing again after this many seconds.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Maximum number of files downloaded at once.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Parse all files after a change, not just the ones that changed.",
+        )
+        parser.add_argument(
+            "--conference",
+            help="Slug of the conference the data is for. Defaults to the shown conference.",
+        )
+        parser.add_argument("--presenters-dir", default="presenters")
+        parser.add_argument("--talks-dir", default="talks")
+
+    def handle(self, *args, **options):
+        if not options["interval"]:
+            try:
+                self.sync(options)
+            except (httpx.HTTPError, ValueError) as e:
+                raise CommandError(f"Sync failed: {e}")
+            return
+
+        while True:
+            try:
+                self.sync(options)
+            except (httpx.HTTPError, ValueError):
+                # The next run starts from the same state, so it tries again
+                logger.exception("Schedule sync failed")
+            time.sleep(options["interval"])
+
+    def sync(self, options):
+        result = sync_schedule(
+            talks_dir=options["talks_dir"],
+            presenters_dir=options["presenters_dir"],
+            concurrency=options["concurrency"],
+        )
+        for error in result.errors:
+            self.stderr.write(error)
+
+        if result.not_modified:
+            self.stdout.write("Upstream schedule not modified.")
+        else:
+            self.stdout.write(
+                f"Downloaded {len(result.downloaded)} files, "
+                f"removed {len(result.removed)} files."
+            )
+        # The files may have changed in an earlier run whose ingest didn't finish
+        if not ingest_pending(result.last_changed):
+            return
+
+        job, created = claim_ingest_job()
+        if not created:
+            # The changes are still pending, so the next run ingests them
+            self.stderr.write(f"Ingest job {job.pk} is already running.")
+            return
+
+        job = run_ingest_job(
+            job,
+            presenters_dir=options["presenters_dir"],
+            events_dir=options["talks_dir"],
+            incremental=not options["full"],
+            conference=get_conference(options["conference"]),
+        )
+        for error in job.errors:
+            self.stderr.write(error)
+
+        summary = (
+            f"Ingest job {job.pk} {job.status}: {job.files_parsed} files parsed "
+            f"in {elapsed_seconds(job):.2f}s."
+        )
+        if job.status == job.DONE:
+            self.stdout.write(self.style.SUCCESS(summary))
+        else:
+            self.stderr.write(summary)
@@ -0,0 +1,138 @@
+"""
+Per-request timing of SQL queries and template rendering, without needing DEBUG.
+"""
+
+import time
+import traceback
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+# Metrics of the request being handled, if any
+current_metrics: ContextVar[Optional["RequestMetrics"]] = ContextVar(
+    "current_metrics", default=None
+)
+
+
+@dataclass
+class RequestMetrics:
+    """
+    What a request spent its time on. Times are in seconds.
+    """
+
+    sample_stacks: bool = False
+    queries: int = 0
+    sql_time: float = 0.0
+    template_time: float = 0.0
+    total_time: float = 0.0
+    slowest_query_time: float = 0.0
+    slowest_query: str = ""
+    slowest_query_stack: list[str] = field(default_factory=list)
+
+    def record_query(self, sql: str, duration: float) -> None:
+        self.queries += 1
+        self.sql_time += duration
+        if duration > self.slowest_query_time:
+            self.slowest_query_time = duration
+            self.slowest_query = sql
+            if self.sample_stacks:
+                self.slowest_query_stack = project_stack()
+
+    def server_timing(self) -> str:
+        """
+        Formats the metrics as a Server-Timing header, with durations in milliseconds.
+        """
+        return ", ".join(
+            [
+                f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.1f}",
+                f"total;dur={self.total_time * 1000:.1f}",
+            ]
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.queries,
+            "sql_ms": round(self.sql_time * 1000, 1),
+            "template_ms": round(self.template_time * 1000, 1),
+            "total_ms": round(self.total_time * 1000, 1),
+        }
+
+
+def project_stack() -> list[str]:
+    """
+    Formats the current stack, keeping only frames from this project's code.
+    """
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base_dir) and "site-packages" not in frame.filename
+    ]
+    return traceback.format_list(frames)
+
+
+class QueryTimer:
+    """
+    Database execute wrapper that records each query's duration on the metrics of the
+    request being handled. It's installed on every connection when it's opened, as async
+    views run their queries on connections of worker threads.
+    """
+
+    def __call__(self, execute, sql, params, many, context):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.record_query(sql, time.perf_counter() - start)
+
+
+def install_query_timer(sender, connection, **kwargs) -> None:
+    """
+    Adds the query timer to a newly opened connection, unless it already has it.
+    """
+    if not any(isinstance(w, QueryTimer) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(QueryTimer())
+
+
+class TimedTemplate:
+    """
+    Wraps a template to add its render time to the request metrics.
+    """
+
+    def __init__(self, template: Template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return self.template.render(context, request)
+
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Django template backend that records template render times.
+    Included templates are rendered as part of their parent, so they aren't counted twice.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
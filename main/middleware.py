@@ -1,16 +1,135 @@
-import zoneinfo
+import json
+import logging
+import time
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.utils import timezone
 
+from .metrics import RequestMetrics, current_metrics
+from .preferences import TIME_ZONE_KEY
+from .timezones import get_zone
+
+logger = logging.getLogger("main.metrics")
+
 
 class TimezoneMiddleware:
+    """
+    Activates the timezone the user picked, which is kept in their session.
+    Sessions are cached, so this doesn't query the database in the common case,
+    and requests without a session don't load one at all.
+    Runs without a thread under ASGI, only the session is loaded in one.
+    """
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        tzname = request.session.get("django_timezone")
-        if not tzname:
-            tzname = "UTC"
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
 
-        timezone.activate(zoneinfo.ZoneInfo(tzname))
+        if self.has_session(request):
+            self.activate(request.session.get(TIME_ZONE_KEY))
+        else:
+            self.activate()
         return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.has_session(request):
+            self.activate(await sync_to_async(request.session.get)(TIME_ZONE_KEY))
+        else:
+            self.activate()
+        return await self.get_response(request)
+
+    def has_session(self, request) -> bool:
+        return settings.SESSION_COOKIE_NAME in request.COOKIES
+
+    def activate(self, tzname: str = None) -> None:
+        timezone.activate(get_zone(tzname or "UTC"))
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the query count, SQL time, template render time and total time of each
+    request. They're sent back in a Server-Timing header and logged as a JSON line.
+
+    Requests slower than the METRICS_SLOW_REQUEST_MS setting also log their slowest
+    query and where it was made from. Streaming responses are only timed until
+    their first byte.
+
+    Queries are recorded by the QueryTimer installed on each connection, which finds
+    the request's metrics through a context variable, so queries that async views run
+    in worker threads are counted too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_time = settings.METRICS_SLOW_REQUEST_MS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics(sample_stacks=self.slow_request_time is not None)
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.total_time = time.perf_counter() - start
+            current_metrics.reset(token)
+
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics(sample_stacks=self.slow_request_time is not None)
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.total_time = time.perf_counter() - start
+            current_metrics.reset(token)
+
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics: RequestMetrics):
+        response["Server-Timing"] = metrics.server_timing()
+        self.log(request, response, metrics)
+        return response
+
+    def log(self, request, response, metrics: RequestMetrics) -> None:
+        match = request.resolver_match
+        line = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            **metrics.as_dict(),
+        }
+        logger.info(json.dumps(line))
+
+        if (
+            self.slow_request_time is not None
+            and metrics.total_time * 1000 > self.slow_request_time
+            and metrics.slowest_query
+        ):
+            logger.warning(
+                "Slow request %s %s took %.1fms, its slowest query took %.1fms:\n%s\n%s",
+                request.method,
+                request.path,
+                metrics.total_time * 1000,
+                metrics.slowest_query_time * 1000,
+                metrics.slowest_query,
+                "".join(metrics.slowest_query_stack),
+            )
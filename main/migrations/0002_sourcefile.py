@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-17 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SourceFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=255)),
+                ("filename", models.CharField(max_length=255)),
+                ("content_hash", models.CharField(max_length=64)),
+                ("last_parsed", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="sourcefile",
+            constraint=models.UniqueConstraint(
+                fields=("kind", "filename"), name="unique_kind_filename"
+            ),
+        ),
+    ]
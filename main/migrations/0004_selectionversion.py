@@ -0,0 +1,31 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("main", "0003_ingestjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SelectionVersion",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("last_updated", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def add_default_conference(apps, schema_editor):
+    """
+    Moves existing events and source files to the configured conference.
+    """
+    Conference = apps.get_model("main", "Conference")
+    Event = apps.get_model("main", "Event")
+    SourceFile = apps.get_model("main", "SourceFile")
+
+    if not Event.objects.exists() and not SourceFile.objects.exists():
+        return
+
+    conference, _ = Conference.objects.get_or_create(
+        slug=settings.CONFERENCE_SLUG,
+        defaults={
+            "name": settings.CONFERENCE_NAME,
+            "time_zone": settings.CONFERENCE_TIME_ZONE,
+        },
+    )
+    Event.objects.update(conference=conference)
+    for kind in ("presenters", "talks"):
+        SourceFile.objects.filter(kind=kind).update(kind=f"{conference.slug}/{kind}")
+
+
+def remove_default_conference(apps, schema_editor):
+    SourceFile = apps.get_model("main", "SourceFile")
+
+    for kind in ("presenters", "talks"):
+        SourceFile.objects.filter(kind__endswith=f"/{kind}").update(kind=kind)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0004_selectionversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Conference",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slug", models.SlugField(unique=True)),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "time_zone",
+                    models.CharField(default="America/New_York", max_length=64),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="conference",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="events",
+                to="main.conference",
+            ),
+        ),
+        migrations.RunPython(add_default_conference, remove_default_conference),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0005_conference"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="event",
+            name="conference",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="events",
+                to="main.conference",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["conference", "start_time"], name="event_conference_start"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="selectevent",
+            index=models.Index(
+                condition=models.Q(("selected", True)),
+                fields=["user"],
+                name="selectevent_user_selected",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:55
+
+from django.db import migrations, models
+
+from main.parsing import hash_text, render_markdown
+
+
+def render_existing(apps, schema_editor):
+    """
+    Renders the descriptions and bios that were ingested before they were rendered.
+    """
+    for model_name, text_field in (("Event", "description"), ("Presenter", "bio")):
+        model = apps.get_model("main", model_name)
+        rows = []
+        for row in model.objects.only("id", text_field).iterator():
+            text = str(getattr(row, text_field) or "")
+            setattr(row, f"{text_field}_html", render_markdown(text))
+            setattr(row, f"{text_field}_hash", hash_text(text))
+            rows.append(row)
+        model.objects.bulk_update(
+            rows, [f"{text_field}_html", f"{text_field}_hash"], batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0006_event_conference_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="description_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="description_html",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="presenter",
+            name="bio_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="presenter",
+            name="bio_html",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:10
+
+from django.db import migrations, models
+
+
+def copy_presenter_names(apps, schema_editor):
+    Event = apps.get_model("main", "Event")
+    through = Event.presenters.through
+
+    names, slugs = {}, {}
+    links = through.objects.order_by("id").values_list(
+        "event_id", "presenter_id", "presenter__name"
+    )
+    for event_id, presenter_id, name in links:
+        names.setdefault(event_id, []).append(name)
+        slugs.setdefault(event_id, []).append(presenter_id)
+
+    Event.objects.bulk_update(
+        [
+            Event(
+                id=event_id,
+                presenter_names=", ".join(names[event_id]),
+                presenter_slugs=sorted(slugs[event_id]),
+            )
+            for event_id in names
+        ],
+        ["presenter_names", "presenter_slugs"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0007_rendered_markdown"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="presenter_names",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="presenter_slugs",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(copy_presenter_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0008_event_presenter_names"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UpstreamSync",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField(max_length=500, unique=True)),
+                ("etag", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "last_modified",
+                    models.CharField(blank=True, default="", max_length=64),
+                ),
+                ("last_checked", models.DateTimeField(blank=True, null=True)),
+                ("last_changed", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.3 on 2026-10-17 06:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("main", "0009_upstreamsync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserPreference",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="preference",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("time_zone", models.CharField(blank=True, default="", max_length=64)),
+                ("default_day", models.DateField(blank=True, null=True)),
+            ],
+        ),
+    ]
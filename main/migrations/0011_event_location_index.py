@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0010_userpreference"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["location", "start_time"], name="event_location_start"
+            ),
+        ),
+    ]
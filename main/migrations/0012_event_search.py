@@ -0,0 +1,90 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:20
+
+from django.db import migrations, models
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('english', title), 'A')
+    || setweight(to_tsvector('english', presenter_names), 'B')
+    || setweight(to_tsvector('english', location), 'B')
+    || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    || setweight(to_tsvector('english', presenter_bios), 'D')
+"""
+
+
+def copy_presenter_bios(apps, schema_editor):
+    Event = apps.get_model("main", "Event")
+    through = Event.presenters.through
+
+    bios = {}
+    links = (
+        through.objects.exclude(presenter__bio=None)
+        .exclude(presenter__bio="")
+        .order_by("id")
+        .values_list("event_id", "presenter__bio")
+    )
+    for event_id, bio in links:
+        bios.setdefault(event_id, []).append(bio)
+
+    Event.objects.bulk_update(
+        [
+            Event(id=event_id, presenter_bios="\n\n".join(event_bios))
+            for event_id, event_bios in bios.items()
+        ],
+        ["presenter_bios"],
+        batch_size=500,
+    )
+
+
+def create_search_index(apps, schema_editor):
+    # The index is kept by the database backend, see main/search.py
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE main_event ADD COLUMN search_vector tsvector"
+        )
+        schema_editor.execute(
+            f"UPDATE main_event SET search_vector = {SEARCH_VECTOR_SQL}"
+        )
+        schema_editor.execute(
+            "CREATE INDEX event_search ON main_event USING gin (search_vector)"
+        )
+    elif schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(
+            """
+            CREATE VIRTUAL TABLE main_event_search USING fts5(
+                event_id UNINDEXED, title, presenters, location, description, bios,
+                tokenize = 'porter unicode61'
+            )
+            """
+        )
+        schema_editor.execute(
+            """
+            INSERT INTO main_event_search
+                (event_id, title, presenters, location, description, bios)
+            SELECT id, title, presenter_names, location,
+                coalesce(description, ''), presenter_bios
+            FROM main_event
+            """
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("ALTER TABLE main_event DROP COLUMN search_vector")
+    elif schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE main_event_search")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0011_event_location_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="presenter_bios",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.RunPython(copy_presenter_bios, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
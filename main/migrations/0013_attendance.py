@@ -0,0 +1,80 @@
+# Generated by Django 5.0.3 on 2026-10-17 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_attendance(apps, schema_editor):
+    EventAttendance = apps.get_model("main", "EventAttendance")
+    SelectEvent = apps.get_model("main", "SelectEvent")
+
+    counts = (
+        SelectEvent.objects.filter(selected=True)
+        .order_by()
+        .values_list("event_id")
+        .annotate(attendees=Count("pk"))
+    )
+    EventAttendance.objects.bulk_create(
+        [
+            EventAttendance(event_id=event_id, attendees=attendees)
+            for event_id, attendees in counts
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0012_event_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventAttendance",
+            fields=[
+                (
+                    "event",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="attendance",
+                        serialize=False,
+                        to="main.event",
+                    ),
+                ),
+                ("attendees", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Room",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                ("capacity", models.PositiveIntegerField()),
+                (
+                    "conference",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rooms",
+                        to="main.conference",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="room",
+            constraint=models.UniqueConstraint(
+                fields=("conference", "name"), name="unique_conference_room"
+            ),
+        ),
+        migrations.RunPython(count_attendance, migrations.RunPython.noop),
+    ]
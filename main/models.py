@@ -2,10 +2,27 @@ from django.conf import settings
 from django.db import models
 
 
+class Conference(models.Model):
+    """
+    A conference whose schedule is loaded.
+    Times in its schedule data files are local to its timezone.
+    """
+
+    slug = models.SlugField(unique=True)
+    name = models.CharField(max_length=255)
+    time_zone = models.CharField(max_length=64, default="America/New_York")
+
+    def __str__(self):
+        return self.name
+
+
 class Presenter(models.Model):
     id = models.CharField(primary_key=True, max_length=255)
     name = models.CharField(max_length=255)
     bio = models.TextField(null=True, blank=True)
+    # Bio rendered from Markdown, and a hash of the bio it was rendered from
+    bio_html = models.TextField(blank=True, default="")
+    bio_hash = models.CharField(max_length=64, blank=True, default="")
 
     def __str__(self):
         return self.name
@@ -13,20 +30,38 @@ class Presenter(models.Model):
 
 class Event(models.Model):
     id = models.CharField(primary_key=True, max_length=255)
+    conference = models.ForeignKey(
+        Conference, on_delete=models.CASCADE, related_name="events"
+    )
     title = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
+    # Description rendered from Markdown, and a hash of the description it was rendered from
+    description_html = models.TextField(blank=True, default="")
+    description_hash = models.CharField(max_length=64, blank=True, default="")
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     presenters = models.ManyToManyField(Presenter, blank=True)
     location = models.CharField(max_length=255)
+    # Copied from the presenters, so the schedule can be read without the join table
+    presenter_names = models.TextField(blank=True, default="")
+    presenter_slugs = models.JSONField(default=list, blank=True)
+    # Also copied from the presenters, for the search index (see search.py)
+    presenter_bios = models.TextField(blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["conference", "start_time"], name="event_conference_start"
+            ),
+            # For filtering by room in the admin
+            models.Index(
+                fields=["location", "start_time"], name="event_location_start"
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def presenter_names(self):
-        return ", ".join([presenter.name for presenter in self.presenters.all()])
-
 
 class SelectEvent(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -37,14 +72,165 @@ class SelectEvent(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["user", "event"], name="unique_user_event")
         ]
+        indexes = [
+            models.Index(
+                fields=["user"],
+                condition=models.Q(selected=True),
+                name="selectevent_user_selected",
+            )
+        ]
 
     def __str__(self):
         return f"{self.event.title} - {self.user}"
 
 
+class Room(models.Model):
+    """
+    A room of a conference. Events are in the room whose name is their location.
+    """
+
+    conference = models.ForeignKey(
+        Conference, on_delete=models.CASCADE, related_name="rooms"
+    )
+    name = models.CharField(max_length=255)
+    # Most attendees the room fits
+    capacity = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["conference", "name"], name="unique_conference_room"
+            )
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class EventAttendance(models.Model):
+    """
+    Counts the users who selected an event, so it can be read without counting
+    selections. It's changed along with the selections, and recounted from them
+    by reconcile_attendance to correct any drift.
+    """
+
+    event = models.OneToOneField(
+        Event, on_delete=models.CASCADE, primary_key=True, related_name="attendance"
+    )
+    attendees = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.event_id}: {self.attendees}"
+
+
 class TableUpdate(models.Model):
     table_name = models.CharField(max_length=255)
     last_updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Last update: {self.last_updated}"
+
+
+class SourceFile(models.Model):
+    """
+    A schedule data file that was parsed, used to skip files that haven't changed since.
+    """
+
+    kind = models.CharField(max_length=255)
+    filename = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64)
+    last_parsed = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "filename"], name="unique_kind_filename"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind}/{self.filename}"
+
+
+class IngestJob(models.Model):
+    """
+    A run of the schedule ingestion. Only one job can be running at a time.
+    """
+
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=RUNNING)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    files_parsed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["status"],
+                condition=models.Q(status="running"),
+                name="single_running_ingest_job",
+            )
+        ]
+
+    def __str__(self):
+        return f"Ingest job {self.pk}: {self.status}"
+
+    @property
+    def is_running(self) -> bool:
+        return self.status == self.RUNNING
+
+
+class SelectionVersion(models.Model):
+    """
+    Counts changes to a user's selected events, so pages can tell if they're out of date.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True
+    )
+    version = models.PositiveBigIntegerField(default=0)
+    last_updated = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user}: {self.version}"
+
+
+class UpstreamSync(models.Model):
+    """
+    When an upstream source of schedule data was last synced, and the validators
+    used to only download it again if it changed.
+    """
+
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    last_checked = models.DateTimeField(null=True, blank=True)
+    last_changed = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.url
+
+
+class UserPreference(models.Model):
+    """
+    Settings a user picked, kept across devices and logins.
+    They're copied into the session at login, requests read them from there.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="preference",
+    )
+    time_zone = models.CharField(max_length=64, blank=True, default="")
+    # Day the select events page opens on, instead of today or the first day
+    default_day = models.DateField(null=True, blank=True)
+
+    def __str__(self):
+        return str(self.user)
@@ -0,0 +1,157 @@
+"""
+Parsing of schedule data files.
+Kept free of Django imports so files can be parsed in worker processes.
+"""
+
+import hashlib
+import multiprocessing
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+import markdown
+import nh3
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML was built without libyaml
+    from yaml import SafeLoader
+
+
+@dataclass(frozen=True)
+class IngestError:
+    """
+    A problem found while ingesting a file.
+    """
+
+    filename: str
+    message: str
+
+    def __str__(self):
+        return f"Error: {self.filename}: {self.message}"
+
+
+@dataclass(frozen=True)
+class IngestWarning(IngestError):
+    """
+    Something in a file that was ingested but should be looked at.
+    """
+
+    def __str__(self):
+        return f"Warning: {self.filename}: {self.message}"
+
+
+@dataclass
+class ParsedFile:
+    """
+    The front matter and body of a schedule data file, and the body rendered to HTML.
+    If the file couldn't be parsed, errors are recorded and attributes is empty.
+    If the body is the same as when it was last rendered, html is None.
+    """
+
+    filename: str
+    attributes: dict = field(default_factory=dict)
+    body: str = "ERROR"
+    body_hash: str = ""
+    html: Optional[str] = None
+    errors: list[IngestError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.attributes)
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def render_markdown(text: str) -> str:
+    """
+    Renders Markdown to HTML, removing anything unsafe like scripts or event handlers.
+    """
+    return nh3.clean(markdown.markdown(text))
+
+
+def parse_file(path: str, rendered_hash: str = "") -> ParsedFile:
+    """
+    Parses a Markdown file with YAML front matter, and renders its body to HTML.
+
+    :param path: Path of the file to parse.
+    :param rendered_hash: Hash of the body that was last rendered for this file, if any.
+        The body isn't rendered again if it's unchanged.
+    :return: The parsed file. Problems are recorded on it rather than raised.
+    """
+    filename = os.path.basename(path)
+    parsed = ParsedFile(filename)
+
+    try:
+        with open(path, "r") as f:
+            data = yaml.load_all(f, Loader=SafeLoader)
+            attributes = next(data)
+            try:
+                parsed.body = next(data)
+            except (StopIteration, yaml.YAMLError) as e:
+                parsed.errors.append(IngestError(filename, f"Invalid body: {e}"))
+
+    except FileNotFoundError:
+        parsed.errors.append(IngestError(filename, "File not found."))
+        return parsed
+    except (StopIteration, yaml.YAMLError) as e:
+        parsed.errors.append(IngestError(filename, f"Invalid front matter: {e}"))
+        return parsed
+
+    if not isinstance(attributes, dict):
+        parsed.errors.append(IngestError(filename, "Front matter is not a mapping."))
+        return parsed
+
+    parsed.attributes = attributes
+    parsed.body_hash = hash_text(str(parsed.body))
+    if parsed.body_hash != rendered_hash:
+        parsed.html = render_markdown(str(parsed.body))
+    return parsed
+
+
+def parse_files(
+    paths: list[str],
+    workers: int = 1,
+    progress: Callable[[int], None] = None,
+    rendered_hashes: dict[str, str] = None,
+) -> list[ParsedFile]:
+    """
+    Parses files, spreading the work over worker processes when there are enough files.
+    Workers are spawned rather than forked, so it's safe to call from a thread.
+
+    :param paths: Paths of the files to parse.
+    :param workers: Maximum number of worker processes. 1 parses in this process.
+    :param progress: Optional callback, called with 1 after each file is parsed.
+    :param rendered_hashes: Path -> hash of the body last rendered for it.
+    :return: The parsed files, in the same order as the paths.
+    """
+    rendered_hashes = rendered_hashes or {}
+    hashes = [rendered_hashes.get(path, "") for path in paths]
+
+    if workers <= 1 or len(paths) < workers * 2:
+        results = map(parse_file, paths, hashes)
+        return list(report_progress(results, progress))
+
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = executor.map(parse_file, paths, hashes, chunksize=chunksize)
+        return list(report_progress(results, progress))
+
+
+def report_progress(
+    results: Iterable[ParsedFile], progress: Callable[[int], None] = None
+) -> Iterator[ParsedFile]:
+    """
+    Calls the progress callback, if any, for each result as it comes in.
+    """
+    for result in results:
+        if progress:
+            progress(1)
+        yield result
@@ -0,0 +1,69 @@
+"""
+Settings users pick, like their timezone. They're saved on the user so they follow
+them across devices and logins, and kept in the session so requests can read them
+without a query.
+"""
+
+from datetime import date
+from typing import Optional
+
+from .models import UserPreference
+
+TIME_ZONE_KEY = "django_timezone"
+DEFAULT_DAY_KEY = "default_day"
+
+# Preference field -> session key
+SESSION_KEYS = {"time_zone": TIME_ZONE_KEY, "default_day": DEFAULT_DAY_KEY}
+
+
+def session_value(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def get_default_day(request) -> Optional[date]:
+    """
+    Gets the day the user wants the select events page to open on, if they picked one.
+    """
+    try:
+        return date.fromisoformat(request.session.get(DEFAULT_DAY_KEY) or "")
+    except ValueError:
+        return None
+
+
+def set_preferences(request, **values) -> bool:
+    """
+    Sets the current visitor's preferences. Only the ones that changed are written,
+    to the session and, for logged-in users, to their saved preferences.
+
+    :param values: Preference field -> value.
+    :return: Whether any preference changed.
+    """
+    changed = {}
+    for field, value in values.items():
+        key = SESSION_KEYS[field]
+        if request.session.get(key) != session_value(value):
+            request.session[key] = session_value(value)
+            changed[field] = value
+
+    if changed and request.user.is_authenticated:
+        UserPreference.objects.update_or_create(user=request.user, defaults=changed)
+    return bool(changed)
+
+
+def load_preferences(sender, request, user, **kwargs) -> None:
+    """
+    Copies a user's saved preferences into their session when they log in.
+    Users without saved preferences keep the ones they picked before logging in.
+    """
+    if request is None:
+        return
+
+    defaults = {field: request.session.get(key) for field, key in SESSION_KEYS.items()}
+    defaults["time_zone"] = defaults["time_zone"] or ""
+    defaults["default_day"] = get_default_day(request)
+    preference, _ = UserPreference.objects.get_or_create(user=user, defaults=defaults)
+
+    for field, key in SESSION_KEYS.items():
+        value = session_value(getattr(preference, field))
+        if request.session.get(key) != value:
+            request.session[key] = value
@@ -0,0 +1,336 @@
+import logging
+from collections.abc import Iterable
+from datetime import date
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.functions import TruncDate
+from django.utils.timezone import get_current_timezone, localdate, localtime
+
+from .models import Conference, Event, SelectEvent, TableUpdate
+from .search import update_search_index
+
+logger = logging.getLogger(__name__)
+
+# Process-local copy of the latest snapshot, saves unpickling it on every request.
+_local_snapshot: tuple[str, list[dict]] = ("", [])
+
+# Process-local schedule days of the latest version, by timezone.
+_local_days: tuple[str, dict[str, list[date]]] = ("", {})
+
+
+def get_conference(slug: str = None) -> Conference:
+    """
+    Gets a conference, creating it if it doesn't exist yet.
+
+    :param slug: Slug of the conference. Defaults to the CONFERENCE_SLUG setting,
+        which is created with the CONFERENCE_NAME and CONFERENCE_TIME_ZONE settings.
+        Other conferences are named after their slug until edited in the admin.
+    """
+    slug = slug or settings.CONFERENCE_SLUG
+    defaults = {"name": slug}
+    if slug == settings.CONFERENCE_SLUG:
+        defaults = {
+            "name": settings.CONFERENCE_NAME,
+            "time_zone": settings.CONFERENCE_TIME_ZONE,
+        }
+
+    conference, _ = Conference.objects.get_or_create(slug=slug, defaults=defaults)
+    return conference
+
+
+def get_schedule_version() -> str:
+    """
+    Gets the current schedule version, which changes whenever the schedule data is updated.
+
+    :return: The last time the event data was updated, or "0" if it never was.
+    """
+    last_updated = (
+        TableUpdate.objects.filter(table_name="Event")
+        .values_list("last_updated", flat=True)
+        .first()
+    )
+    return last_updated.isoformat() if last_updated else "0"
+
+
+async def aget_schedule_version() -> str:
+    """
+    Async version of get_schedule_version.
+    """
+    last_updated = (
+        await TableUpdate.objects.filter(table_name="Event")
+        .values_list("last_updated", flat=True)
+        .afirst()
+    )
+    return last_updated.isoformat() if last_updated else "0"
+
+
+def bump_schedule_version() -> None:
+    """
+    Notes that the schedule data changed, invalidating any cached snapshots.
+    """
+    TableUpdate.objects.update_or_create(table_name="Event")
+
+
+def update_presenter_names(event_ids: Iterable[str]) -> None:
+    """
+    Copies the names, slugs and bios of the events' presenters onto the events,
+    then updates their search index.
+    Names and bios are kept in the order the presenters were added, slugs are sorted.
+    """
+    event_ids = set(event_ids)
+    if not event_ids:
+        return
+
+    names = {event_id: [] for event_id in event_ids}
+    slugs = {event_id: [] for event_id in event_ids}
+    bios = {event_id: [] for event_id in event_ids}
+    links = (
+        Event.presenters.through.objects.filter(event_id__in=event_ids)
+        .order_by("id")
+        .values_list("event_id", "presenter_id", "presenter__name", "presenter__bio")
+    )
+    for event_id, presenter_id, name, bio in links:
+        names[event_id].append(name)
+        slugs[event_id].append(presenter_id)
+        if bio:
+            bios[event_id].append(bio)
+
+    Event.objects.bulk_update(
+        [
+            Event(
+                id=event_id,
+                presenter_names=", ".join(names[event_id]),
+                presenter_slugs=sorted(slugs[event_id]),
+                presenter_bios="\n\n".join(bios[event_id]),
+            )
+            for event_id in event_ids
+        ],
+        ["presenter_names", "presenter_slugs", "presenter_bios"],
+        batch_size=500,
+    )
+    update_search_index(event_ids)
+
+
+def get_presenter_event_ids(presenter_ids: Iterable[str]) -> set[str]:
+    """
+    Gets the IDs of the events the presenters present.
+    """
+    return set(
+        Event.presenters.through.objects.filter(
+            presenter_id__in=presenter_ids
+        ).values_list("event_id", flat=True)
+    )
+
+
+def build_snapshot() -> list[dict]:
+    """
+    Builds the user and timezone independent data for the events of the shown conference
+    in a single query. Presenter names are read from the events themselves.
+    Descriptions are left in the database, they're loaded when they're opened.
+
+    :return: A list of events ordered by start time, with times in UTC.
+    """
+    events_data = (
+        Event.objects.filter(conference__slug=settings.CONFERENCE_SLUG)
+        .only("id", "title", "start_time", "end_time", "location", "presenter_names")
+        .order_by("start_time")
+    )
+
+    return [
+        {
+            "id": event.id,
+            "title": event.title,
+            "start_time": event.start_time,
+            "end_time": event.end_time,
+            "location": event.location,
+            "presenters": event.presenter_names or "-",
+        }
+        for event in events_data
+    ]
+
+
+def get_snapshot(version: str = None) -> list[dict]:
+    """
+    Gets the schedule snapshot for the given version.
+    The snapshot is built once per version and shared between processes through the cache.
+
+    :param version: The schedule version. Looked up if not passed.
+    :return: A list of events ordered by start time, with times in UTC.
+    """
+    global _local_snapshot
+
+    if version is None:
+        version = get_schedule_version()
+
+    key = f"schedule-snapshot:{settings.CONFERENCE_SLUG}:{version}"
+    local_key, snapshot = _local_snapshot
+    if local_key == key:
+        return snapshot
+
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot()
+        cache.set(key, snapshot, settings.SCHEDULE_CACHE_TIMEOUT)
+
+    _local_snapshot = (key, snapshot)
+    return snapshot
+
+
+def get_schedule_days(version: str = None) -> list[date]:
+    """
+    Gets the days the shown conference has events on, in the active timezone.
+    The days are grouped in the database once per version and timezone,
+    and shared between processes through the cache.
+
+    :param version: The schedule version. Looked up if not passed.
+    :return: Dates in ascending order.
+    """
+    global _local_days
+
+    if version is None:
+        version = get_schedule_version()
+
+    tz = get_current_timezone()
+    tzname = str(tz)
+    key = f"schedule-days:{settings.CONFERENCE_SLUG}:{version}"
+
+    local_key, days_by_tz = _local_days
+    if local_key != key:
+        days_by_tz = {}
+        _local_days = (key, days_by_tz)
+    if tzname in days_by_tz:
+        return days_by_tz[tzname]
+
+    tz_key = f"{key}:{tzname}"
+    days = cache.get(tz_key)
+    if days is None:
+        days = list(
+            Event.objects.filter(conference__slug=settings.CONFERENCE_SLUG)
+            .annotate(day=TruncDate("start_time", tzinfo=tz))
+            .values_list("day", flat=True)
+            .distinct()
+            .order_by("day")
+        )
+        cache.set(tz_key, days, settings.SCHEDULE_CACHE_TIMEOUT)
+
+    days_by_tz[tzname] = days
+    return days
+
+
+def get_selected_ids(user) -> set[str]:
+    """
+    Gets the IDs of all events the user has selected in a single query.
+
+    :param user: The user to get the selections for.
+    :return: A set of selected event IDs.
+    """
+    return set(
+        SelectEvent.objects.filter(user=user, selected=True).values_list(
+            "event_id", flat=True
+        )
+    )
+
+
+async def aget_selected_ids(user) -> set[str]:
+    """
+    Async version of get_selected_ids.
+    """
+    selections = SelectEvent.objects.filter(user=user, selected=True).values_list(
+        "event_id", flat=True
+    )
+    return {event_id async for event_id in selections}
+
+
+def event_info(event: dict, selected_ids: set[str]) -> dict:
+    """
+    Builds the template data for a single event from its snapshot data.
+    Times and days are converted to the active timezone.
+
+    :param event: The snapshot data of the event.
+    :param selected_ids: IDs of the events the user has selected.
+    """
+    start_time = localtime(event["start_time"])
+    return {
+        **event,
+        "date": start_time.date(),
+        "day": start_time.strftime("%A"),
+        "start_time": start_time.strftime("%I:%M %p"),
+        "end_time": localtime(event["end_time"]).strftime("%I:%M %p"),
+        "selected": "checked" if event["id"] in selected_ids else "",
+    }
+
+
+def load_schedule(
+    user, version: str = None, selected_ids: set[str] = None
+) -> tuple[dict[date, list[dict]], list[dict]]:
+    """
+    Loads the whole schedule for a user.
+    The shared snapshot is layered with the user's selections, which takes two queries
+    when the snapshot and schedule days are cached:
+        - One for the schedule version.
+        - One for the IDs of the events the user has selected.
+
+    :param user: The user to load the schedule for.
+    :param version: The schedule version. Looked up if not passed.
+    :param selected_ids: IDs of the events the user has selected. Looked up if not passed.
+    :return: A tuple of events grouped by day in the active timezone
+        and the user's selected events.
+    """
+    if version is None:
+        version = get_schedule_version()
+    snapshot = get_snapshot(version)
+    if selected_ids is None:
+        selected_ids = get_selected_ids(user)
+
+    all_events = {day: [] for day in get_schedule_days(version)}
+    all_selected_events = []
+
+    for event in snapshot:
+        info = event_info(event, selected_ids)
+        try:
+            all_events[info["date"]].append(info)
+        except KeyError:
+            # The days and the snapshot are cached separately
+            logger.warning("Day not found for event %s: %s", info["id"], info["date"])
+
+        if info["selected"]:
+            all_selected_events.append(info)
+
+    return all_events, all_selected_events
+
+
+def get_initial_day(days: list[date], default_day: date = None) -> Optional[date]:
+    """
+    Gets the day to show first: the user's default day if they picked one,
+    today during the conference, otherwise its first day.
+    """
+    if default_day in days:
+        return default_day
+    today = localdate()
+    if today in days:
+        return today
+    return days[0] if days else None
+
+
+def load_day(
+    user, day: date, version: str = None, selected_ids: set[str] = None
+) -> list[dict]:
+    """
+    Loads the events of one day in the active timezone for a user.
+
+    :param user: The user to load the events for.
+    :param day: The day to load.
+    :param version: The schedule version. Looked up if not passed.
+    :param selected_ids: IDs of the events the user has selected. Looked up if not passed.
+    :return: The day's events, ordered by start time.
+    """
+    if selected_ids is None:
+        selected_ids = get_selected_ids(user)
+
+    return [
+        event_info(event, selected_ids)
+        for event in get_snapshot(version)
+        if localtime(event["start_time"]).date() == day
+    ]
@@ -0,0 +1,174 @@
+"""
+Full-text search over the events of the shown conference.
+
+The index covers each event's title, presenter names, location, description and
+presenter bios, in that order of weight. It isn't part of the models, it's kept
+by the database backend:
+    - Postgres: the event table's search_vector tsvector column, with a GIN index.
+    - SQLite: the main_event_search FTS5 table.
+Both are updated whenever the presenters are copied onto the events.
+"""
+
+import re
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Conference, Event
+
+# Text search configuration of the Postgres index, and the SQLite FTS5 table
+SEARCH_CONFIG = "english"
+SEARCH_TABLE = "main_event_search"
+
+# Longest query, in words
+MAX_TERMS = 8
+
+SEARCH_VECTOR_SQL = f"""
+    setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A')
+    || setweight(to_tsvector('{SEARCH_CONFIG}', presenter_names), 'B')
+    || setweight(to_tsvector('{SEARCH_CONFIG}', location), 'B')
+    || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')
+    || setweight(to_tsvector('{SEARCH_CONFIG}', presenter_bios), 'D')
+"""
+
+# Column weights of the FTS5 table for ranking, the event ID isn't searched
+FTS_WEIGHTS = (0, 10.0, 5.0, 5.0, 2.0, 1.0)
+
+
+def update_search_index(event_ids: Iterable[str]) -> None:
+    """
+    Updates the search index of the events in a single statement per backend table.
+    Events that no longer exist are dropped from the index.
+    """
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+
+    table = connection.ops.quote_name(Event._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"UPDATE {table} SET search_vector = {SEARCH_VECTOR_SQL} "
+                f"WHERE id = ANY(%s)",
+                [event_ids],
+            )
+        elif connection.vendor == "sqlite":
+            placeholders = ", ".join(["%s"] * len(event_ids))
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE event_id IN ({placeholders})",
+                event_ids,
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {SEARCH_TABLE}
+                    (event_id, title, presenters, location, description, bios)
+                SELECT id, title, presenter_names, location,
+                    coalesce(description, ''), presenter_bios
+                FROM {table} WHERE id IN ({placeholders})
+                """,
+                event_ids,
+            )
+
+
+def search_terms(query: str) -> list[str]:
+    """
+    Splits a search query into words, dropping punctuation so it can't change
+    the meaning of the backend's query syntax.
+    """
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def search_event_ids(query: str, page: int = 1) -> tuple[list[str], bool]:
+    """
+    Finds the events of the shown conference that match all words of a query,
+    best matches first. The last word matches as a prefix, so results show up
+    while it's being typed.
+    On Postgres, only the SEARCH_MAX_MATCHES matches with the lowest IDs are ranked,
+    so a query that matches most of a large archive doesn't take longer than one that
+    matches a few. Ranking takes reading each match's search vector, while picking
+    them by ID only takes the index. The trade-off is that a better match past them
+    isn't found, but the same query always gives the same pages.
+    Either way, no more than SEARCH_MAX_MATCHES results are paged through.
+
+    :param query: The words to search for.
+    :param page: The page of results, starting at 1.
+    :return: A tuple of the IDs of the events on the page, in order, and whether
+        there are more pages.
+    """
+    terms = search_terms(query)
+    if not terms or page < 1:
+        return [], False
+
+    page_size = settings.SEARCH_PAGE_SIZE
+    offset = (page - 1) * page_size
+    if offset >= settings.SEARCH_MAX_MATCHES:
+        return [], False
+    limit = min(page_size + 1, settings.SEARCH_MAX_MATCHES - offset)
+
+    table = connection.ops.quote_name(Event._meta.db_table)
+    conference_table = connection.ops.quote_name(Conference._meta.db_table)
+    conference_sql = f"(SELECT id FROM {conference_table} WHERE slug = %s)"
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            ts_query = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+            cursor.execute(
+                f"""
+                SELECT id FROM (
+                    SELECT id, search_vector FROM {table}
+                    WHERE conference_id = {conference_sql}
+                        AND search_vector @@ to_tsquery('{SEARCH_CONFIG}', %s)
+                    ORDER BY id
+                    LIMIT %s
+                ) AS matches
+                ORDER BY ts_rank(search_vector, to_tsquery('{SEARCH_CONFIG}', %s)) DESC,
+                    id
+                LIMIT %s OFFSET %s
+                """,
+                [
+                    settings.CONFERENCE_SLUG,
+                    ts_query,
+                    settings.SEARCH_MAX_MATCHES,
+                    ts_query,
+                    limit,
+                    offset,
+                ],
+            )
+        else:
+            fts_query = " ".join(
+                [f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*']
+            )
+            weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+            cursor.execute(
+                f"""
+                SELECT matches.event_id FROM (
+                    SELECT event_id, bm25({SEARCH_TABLE}, {weights}) AS score
+                    FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s
+                ) AS matches
+                JOIN {table} ON {table}.id = matches.event_id
+                WHERE {table}.conference_id = {conference_sql}
+                ORDER BY matches.score, matches.event_id
+                LIMIT %s OFFSET %s
+                """,
+                [fts_query, settings.CONFERENCE_SLUG, limit, offset],
+            )
+        event_ids = [row[0] for row in cursor.fetchall()]
+
+    return event_ids[:page_size], len(event_ids) > page_size
+
+
+def search_events(query: str, page: int = 1) -> tuple[list[Event], bool]:
+    """
+    Gets the events of a page of search results, in order. Takes two queries.
+
+    :return: A tuple of the events and whether there are more pages.
+    """
+    event_ids, has_more = search_event_ids(query, page)
+    if not event_ids:
+        return [], has_more
+
+    events = Event.objects.only(
+        "id", "title", "start_time", "end_time", "location", "presenter_names"
+    ).in_bulk(event_ids)
+    return [events[event_id] for event_id in event_ids if event_id in events], has_more
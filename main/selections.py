@@ -0,0 +1,157 @@
+from datetime import datetime
+from typing import Optional
+
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from .attendance import change_attendance
+from .models import Event, SelectEvent, SelectionVersion
+
+
+def bump_selection_version(user_ids: list[int]) -> None:
+    """
+    Notes that the users' selections changed, using a single statement.
+    """
+    if not user_ids:
+        return
+
+    table = connection.ops.quote_name(SelectionVersion._meta.db_table)
+    changed_at = connection.ops.adapt_datetimefield_value(now())
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, version, last_updated)
+            VALUES {", ".join(["(%s, 1, %s)"] * len(user_ids))}
+            ON CONFLICT (user_id)
+            DO UPDATE SET version = {table}.version + 1,
+                last_updated = EXCLUDED.last_updated
+            """,
+            [value for user_id in user_ids for value in (user_id, changed_at)],
+        )
+
+
+def get_selection_version(user) -> tuple[int, Optional[datetime]]:
+    """
+    Gets how many times the user's selections changed and when they last did.
+    """
+    row = (
+        SelectionVersion.objects.filter(user=user)
+        .values_list("version", "last_updated")
+        .first()
+    )
+    return row or (0, None)
+
+
+async def aget_selection_version(user) -> tuple[int, Optional[datetime]]:
+    """
+    Async version of get_selection_version.
+    """
+    row = (
+        await SelectionVersion.objects.filter(user=user)
+        .values_list("version", "last_updated")
+        .afirst()
+    )
+    return row or (0, None)
+
+
+@transaction.atomic
+def toggle_selection(user, event_id: str) -> Optional[bool]:
+    """
+    Flips whether the user has selected an event, using a single atomic statement.
+    The first toggle of an event selects it. Also bumps the user's selection version
+    and changes the event's attendee count. The version is bumped first, so its row
+    is locked before the selection's, in the same order as set_selections.
+
+    :param user: The user toggling the event.
+    :param event_id: ID of the event to toggle.
+    :return: Whether the event is now selected, or None if the event doesn't exist.
+    """
+    table = connection.ops.quote_name(SelectEvent._meta.db_table)
+    event_table = connection.ops.quote_name(Event._meta.db_table)
+
+    bump_selection_version([user.pk])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, event_id, selected)
+            SELECT %s, id, %s FROM {event_table} WHERE id = %s
+            ON CONFLICT (user_id, event_id)
+            DO UPDATE SET selected = NOT {table}.selected
+            RETURNING selected
+            """,
+            [user.pk, True, event_id],
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        # Nothing changed, the version isn't bumped
+        transaction.set_rollback(True)
+        return None
+
+    selected = bool(row[0])
+    change_attendance({event_id: 1 if selected else -1})
+    return selected
+
+
+@transaction.atomic
+def set_selections(user, states: dict[str, bool]) -> dict[str, bool]:
+    """
+    Sets whether the user has selected each of the given events, using a single statement.
+    Events that don't exist are skipped. Also bumps the user's selection version,
+    and changes the attendee counts of the events whose selection changed.
+    Their previous selections are read first, to tell which did. Selections that
+    don't exist yet can't be locked, so the user's selection version is bumped
+    before that instead. Its row stays locked until the transaction ends, so
+    batches of the same user run one after the other and count each change once.
+
+    :param user: The user selecting the events.
+    :param states: Event ID -> whether it should be selected.
+    :return: Event ID -> whether it's now selected, for the events that exist.
+    """
+    if not states:
+        return {}
+
+    table = connection.ops.quote_name(SelectEvent._meta.db_table)
+    event_table = connection.ops.quote_name(Event._meta.db_table)
+
+    selected_ids = [event_id for event_id, selected in states.items() if selected]
+    all_ids = list(states)
+
+    # An empty IN () isn't valid SQL, nothing is selected in that case
+    if selected_ids:
+        selected_sql = f"id IN ({', '.join(['%s'] * len(selected_ids))})"
+    else:
+        selected_sql = "%s"
+        selected_ids = [False]
+
+    bump_selection_version([user.pk])
+    previous = dict(
+        SelectEvent.objects.filter(user=user, event_id__in=all_ids).values_list(
+            "event_id", "selected"
+        )
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, event_id, selected)
+            SELECT %s, id, {selected_sql} FROM {event_table}
+            WHERE id IN ({", ".join(["%s"] * len(all_ids))})
+            ON CONFLICT (user_id, event_id)
+            DO UPDATE SET selected = EXCLUDED.selected
+            RETURNING event_id, selected
+            """,
+            [user.pk, *selected_ids, *all_ids],
+        )
+        rows = cursor.fetchall()
+
+    states = {event_id: bool(selected) for event_id, selected in rows}
+    change_attendance(
+        {
+            event_id: int(selected) - int(previous.get(event_id, False))
+            for event_id, selected in states.items()
+        }
+    )
+
+    return states
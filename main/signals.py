@@ -0,0 +1,42 @@
+"""
+Keeps the presenter names copied onto events in sync with changes made through the ORM.
+Ingestion writes in bulk, which doesn't send signals, so it updates them itself.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Event, Presenter
+from .schedule import get_presenter_event_ids, update_presenter_names
+
+
+@receiver(m2m_changed, sender=Event.presenters.through)
+def event_presenters_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            update_presenter_names([instance.pk])
+        return
+
+    # Changed from the presenter's side, pk_set holds event IDs
+    if action == "pre_clear":
+        instance._cleared_event_ids = get_presenter_event_ids([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        update_presenter_names(pk_set)
+    elif action == "post_clear":
+        update_presenter_names(getattr(instance, "_cleared_event_ids", []))
+
+
+@receiver(post_save, sender=Presenter)
+def presenter_saved(sender, instance, created, **kwargs):
+    if not created:
+        update_presenter_names(get_presenter_event_ids([instance.pk]))
+
+
+@receiver(pre_delete, sender=Presenter)
+def presenter_deleting(sender, instance, **kwargs):
+    instance._deleted_event_ids = get_presenter_event_ids([instance.pk])
+
+
+@receiver(post_delete, sender=Presenter)
+def presenter_deleted(sender, instance, **kwargs):
+    update_presenter_names(getattr(instance, "_deleted_event_ids", []))
@@ -0,0 +1,238 @@
+"""
+Downloads the schedule data files from the upstream conference repo.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+import httpx
+from django.conf import settings
+from django.utils.timezone import now
+
+from .models import UpstreamSync
+
+
+@dataclass(frozen=True)
+class Upstream:
+    """
+    Where the schedule data files are published. Defaults to the GitHub repo.
+    """
+
+    repo: str
+    ref: str
+    talks_path: str
+    presenters_path: str
+    api_url: str = "https://api.github.com"
+    raw_url: str = "https://raw.githubusercontent.com"
+    token: str = ""
+
+    @classmethod
+    def from_settings(cls) -> "Upstream":
+        return cls(
+            repo=settings.SCHEDULE_SYNC_REPO,
+            ref=settings.SCHEDULE_SYNC_REF,
+            talks_path=settings.SCHEDULE_SYNC_TALKS_PATH,
+            presenters_path=settings.SCHEDULE_SYNC_PRESENTERS_PATH,
+            api_url=settings.SCHEDULE_SYNC_API_URL,
+            raw_url=settings.SCHEDULE_SYNC_RAW_URL,
+            token=settings.SCHEDULE_SYNC_TOKEN,
+        )
+
+    @property
+    def tree_url(self) -> str:
+        return f"{self.api_url}/repos/{self.repo}/git/trees/{self.ref}?recursive=1"
+
+    def file_url(self, path: str) -> str:
+        return f"{self.raw_url}/{self.repo}/{self.ref}/{path}"
+
+
+@dataclass
+class SyncResult:
+    """
+    What a sync changed in the local data directories.
+    """
+
+    not_modified: bool = False
+    last_changed: Optional[datetime] = None
+    downloaded: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.downloaded or self.removed)
+
+
+def git_blob_hash(data: bytes) -> str:
+    """
+    Hashes file contents the way git does, so local files can be compared with the tree.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def local_hashes(directory: str) -> dict[str, str]:
+    """
+    Gets the git blob hash of each Markdown file in a directory.
+
+    :return: Filename -> hash.
+    """
+    if not os.path.isdir(directory):
+        return {}
+
+    hashes = {}
+    for file in os.listdir(directory):
+        if file.endswith(".md"):
+            with open(os.path.join(directory, file), "rb") as f:
+                hashes[file] = git_blob_hash(f.read())
+    return hashes
+
+
+def upstream_files(tree: list[dict], path: str) -> dict[str, str]:
+    """
+    Gets the Markdown files directly inside a path of a git tree listing.
+
+    :return: Filename -> git blob hash.
+    """
+    prefix = path.rstrip("/") + "/"
+    return {
+        entry["path"][len(prefix) :]: entry["sha"]
+        for entry in tree
+        if entry.get("type") == "blob"
+        and entry["path"].startswith(prefix)
+        and entry["path"].endswith(".md")
+        and "/" not in entry["path"][len(prefix) :]
+    }
+
+
+def fetch_tree(
+    client: httpx.Client, upstream: Upstream
+) -> tuple[Optional[list[dict]], UpstreamSync]:
+    """
+    Gets the upstream tree listing, unless it hasn't changed since the last sync.
+    The request is conditional on the ETag and Last-Modified date of the last one.
+
+    :return: The tree entries, or None if it didn't change, and the sync state.
+        The state's new ETag and Last-Modified date aren't saved yet.
+    """
+    state, _ = UpstreamSync.objects.get_or_create(url=upstream.tree_url)
+
+    headers = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+
+    response = client.get(upstream.tree_url, headers=headers)
+    state.last_checked = now()
+    if response.status_code == httpx.codes.NOT_MODIFIED:
+        state.save(update_fields=["last_checked"])
+        return None, state
+
+    response.raise_for_status()
+    data = response.json()
+    if data.get("truncated"):
+        raise ValueError("The upstream tree listing is too large to sync.")
+
+    state.etag = response.headers.get("ETag", "")
+    state.last_modified = response.headers.get("Last-Modified", "")
+    return data["tree"], state
+
+
+def download(client: httpx.Client, url: str, path: str, expected_hash: str) -> None:
+    """
+    Downloads a file, replacing the local copy only once it's complete and verified.
+    """
+    response = client.get(url)
+    response.raise_for_status()
+    data = response.content
+    if git_blob_hash(data) != expected_hash:
+        raise ValueError(f"Downloaded {url} doesn't match the upstream hash.")
+
+    partial = f"{path}.part"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def sync_schedule(
+    talks_dir: str = "talks",
+    presenters_dir: str = "presenters",
+    upstream: Upstream = None,
+    concurrency: int = None,
+) -> SyncResult:
+    """
+    Brings the local talks and presenters directories up to date with the upstream repo.
+    The tree listing is only downloaded when it changed, and only files whose git hash
+    differs from the local copy are downloaded, over a shared pool of connections.
+    Local files that are no longer upstream are removed.
+
+    :param talks_dir: Directory to keep the talks in.
+    :param presenters_dir: Directory to keep the presenters in.
+    :param upstream: Where to sync from. Defaults to the SCHEDULE_SYNC settings.
+    :param concurrency: Maximum number of downloads at once.
+        Defaults to the SCHEDULE_SYNC_CONCURRENCY setting.
+    :return: The files that were downloaded and removed, any errors, and when the
+        local files last changed, so they can be ingested if they weren't yet.
+    """
+    upstream = upstream or Upstream.from_settings()
+    concurrency = concurrency or settings.SCHEDULE_SYNC_CONCURRENCY
+    result = SyncResult()
+
+    headers = {"User-Agent": "schedule_maker_9000"}
+    if upstream.token:
+        headers["Authorization"] = f"Bearer {upstream.token}"
+
+    with httpx.Client(
+        headers=headers,
+        timeout=settings.SCHEDULE_SYNC_TIMEOUT,
+        limits=httpx.Limits(max_connections=concurrency),
+        follow_redirects=True,
+    ) as client:
+        tree, state = fetch_tree(client, upstream)
+        result.last_changed = state.last_changed
+        if tree is None:
+            result.not_modified = True
+            return result
+
+        downloads = []
+        for directory, path in (
+            (talks_dir, upstream.talks_path),
+            (presenters_dir, upstream.presenters_path),
+        ):
+            os.makedirs(directory, exist_ok=True)
+            remote = upstream_files(tree, path)
+            local = local_hashes(directory)
+
+            for file, blob_hash in remote.items():
+                if local.get(file) != blob_hash:
+                    downloads.append(
+                        (f"{path}/{file}", os.path.join(directory, file), blob_hash)
+                    )
+            for file in local.keys() - remote.keys():
+                os.remove(os.path.join(directory, file))
+                result.removed.append(os.path.join(directory, file))
+
+        def fetch(item: tuple[str, str, str]) -> None:
+            remote_path, local_path, blob_hash = item
+            try:
+                download(client, upstream.file_url(remote_path), local_path, blob_hash)
+                result.downloaded.append(local_path)
+            except (httpx.HTTPError, ValueError) as e:
+                result.errors.append(f"Error: {remote_path}: {e}")
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(fetch, downloads))
+
+    if result.changed:
+        state.last_changed = result.last_changed = now()
+    # Files that failed are tried again next time, so the tree can't be skipped then
+    if not result.errors:
+        state.save()
+    elif result.changed:
+        state.save(update_fields=["last_changed"])
+
+    return result
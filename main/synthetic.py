@@ -0,0 +1,160 @@
+"""
+Generates synthetic conference data, for measuring how the app scales.
+"""
+
+import math
+import os
+import random
+from datetime import datetime, timedelta
+
+import yaml
+from django.contrib.auth import get_user_model
+
+from .attendance import reconcile_attendance
+from .models import Event, SelectEvent
+from .selections import bump_selection_version
+
+WORDS = (
+    "django python async query cache index template model view form admin "
+    "migration signal middleware deploy scale test type packaging community "
+    "database postgres sqlite htmx api security performance profile debug "
+    "release library framework request response session queue worker stream"
+).split()
+
+# Slots start on the hour, leaving a break between talks
+SLOT_LENGTH = timedelta(minutes=45)
+SLOTS_PER_DAY = 9
+FIRST_SLOT_HOUR = 9
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text.capitalize() + "."
+
+
+def paragraphs(rng: random.Random, count: int) -> str:
+    return "\n\n".join(
+        " ".join(sentence(rng, rng.randint(6, 16)) for _ in range(rng.randint(3, 6)))
+        for _ in range(count)
+    )
+
+
+def write_markdown(path: str, attributes: dict, body: str) -> None:
+    """
+    Writes a Markdown file with YAML front matter, like the ones in the conference repo.
+    """
+    with open(path, "w") as f:
+        f.write("---\n")
+        f.write(yaml.safe_dump(attributes, sort_keys=False))
+        f.write("---\n")
+        f.write(body + "\n")
+
+
+def generate_conference(
+    output_dir: str,
+    talks: int = 5000,
+    presenters: int = 2000,
+    days: int = 3,
+    paragraphs_per_file: int = 3,
+    start_date: datetime = datetime(2024, 9, 23),
+    seed: int = 0,
+) -> tuple[str, str]:
+    """
+    Writes talks and presenters directories of Markdown files.
+    Talks are spread over enough rooms to fit them all in the given days.
+
+    :param output_dir: Directory to create the talks and presenters directories in.
+    :param talks: Number of talks.
+    :param presenters: Number of presenters.
+    :param days: Number of conference days.
+    :param paragraphs_per_file: Paragraphs in each description and bio.
+    :param start_date: First day of the conference.
+    :param seed: Seed for the random data, so runs can be compared.
+    :return: A tuple of the talks and presenters directories.
+    """
+    rng = random.Random(seed)
+    talks_dir = os.path.join(output_dir, "talks")
+    presenters_dir = os.path.join(output_dir, "presenters")
+    os.makedirs(talks_dir, exist_ok=True)
+    os.makedirs(presenters_dir, exist_ok=True)
+
+    slugs = [f"presenter-{i:05}" for i in range(presenters)]
+    for slug in slugs:
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}"
+        write_markdown(
+            os.path.join(presenters_dir, f"{slug}.md"),
+            {"name": name},
+            paragraphs(rng, paragraphs_per_file),
+        )
+
+    slots = days * SLOTS_PER_DAY
+    rooms = max(1, math.ceil(talks / slots))
+    for i in range(talks):
+        day, slot = divmod(i // rooms % slots, SLOTS_PER_DAY)
+        start_time = start_date + timedelta(days=day, hours=FIRST_SLOT_HOUR + slot)
+        write_markdown(
+            os.path.join(talks_dir, f"talk-{i:05}.md"),
+            {
+                "title": sentence(rng, rng.randint(3, 8)).rstrip("."),
+                "start_datetime": start_time,
+                "end_datetime": start_time + SLOT_LENGTH,
+                "room": f"Room {i % rooms + 1}",
+                "presenter_slugs": rng.sample(
+                    slugs, min(len(slugs), rng.randint(1, 3))
+                ),
+            },
+            paragraphs(rng, paragraphs_per_file),
+        )
+
+    return talks_dir, presenters_dir
+
+
+def generate_selections(
+    users: int = 1000, selections_per_user: int = 20, seed: int = 0
+) -> tuple[int, int]:
+    """
+    Creates attendees who have each selected random events.
+    Existing synthetic attendees are reused, so it can be run again after an ingest.
+
+    :param users: Number of attendees.
+    :param selections_per_user: Number of events each attendee selects.
+    :param seed: Seed for the random data, so runs can be compared.
+    :return: A tuple of the number of attendees created and selections made.
+    """
+    rng = random.Random(seed)
+    user_model = get_user_model()
+    usernames = [f"attendee-{i:05}" for i in range(users)]
+
+    existing = set(
+        user_model.objects.filter(username__in=usernames).values_list(
+            "username", flat=True
+        )
+    )
+    new_users = []
+    for username in usernames:
+        if username not in existing:
+            user = user_model(username=username)
+            user.set_unusable_password()
+            new_users.append(user)
+    user_model.objects.bulk_create(new_users, batch_size=1000)
+
+    user_ids = list(
+        user_model.objects.filter(username__in=usernames)
+        .order_by("username")
+        .values_list("pk", flat=True)
+    )
+    event_ids = list(Event.objects.order_by("id").values_list("id", flat=True))
+    per_user = min(selections_per_user, len(event_ids))
+
+    selections = [
+        SelectEvent(user_id=user_id, event_id=event_id, selected=True)
+        for user_id in user_ids
+        for event_id in rng.sample(event_ids, per_user)
+    ]
+    SelectEvent.objects.bulk_create(selections, batch_size=1000, ignore_conflicts=True)
+    for start in range(0, len(user_ids), 1000):
+        bump_selection_version(user_ids[start : start + 1000])
+    # Selections that already existed aren't inserted, so the counts are recounted
+    reconcile_attendance()
+
+    return len(new_users), len(selections)
@@ -1,3 +1,2054 @@
-from django.test import TestCase
+import gzip
+import json
+import random
+import tempfile
+import threading
+import warnings
+from datetime import UTC, date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import api, fragments, intervals, schedule
+from .attendance import (
+    change_attendance,
+    get_attendance_report,
+    reconcile_attendance,
+)
+from .benchmark import benchmark_ingest, benchmark_requests
+from .ical import fold_line
+from .ingest import ingest_schedule
+from .intervals import ScheduleIndex, build_tree, find_conflicts, stab
+from .jobs import claim_ingest_job, run_ingest_job
+from .models import (
+    Event,
+    EventAttendance,
+    IngestJob,
+    Presenter,
+    Room,
+    SelectEvent,
+    SelectionVersion,
+    SourceFile,
+    TableUpdate,
+    UpstreamSync,
+    UserPreference,
+)
+from .parsing import IngestError, IngestWarning, parse_file, parse_files
+from .schedule import (
+    bump_schedule_version,
+    get_conference,
+    get_schedule_version,
+    get_selected_ids,
+    get_snapshot,
+    load_schedule,
+)
+from .search import search_event_ids
+from .selections import get_selection_version, set_selections, toggle_selection
+from .sync import Upstream, git_blob_hash, sync_schedule
+from .synthetic import generate_conference, generate_selections
+from .timezones import get_registry, get_zone
+from .views import get_context, get_feed_token
+
+# Monday, 09/23/2024
+CONFERENCE_START = datetime(2024, 9, 23, 9, tzinfo=ZoneInfo("America/New_York"))
+
+
+def make_events(count: int, start: int = 0) -> list[Event]:
+    """
+    Creates events with one presenter each, spread over the conference days.
+    """
+    events = []
+    for i in range(start, start + count):
+        start_time = CONFERENCE_START + timedelta(days=i % 3, minutes=30 * (i // 3))
+        presenter = Presenter.objects.create(id=f"presenter-{i}", name=f"P{i}")
+        event = Event.objects.create(
+            id=f"event-{i}",
+            conference=get_conference(),
+            title=f"Event {i}",
+            description="Description",
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=25),
+            location="Room 1",
+        )
+        event.presenters.add(presenter)
+        events.append(event)
+
+    bump_schedule_version()
+    return events
+
+
+def clear_schedule_cache():
+    """
+    Clears the shared cache and this process's copy of the schedule snapshot.
+    """
+    cache.clear()
+    schedule._local_snapshot = ("", [])
+    schedule._local_days = ("", {})
+    intervals._local_index = ("", None)
+
+
+async def read_streaming_content(response) -> str:
+    """
+    Reads the content of a streaming response from the async test client.
+    """
+    return b"".join([chunk async for chunk in response.streaming_content]).decode()
+    api._local_schedule_json = ("", None)
+    fragments._fragments.clear()
+
+
+class LoadScheduleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+
+    def setUp(self):
+        clear_schedule_cache()
+
+    def count_queries(self) -> int:
+        clear_schedule_cache()
+        with CaptureQueriesContext(connection) as queries:
+            load_schedule(self.user)
+        return len(queries)
+
+    def test_query_count_is_constant(self):
+        make_events(3)
+        small = self.count_queries()
+
+        events = make_events(30, start=3)
+        SelectEvent.objects.create(user=self.user, event=events[0], selected=True)
+        SelectEvent.objects.create(user=self.user, event=events[1], selected=False)
+
+        self.assertEqual(self.count_queries(), small)
+
+    def test_groups_events_and_marks_selected(self):
+        events = make_events(6)
+        SelectEvent.objects.create(user=self.user, event=events[4], selected=True)
+
+        all_events, all_selected_events = load_schedule(self.user)
+
+        self.assertEqual([len(all_events[day]) for day in all_events], [2, 2, 2])
+        self.assertEqual([e["id"] for e in all_selected_events], ["event-4"])
+        self.assertEqual(all_selected_events[0]["selected"], "checked")
+        self.assertEqual(all_selected_events[0]["presenters"], "P4")
+
+    def test_events_outside_the_days_are_logged(self):
+        make_events(2)
+
+        with (
+            mock.patch("main.schedule.get_schedule_days", return_value=[]),
+            self.assertLogs("main.schedule", "WARNING") as logs,
+        ):
+            all_events, _ = load_schedule(self.user)
+
+        self.assertEqual(all_events, {})
+        self.assertIn("Day not found for event event-0", logs.records[0].getMessage())
+
+    def test_days_come_from_the_data(self):
+        make_events(3)
+        thursday = CONFERENCE_START + timedelta(days=3)
+        Event.objects.create(
+            id="thursday",
+            conference=get_conference(),
+            title="Sprints",
+            start_time=thursday,
+            end_time=thursday + timedelta(hours=8),
+            location="Room 1",
+        )
+        bump_schedule_version()
+
+        all_events, _ = load_schedule(self.user)
+
+        self.assertEqual(
+            [(day.strftime("%A"), len(events)) for day, events in all_events.items()],
+            [("Monday", 1), ("Tuesday", 1), ("Wednesday", 1), ("Thursday", 1)],
+        )
+
+    def test_days_are_in_the_active_timezone(self):
+        make_events(1)
+        late = CONFERENCE_START + timedelta(hours=2, minutes=30)
+        Event.objects.create(
+            id="late",
+            conference=get_conference(),
+            title="Late",
+            start_time=late,
+            end_time=late + timedelta(minutes=25),
+            location="Room 1",
+        )
+        bump_schedule_version()
+
+        with timezone.override(ZoneInfo("America/New_York")):
+            all_events, _ = load_schedule(self.user)
+            self.assertEqual([day.strftime("%A") for day in all_events], ["Monday"])
+
+        # 11:30 on Monday in New York is 0:30 on Tuesday in Tokyo
+        with timezone.override(ZoneInfo("Asia/Tokyo")):
+            all_events, _ = load_schedule(self.user)
+            self.assertEqual(
+                [day.strftime("%A") for day in all_events], ["Monday", "Tuesday"]
+            )
+            self.assertEqual(all_events[list(all_events)[1]][0]["id"], "late")
+
+    def test_other_conferences_are_not_shown(self):
+        make_events(3)
+        other = get_conference("djangocon-us-2023")
+        Event.objects.filter(id="event-0").update(conference=other)
+        bump_schedule_version()
+
+        all_events, _ = load_schedule(self.user)
+
+        self.assertEqual(sum(len(events) for events in all_events.values()), 2)
+
+
+class ScheduleSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+
+    def setUp(self):
+        clear_schedule_cache()
+
+    def test_snapshot_is_reused_until_schedule_changes(self):
+        make_events(3)
+        load_schedule(self.user)
+
+        # Only the schedule version and the user's selections are queried.
+        with self.assertNumQueries(2):
+            load_schedule(self.user)
+
+        make_events(3, start=3)
+        self.assertEqual(len(get_snapshot()), 6)
+
+    def test_snapshot_is_shared_through_cache(self):
+        make_events(3)
+        get_snapshot()
+
+        # Simulates another worker process with nothing cached locally.
+        schedule._local_snapshot = ("", [])
+        with self.assertNumQueries(1):
+            self.assertEqual(len(get_snapshot()), 3)
+
+    def test_selection_is_layered_per_user(self):
+        events = make_events(3)
+        other_user = get_user_model().objects.create_user("other")
+        SelectEvent.objects.create(user=other_user, event=events[0], selected=True)
+
+        _, selected = load_schedule(self.user)
+        _, other_selected = load_schedule(other_user)
+
+        self.assertEqual(selected, [])
+        self.assertEqual([e["id"] for e in other_selected], ["event-0"])
+
+
+def write_file(directory: Path, name: str, content: str) -> None:
+    (directory / name).write_text(content)
+
+
+def talk(title: str, presenters: list[str], day: int = 23) -> str:
+    return (
+        f"---\ntitle: {title}\n"
+        f"start_datetime: 2024-09-{day} 10:00:00\n"
+        f"end_datetime: 2024-09-{day} 10:45:00\n"
+        f"room: Room 1\npresenter_slugs: {presenters}\n---\n"
+        f"About {title}\n"
+    )
+
+
+def presenter(name: str) -> str:
+    return f"---\nname: {name}\n---\nBio of {name}\n"
+
+
+class IngestScheduleTests(TestCase):
+    def setUp(self):
+        clear_schedule_cache()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.talks = Path(tmp.name) / "talks"
+        self.presenters = Path(tmp.name) / "presenters"
+        self.talks.mkdir()
+        self.presenters.mkdir()
+
+        write_file(self.presenters, "ada.md", presenter("Ada"))
+        write_file(self.presenters, "bob.md", presenter("Bob"))
+        write_file(self.talks, "one.md", talk("One", ["ada"]))
+        write_file(self.talks, "two.md", talk("Two", ["bob"]))
+
+    def ingest(self, incremental: bool = True) -> list[str]:
+        return ingest_schedule(str(self.presenters), str(self.talks), incremental)
+
+    def test_initial_ingest(self):
+        self.assertEqual(self.ingest(), [])
+
+        event = Event.objects.get(id="one")
+        self.assertEqual(event.title, "One")
+        self.assertEqual(event.presenter_names, "Ada")
+        self.assertEqual(SourceFile.objects.count(), 4)
+
+    def test_unchanged_files_are_skipped(self):
+        self.ingest()
+        version = get_schedule_version()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.ingest(), [])
+
+        self.assertEqual(get_schedule_version(), version)
+        self.assertFalse(any("INSERT" in q["sql"] for q in queries))
+
+    def test_selections_survive_refresh(self):
+        self.ingest()
+        user = get_user_model().objects.create_user("attendee")
+        SelectEvent.objects.create(user=user, event_id="one", selected=True)
+        SelectEvent.objects.create(user=user, event_id="two", selected=True)
+
+        write_file(self.talks, "one.md", talk("One Updated", ["ada", "bob"]))
+        (self.talks / "two.md").unlink()
+        self.ingest()
+
+        event = Event.objects.get(id="one")
+        self.assertEqual(event.title, "One Updated")
+        self.assertEqual(event.presenter_names, "Ada, Bob")
+        self.assertFalse(Event.objects.filter(id="two").exists())
+        self.assertEqual(
+            list(SelectEvent.objects.values_list("event_id", flat=True)), ["one"]
+        )
+
+    def test_invalid_files_are_reported(self):
+        write_file(self.talks, "bad.md", "---\ntitle: No times\n---\n")
+
+        errors = self.ingest()
+
+        self.assertEqual(errors, [IngestError("bad.md", "Missing start or end time.")])
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_unknown_presenters_are_reported(self):
+        write_file(self.talks, "three.md", talk("Three", ["ada", "nobody", "ada"]))
+
+        errors = self.ingest()
+
+        self.assertEqual(
+            errors, [IngestWarning("three.md", "Unknown presenter: nobody")]
+        )
+        self.assertEqual(Event.objects.get(id="three").presenter_names, "Ada")
+
+    def test_linking_query_count_is_constant(self):
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as queries:
+                self.ingest(incremental=False)
+            return len(queries)
+
+        self.ingest()
+        write_file(self.talks, "extra.md", talk("Extra", ["ada", "bob"]))
+        small = count_queries()
+        for i in range(20):
+            write_file(self.talks, f"extra-{i}.md", talk(f"Extra {i}", ["ada", "bob"]))
+
+        self.assertEqual(count_queries(), small)
+
+    def test_renamed_presenters_are_copied_onto_events(self):
+        write_file(self.talks, "one.md", talk("One", ["bob", "ada"]))
+        self.ingest()
+        event = Event.objects.get(id="one")
+        self.assertEqual(event.presenter_names, "Bob, Ada")
+        self.assertEqual(event.presenter_slugs, ["ada", "bob"])
+
+        write_file(self.presenters, "ada.md", presenter("Ada Lovelace"))
+        self.ingest()
+        self.assertEqual(
+            Event.objects.get(id="one").presenter_names, "Bob, Ada Lovelace"
+        )
+
+        (self.presenters / "bob.md").unlink()
+        self.ingest()
+        event = Event.objects.get(id="one")
+        self.assertEqual(event.presenter_names, "Ada Lovelace")
+        self.assertEqual(event.presenter_slugs, ["ada"])
+
+    def test_bodies_are_rendered_once(self):
+        self.ingest()
+        self.assertEqual(
+            Event.objects.get(id="one").description_html, "<p>About One</p>"
+        )
+        self.assertEqual(Presenter.objects.get(id="ada").bio_html, "<p>Bio of Ada</p>")
+
+        # Only the time changes, so the stored HTML is kept without rendering it again
+        Event.objects.filter(id="one").update(description_html="<p>Kept</p>")
+        write_file(self.talks, "one.md", talk("One", ["ada"], day=24))
+        self.ingest(incremental=False)
+
+        event = Event.objects.get(id="one")
+        self.assertEqual(event.start_time.day, 24)
+        self.assertEqual(event.description_html, "<p>Kept</p>")
+
+    def test_conference_time_zone(self):
+        conference = get_conference("djangocon-europe-2024")
+        conference.time_zone = "Europe/Madrid"
+        conference.save()
+
+        ingest_schedule(str(self.presenters), str(self.talks), conference=conference)
+
+        event = Event.objects.get(id="one")
+        self.assertEqual(event.conference, conference)
+        self.assertEqual(event.start_time, datetime(2024, 9, 23, 8, tzinfo=UTC))
+
+    def test_conferences_are_ingested_separately(self):
+        self.ingest()
+        other = tempfile.TemporaryDirectory()
+        self.addCleanup(other.cleanup)
+        talks = Path(other.name)
+        write_file(talks, "one.md", talk("Taken", []))
+        write_file(talks, "three.md", talk("Three", ["ada"]))
+
+        errors = ingest_schedule(
+            str(self.presenters), str(talks), conference=get_conference("other")
+        )
+
+        self.assertEqual(
+            errors,
+            [IngestError("one.md", "Event ID is already used by another conference.")],
+        )
+        # Events of the first conference aren't removed
+        self.assertEqual(
+            dict(Event.objects.values_list("id", "conference__slug")),
+            {"one": "djangocon-us-2024", "two": "djangocon-us-2024", "three": "other"},
+        )
+
+    def test_new_presenter_is_linked_to_unchanged_event(self):
+        write_file(self.talks, "three.md", talk("Three", ["cat"]))
+        self.ingest()
+        self.assertEqual(Event.objects.get(id="three").presenter_names, "")
+
+        write_file(self.presenters, "cat.md", presenter("Cat"))
+        self.ingest()
+        self.assertEqual(Event.objects.get(id="three").presenter_names, "Cat")
+
+
+class PageQueryBudgetTests(TestCase):
+    """
+    Each page only loads the data it shows.
+    Every request also loads the user. Sessions are read from the cache.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        events = make_events(30)
+        SelectEvent.objects.create(user=cls.user, event=events[0], selected=True)
+        TableUpdate.objects.create(table_name="EventsExist")
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.client.force_login(self.user)
+
+    def assertQueryBudget(self, url_name: str, budget: int):
+        # Warm up the schedule snapshot, which is shared by all requests
+        self.client.get(reverse(url_name))
+        with self.assertNumQueries(budget):
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_index(self):
+        # User, events exist
+        response = self.assertQueryBudget("home", 2)
+        self.assertContains(response, "Data loaded")
+
+    def test_select_events(self):
+        # User, schedule version, selection version, selected IDs
+        response = self.assertQueryBudget("select_events", 4)
+        self.assertContains(response, 'id="eventevent-0" checked')
+
+    def test_selected_events(self):
+        # User, schedule version, selection version, selected IDs
+        response = self.assertQueryBudget("selected_events", 4)
+        self.assertContains(response, "Event 0")
+        self.assertNotContains(response, "Event 1<")
+
+    def test_unused_pieces_are_not_loaded(self):
+        context = get_context(RequestFactory().get("/"), "events_exist", "all_events")
+
+        with self.assertNumQueries(1):
+            self.assertTrue(context["events_exist"])
+
+
+class ConditionalPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        make_events(3)
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.client.force_login(self.user)
+
+    def test_unchanged_page_is_not_modified(self):
+        url = reverse("select_events")
+        etag = self.client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers={"if_none_match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any("main_selectevent" in q["sql"] for q in queries))
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_changes_are_modified(self):
+        url = reverse("select_events")
+        etag = self.client.get(url)["ETag"]
+
+        toggle_selection(self.user, "event-0")
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'id="eventevent-0" checked')
+
+        etag = response["ETag"]
+        self.client.post(reverse("change_tz"), {"select-tz": "Europe/Berlin"})
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        bump_schedule_version()
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_logging_in_again_is_modified(self):
+        url = reverse("select_events")
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        # The page's CSRF token isn't valid after the secret is rotated at login
+        self.client.logout()
+        self.client.force_login(self.user)
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(url, headers={"if_none_match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_only_the_etag_is_validated(self):
+        # The dates can't tell when the timezone changes or the CSRF secret rotates
+        url = reverse("select_events")
+        response = self.client.get(url)
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        since = http_date(timezone.now().timestamp())
+        response = self.client.get(url, headers={"if_modified_since": since})
+        self.assertEqual(response.status_code, 200)
+
+
+class AsyncViewTests(TestCase):
+    """
+    Requests through the async request handler, like under the ASGI server.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        make_events(3)
+
+    def setUp(self):
+        clear_schedule_cache()
+
+    async def test_login_is_required(self):
+        response = await self.async_client.get(reverse("select_events"))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], "/admin/login/?next=/select_events")
+
+    async def test_toggle_and_conditional_page(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse("selected_events")
+        etag = (await self.async_client.get(url))["ETag"]
+
+        response = await self.async_client.post(
+            reverse("select_event", args=["event-0"])
+        )
+        self.assertContains(response, 'id="eventevent-0" checked')
+
+        response = await self.async_client.get(url, headers={"if_none_match": etag})
+        self.assertContains(response, "Event 0")
+        response = await self.async_client.get(
+            url, headers={"if_none_match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_schedule_day_and_event_details(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(
+            reverse("select_events_day", args=["2024-09-23"])
+        )
+        self.assertContains(response, "Event 0")
+
+        response = await self.async_client.get(
+            reverse("event_details", args=["event-0"])
+        )
+        self.assertContains(response, "P0")
+        response = await self.async_client.get(
+            reverse("event_details", args=["missing"])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class PresenterNamesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_events(2)
+        cls.ada = Presenter.objects.create(id="ada", name="Ada")
+
+    def names(self, event_id: str) -> tuple[str, list[str]]:
+        event = Event.objects.get(id=event_id)
+        return event.presenter_names, event.presenter_slugs
+
+    def test_changes_from_the_event(self):
+        event = Event.objects.get(id="event-0")
+
+        event.presenters.add(self.ada)
+        self.assertEqual(self.names("event-0"), ("P0, Ada", ["ada", "presenter-0"]))
+        event.presenters.remove(self.ada)
+        self.assertEqual(self.names("event-0"), ("P0", ["presenter-0"]))
+        event.presenters.clear()
+        self.assertEqual(self.names("event-0"), ("", []))
+
+    def test_changes_from_the_presenter(self):
+        self.ada.event_set.add("event-0", "event-1")
+        self.assertEqual(self.names("event-1")[0], "P1, Ada")
+
+        self.ada.name = "Ada Lovelace"
+        self.ada.save()
+        self.assertEqual(self.names("event-0")[0], "P0, Ada Lovelace")
+
+        self.ada.event_set.clear()
+        self.assertEqual(self.names("event-0")[0], "P0")
+
+        Presenter.objects.filter(id="presenter-1").delete()
+        self.assertEqual(self.names("event-1"), ("", []))
+
+    def test_reads_skip_the_join_table(self):
+        clear_schedule_cache()
+        user = get_user_model().objects.create_user("attendee")
+        set_selections(user, {"event-0": True})
+        token = get_feed_token(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            get_snapshot()
+            response = self.client.get(
+                reverse("selected_events_feed"), {"token": token}
+            )
+            content = async_to_sync(read_streaming_content)(response)
+
+        self.assertIn("Presenters: P0", content)
+        self.assertFalse(any("main_event_presenters" in q["sql"] for q in queries))
+
+
+class LazyScheduleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        events = make_events(3)
+        Event.objects.filter(id="event-0").update(
+            description_html="<p>Rendered <em>description</em></p>"
+        )
+        Presenter.objects.filter(id="presenter-0").update(bio_html="<p>Bio of P0</p>")
+        SelectEvent.objects.create(user=cls.user, event=events[1], selected=True)
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.client.force_login(self.user)
+
+    def test_only_the_first_day_is_sent(self):
+        response = self.client.get(reverse("select_events"))
+
+        self.assertContains(response, "Event 0")
+        self.assertNotContains(response, "Event 1<")
+        self.assertContains(response, 'class="schedule-day-placeholder"', count=2)
+        self.assertContains(response, 'data-day="2024-09-24"')
+        self.assertContains(
+            response,
+            f'data-fallback-url="{reverse("select_events_day", args=["2024-09-24"])}"',
+        )
+
+    def test_day(self):
+        url = reverse("select_events_day", args=["2024-09-24"])
+
+        response = self.client.get(url)
+
+        self.assertContains(response, "Tuesday (09/24)")
+        self.assertContains(response, 'id="eventevent-1" checked')
+        self.assertNotContains(response, "Event 0")
+        self.assertEqual(
+            self.client.get(
+                reverse("select_events_day", args=["2024-09-30"])
+            ).status_code,
+            404,
+        )
+        self.assertEqual(
+            self.client.get(reverse("select_events_day", args=["monday"])).status_code,
+            404,
+        )
+
+    def test_descriptions_are_loaded_when_opened(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("select_events"))
+        self.assertFalse(any("description" in q["sql"] for q in queries))
+        self.assertFalse(any("bio" in q["sql"] for q in queries))
+
+        response = self.client.get(reverse("event_details", args=["event-0"]))
+
+        self.assertContains(response, "<p>Rendered <em>description</em></p>", html=True)
+        self.assertContains(response, "<h5>P0</h5>", html=True)
+        self.assertContains(response, "<p>Bio of P0</p>", html=True)
+        self.assertEqual(
+            self.client.get(reverse("event_details", args=["missing"])).status_code, 404
+        )
+
+
+class ScheduleJsonTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        events = make_events(3)
+        events[1].presenters.add("presenter-0")
+        SelectEvent.objects.create(user=cls.user, event=events[2], selected=True)
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.client.force_login(self.user)
+
+    def schedule_url(self) -> str:
+        response = self.client.get(reverse("current_schedule_json"))
+        self.assertEqual(response.status_code, 302)
+        return response["Location"]
+
+    def test_schedule(self):
+        response = self.client.get(self.schedule_url())
+
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        data = response.json()
+        self.assertEqual(data["fields"], api.EVENT_FIELDS)
+        self.assertEqual(data["rooms"], ["Room 1"])
+        self.assertEqual(data["presenters"], ["P0", "P1", "P2"])
+        self.assertEqual(
+            data["events"][1],
+            [
+                "event-1",
+                "Event 1",
+                int(datetime(2024, 9, 24, 13, tzinfo=UTC).timestamp()),
+                int(datetime(2024, 9, 24, 13, 25, tzinfo=UTC).timestamp()),
+                0,
+                [1, 0],
+            ],
+        )
+
+    def test_schedule_is_gzipped_and_cached(self):
+        url = self.schedule_url()
+        plain = self.client.get(url).content
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, headers={"accept_encoding": "gzip, br"})
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), plain)
+
+    def test_outdated_version_redirects(self):
+        old_url = self.schedule_url()
+        bump_schedule_version()
+
+        response = self.client.get(old_url)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertNotEqual(response["Location"], old_url)
+        self.assertEqual(response["Location"], self.schedule_url())
+
+    def test_selections(self):
+        url = reverse("selections_json")
+        response = self.client.get(url)
+
+        self.assertEqual(response.json(), {"version": 0, "selected": ["event-2"]})
+        response = self.client.get(url, headers={"if_none_match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        toggle_selection(self.user, "event-0")
+        response = self.client.get(url, headers={"if_none_match": response["ETag"]})
+        self.assertEqual(response.json()["selected"], ["event-0", "event-2"])
+
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_select_events_links_the_current_schedule(self):
+        response = self.client.get(reverse("select_events"))
+
+        self.assertContains(response, f'data-schedule-url="{self.schedule_url()}"')
+        self.assertContains(
+            response, f'data-selections-url="{reverse("selections_json")}"'
+        )
+
+
+class DayFragmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_events(6)
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.version = get_schedule_version()
+        self.day = date(2024, 9, 23)
+
+    def test_checked_boxes_are_filled_in_per_user(self):
+        with mock.patch(
+            "main.fragments.render_to_string", wraps=fragments.render_to_string
+        ) as render:
+            first = fragments.render_day(self.day, self.version, {"event-0"})
+            second = fragments.render_day(self.day, self.version, {"event-3"})
+
+        self.assertEqual(render.call_count, 1)
+        self.assertIn('id="eventevent-0" checked>', first)
+        self.assertIn('id="eventevent-3" >', first)
+        self.assertIn('id="eventevent-0" >', second)
+        self.assertIn('id="eventevent-3" checked>', second)
+        self.assertNotIn(fragments.CHECKED_MARKER, first)
+
+    def test_fragments_are_kept_per_timezone(self):
+        with timezone.override(ZoneInfo("America/New_York")):
+            new_york = fragments.render_day(self.day, self.version, set())
+        with timezone.override(ZoneInfo("Asia/Tokyo")):
+            tokyo = fragments.render_day(self.day, self.version, set())
+
+        self.assertIn("09:00 AM - 09:25 AM", new_york)
+        self.assertIn("10:00 PM - 10:25 PM", tokyo)
+
+    @override_settings(SCHEDULE_FRAGMENT_CACHE_SIZE=2)
+    def test_least_recently_used_fragments_are_dropped(self):
+        for tz in ("UTC", "Asia/Tokyo", "UTC", "Europe/Paris"):
+            with timezone.override(ZoneInfo(tz)):
+                fragments.render_day(self.day, self.version, set())
+
+        cached_zones = [key[3] for key in fragments._fragments.entries]
+        self.assertEqual(cached_zones, ["UTC", "Europe/Paris"])
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+
+    def setUp(self):
+        clear_schedule_cache()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.talks = Path(tmp.name) / "talks"
+        self.presenters = Path(tmp.name) / "presenters"
+        self.talks.mkdir()
+        self.presenters.mkdir()
+
+        write_file(self.presenters, "ada.md", presenter("Ada Lovelace"))
+        write_file(self.presenters, "grace.md", presenter("Grace Hopper"))
+        write_file(self.talks, "async.md", talk("Async Django", ["ada"]))
+        write_file(self.talks, "orm.md", talk("Faster ORM queries", ["grace"], 24))
+        write_file(self.talks, "django.md", talk("Django for everyone", ["grace"]))
+        ingest_schedule(str(self.presenters), str(self.talks), workers=1)
+        self.client.force_login(self.user)
+
+    def test_searches_titles_presenters_descriptions_and_bios(self):
+        for query, expected in (
+            ("django", ["async", "django"]),
+            ("grace", ["django", "orm"]),
+            ("hopper quer", ["orm"]),
+            ("about faster", ["orm"]),
+            ("bio of lovelace", ["async"]),
+            ("room", ["async", "django", "orm"]),
+            ('"; DROP TABLE main_event; --', []),
+            ("", []),
+        ):
+            with self.subTest(query=query):
+                event_ids, has_more = search_event_ids(query)
+                self.assertEqual(sorted(event_ids), expected)
+                self.assertFalse(has_more)
+
+    def test_title_matches_rank_first(self):
+        write_file(self.presenters, "ada.md", presenter("Ada Everyone"))
+        ingest_schedule(str(self.presenters), str(self.talks), workers=1)
+
+        self.assertEqual(search_event_ids("everyone")[0], ["django", "async"])
+
+    def test_index_follows_ingest(self):
+        write_file(self.talks, "orm.md", talk("Slower ORM queries", ["ada"], 24))
+        (self.talks / "async.md").unlink()
+        ingest_schedule(str(self.presenters), str(self.talks), workers=1)
+
+        self.assertEqual(search_event_ids("slower lovelace")[0], ["orm"])
+        self.assertEqual(search_event_ids("faster")[0], [])
+        self.assertEqual(search_event_ids("async")[0], [])
+
+    @override_settings(SEARCH_PAGE_SIZE=2, SEARCH_MAX_MATCHES=3)
+    def test_pages_are_bounded(self):
+        first, has_more = search_event_ids("room")
+        self.assertEqual(len(first), 2)
+        self.assertTrue(has_more)
+
+        second, has_more = search_event_ids("room", page=2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse(has_more)
+        self.assertEqual(sorted(first + second), ["async", "django", "orm"])
+
+        self.assertEqual(search_event_ids("room", page=3), ([], False))
+
+    @override_settings(SEARCH_PAGE_SIZE=2, SEARCH_MAX_MATCHES=3)
+    def test_postgres_ranks_a_fixed_set_of_matches(self):
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.fetchall.return_value = [("orm",)]
+        with (
+            mock.patch.object(connection, "vendor", "postgresql"),
+            mock.patch.object(connection, "cursor", return_value=cursor),
+        ):
+            self.assertEqual(search_event_ids("Faster ORM", page=2), (["orm"], False))
+
+        sql, params = cursor.__enter__.return_value.execute.call_args.args
+        # The matches that are ranked are the same every time
+        self.assertIn(
+            "ORDER BY id LIMIT %s ) AS matches ORDER BY ts_rank(", " ".join(sql.split())
+        )
+        query = "faster & orm:*"
+        self.assertEqual(params, [settings.CONFERENCE_SLUG, query, 3, query, 1, 2])
+
+    @override_settings(SEARCH_PAGE_SIZE=1)
+    def test_view_renders_pages_of_results(self):
+        toggle_selection(self.user, "orm")
+
+        response = self.client.get(reverse("search"), {"q": "grace"})
+        self.assertContains(response, "<table", count=1)
+        self.assertContains(response, "Grace Hopper")
+        self.assertContains(response, 'hx-swap="none"')
+        self.assertContains(response, "/search?q=grace&page=2")
+
+        response = self.client.get(reverse("search"), {"q": "grace", "page": 2})
+        self.assertNotContains(response, "<table")
+        self.assertContains(
+            response, 'id="search-eventorm"\n                   checked'
+        )
+        self.assertNotContains(response, "More results")
+
+        response = self.client.get(reverse("search"), {"q": "nothing"})
+        self.assertContains(response, "No events match")
+        self.assertEqual(self.client.get(reverse("search"), {"q": " "}).content, b"")
+
+    def test_select_page_has_live_search(self):
+        response = self.client.get(reverse("select_events"))
+
+        self.assertContains(response, 'hx-trigger="keyup changed delay:300ms, search"')
+
+
+class SelectEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        make_events(3)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def selection_statements(self, queries: CaptureQueriesContext) -> int:
+        return sum(
+            "main_selectevent" in q["sql"] and not q["sql"].startswith("SELECT")
+            for q in queries
+        )
+
+    def test_toggle_is_a_single_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(toggle_selection(self.user, "event-0"))
+        self.assertEqual(self.selection_statements(queries), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(toggle_selection(self.user, "event-0"))
+        self.assertEqual(self.selection_statements(queries), 1)
+
+        self.assertIsNone(toggle_selection(self.user, "missing"))
+        self.assertEqual(SelectEvent.objects.count(), 1)
+        self.assertEqual(get_selection_version(self.user)[0], 2)
+
+    def test_select_event_view(self):
+        url = reverse("select_event", args=["event-1"])
+
+        self.assertContains(self.client.post(url), 'id="eventevent-1" checked>')
+        self.assertNotContains(self.client.post(url), "checked")
+        missing = self.client.post(reverse("select_event", args=["missing"]))
+        self.assertEqual(missing.status_code, 404)
+
+    def test_set_selections(self):
+        toggle_selection(self.user, "event-0")
+
+        with CaptureQueriesContext(connection) as queries:
+            states = set_selections(
+                self.user, {"event-0": False, "event-1": True, "missing": True}
+            )
+
+        self.assertEqual(self.selection_statements(queries), 1)
+        self.assertEqual(states, {"event-0": False, "event-1": True})
+        self.assertEqual(get_selected_ids(self.user), {"event-1"})
+        self.assertEqual(
+            set_selections(self.user, {"event-1": False}), {"event-1": False}
+        )
+
+    def test_changes_lock_rows_in_the_same_order(self):
+        # New selections can't be locked, so the version row is locked before them
+        for change in (
+            lambda: set_selections(self.user, {"event-0": True}),
+            lambda: toggle_selection(self.user, "event-1"),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                change()
+            statements = [q["sql"] for q in queries if "main_" in q["sql"]]
+            self.assertIn("main_selectionversion", statements[0])
+            self.assertEqual(
+                sum("main_selectionversion" in sql for sql in statements), 1
+            )
+        self.assertEqual(get_selection_version(self.user)[0], 2)
+
+        # Attendance rows are written in event ID order
+        with CaptureQueriesContext(connection) as queries:
+            change_attendance({"event-2": 1, "event-0": 1})
+        sql = queries[0]["sql"]
+        self.assertLess(sql.index("event-0"), sql.index("event-2"))
+
+    def test_batch_view(self):
+        url = reverse("select_events_batch")
+
+        response = self.client.post(
+            url, {"event-0": True, "event-2": True}, content_type="application/json"
+        )
+        self.assertEqual(
+            response.json(), {"events": {"event-0": True, "event-2": True}}
+        )
+
+        response = self.client.post(
+            url, {"select": ["event-1"], "unselect": ["event-0"]}
+        )
+        self.assertEqual(
+            response.json(), {"events": {"event-0": False, "event-1": True}}
+        )
+        self.assertEqual(get_selected_ids(self.user), {"event-1", "event-2"})
+
+        response = self.client.post(url, "[]", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_view_requires_booleans(self):
+        url = reverse("select_events_batch")
+
+        for selected in ("false", 0, None):
+            with self.subTest(selected=selected):
+                response = self.client.post(
+                    url, {"event-0": selected}, content_type="application/json"
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(SelectEvent.objects.exists())
+
+    @override_settings(SELECTION_BATCH_MAX=2)
+    def test_batch_view_limits_batch_size(self):
+        url = reverse("select_events_batch")
+        states = {f"event-{i}": True for i in range(3)}
+
+        response = self.client.post(url, states, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {"select": list(states)})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SelectEvent.objects.exists())
+
+        del states["event-2"]
+        response = self.client.post(url, states, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+
+def interval(event_id: str, start: int, end: int, room: str = "Room 1") -> dict:
+    """
+    Makes a snapshot style event lasting from start to end minutes into the conference.
+    """
+    return {
+        "id": event_id,
+        "location": room,
+        "start_time": CONFERENCE_START + timedelta(minutes=start),
+        "end_time": CONFERENCE_START + timedelta(minutes=end),
+    }
+
+
+class IntervalIndexTests(SimpleTestCase):
+    def test_stabbing_matches_brute_force(self):
+        rng = random.Random(9000)
+        events = []
+        for i in range(300):
+            start = rng.randrange(0, 3000)
+            events.append(interval(str(i), start, start + rng.randrange(1, 120)))
+        tree = build_tree(events)
+
+        for minute in range(-10, 3200, 7):
+            moment = CONFERENCE_START + timedelta(minutes=minute)
+            expected = {
+                e["id"] for e in events if e["start_time"] <= moment < e["end_time"]
+            }
+            self.assertEqual({e["id"] for e in stab(tree, moment)}, expected)
+
+    def test_find_conflicts(self):
+        events = [
+            interval("a", 0, 60),
+            interval("b", 30, 90),
+            interval("c", 60, 120),  # Starts when a ends
+            interval("d", 200, 230),
+        ]
+
+        pairs = {(a["id"], b["id"]) for a, b in find_conflicts(events)}
+
+        self.assertEqual(pairs, {("a", "b"), ("b", "c")})
+
+    def test_happening_and_next_by_room(self):
+        index = ScheduleIndex.build(
+            [
+                interval("a", 0, 60, "Room 1"),
+                interval("b", 0, 30, "Room 2"),
+                interval("c", 45, 90, "Room 2"),
+                interval("d", 60, 120, "Room 1"),
+            ]
+        )
+        moment = CONFERENCE_START + timedelta(minutes=20)
+
+        self.assertEqual([e["id"] for e in index.happening_at(moment)], ["a", "b"])
+        self.assertEqual(
+            {room: e["id"] for room, e in index.next_by_room(moment).items()},
+            {"Room 2": "c", "Room 1": "d"},
+        )
+        self.assertEqual([a["id"] for a, _ in index.conflicts({"a", "c", "x"})], ["a"])
+
+
+class ScheduleStatusViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        # Monday 9:00 and 9:30, and Tuesday and Wednesday 9:00, each lasting 25 minutes
+        make_events(4)
+        Event.objects.filter(id="event-3").update(
+            start_time=CONFERENCE_START + timedelta(minutes=10)
+        )
+        bump_schedule_version()
+        set_selections(cls.user, {"event-0": True, "event-3": True})
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.client.force_login(self.user)
+
+    def test_json(self):
+        at = (CONFERENCE_START + timedelta(minutes=12)).isoformat()
+
+        data = self.client.get(reverse("schedule_status"), {"at": at}).json()
+
+        self.assertEqual(data["conflicts"], [["event-0", "event-3"]])
+        self.assertEqual(
+            [e["id"] for e in data["happening_now"]], ["event-0", "event-3"]
+        )
+        self.assertEqual(data["up_next"]["Room 1"]["id"], "event-1")
+
+        response = self.client.get(reverse("schedule_status"), {"at": "soon"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_selected_events_page_shows_conflicts(self):
+        response = self.client.get(reverse("selected_events"))
+
+        self.assertContains(response, "Some of your events overlap")
+        self.assertContains(response, "Nothing right now.")
+
+
+class AttendanceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = get_user_model().objects.create_user("organizer", is_staff=True)
+        cls.attendees = [
+            get_user_model().objects.create_user(f"attendee-{i}") for i in range(3)
+        ]
+
+    def setUp(self):
+        clear_schedule_cache()
+        make_events(4)
+
+    def counts(self) -> dict[str, int]:
+        return dict(EventAttendance.objects.values_list("event_id", "attendees"))
+
+    def recounts(self) -> dict[str, int]:
+        return dict(
+            SelectEvent.objects.filter(selected=True)
+            .values_list("event_id")
+            .annotate(count=Count("pk"))
+        )
+
+    def test_selections_change_counts(self):
+        first, second, third = self.attendees
+        toggle_selection(first, "event-0")
+        toggle_selection(second, "event-0")
+        toggle_selection(second, "event-0")
+        set_selections(third, {"event-0": True, "event-1": True, "event-2": False})
+        set_selections(third, {"event-0": True, "event-1": False, "event-3": True})
+        set_selections(first, {"event-0": False, "event-2": False})
+
+        self.assertEqual(self.counts(), {"event-0": 1, "event-1": 0, "event-3": 1})
+        self.assertEqual(reconcile_attendance(), 0)
+
+    def test_count_rolls_back_with_selection(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            toggle_selection(self.attendees[0], "event-0")
+            self.assertEqual(self.counts(), {"event-0": 1})
+            raise RuntimeError
+
+        self.assertEqual(self.counts(), {})
+
+    def test_reconcile_corrects_drift(self):
+        for user in self.attendees:
+            set_selections(user, {"event-0": True, "event-1": True})
+        # Selections deleted with their user don't change the counts
+        self.attendees[0].delete()
+        EventAttendance.objects.create(event_id="event-2", attendees=5)
+
+        self.assertEqual(reconcile_attendance(batch_size=2), 3)
+        self.assertEqual(self.counts(), {"event-0": 2, "event-1": 2, "event-2": 0})
+        self.assertEqual(reconcile_attendance(), 0)
+
+        out = StringIO()
+        call_command("reconcile_attendance", stdout=out)
+        self.assertIn("Corrected the attendee counts of 0 events.", out.getvalue())
+
+    def test_admin_changes_counts(self):
+        for user in self.attendees:
+            set_selections(user, {"event-0": True, "event-1": True})
+        self.client.force_login(get_user_model().objects.create_superuser("superuser"))
+
+        self.client.post(
+            reverse("admin:main_event_changelist"),
+            {"action": "clear_selections", "_selected_action": ["event-0"]},
+        )
+        selection = SelectEvent.objects.get(user=self.attendees[0], event_id="event-1")
+        self.client.post(
+            reverse("admin:main_selectevent_change", args=[selection.pk]),
+            {
+                "user": selection.user_id,
+                "event": "event-2",
+                "selected": "on",
+            },
+        )
+        self.client.post(
+            reverse("admin:main_selectevent_changelist"),
+            {
+                "action": "delete_selected",
+                "_selected_action": [
+                    SelectEvent.objects.get(
+                        user=self.attendees[1], event_id="event-1"
+                    ).pk
+                ],
+                "post": "yes",
+            },
+        )
+
+        self.assertEqual(self.counts(), {"event-0": 0, "event-1": 1, "event-2": 1})
+        self.assertEqual(self.recounts(), {"event-1": 1, "event-2": 1})
+
+    def test_report(self):
+        for user in self.attendees:
+            set_selections(user, {"event-0": True, "event-3": True})
+        toggle_selection(self.attendees[0], "event-1")
+        # Event 1 shares event 0's time slot, in a room without a capacity
+        Event.objects.filter(id="event-1").update(
+            start_time=CONFERENCE_START, location="Room 2"
+        )
+        Room.objects.create(conference=get_conference(), name="Room 1", capacity=2)
+
+        with timezone.override(ZoneInfo("America/New_York")), self.assertNumQueries(2):
+            report = get_attendance_report(top=2)
+
+        self.assertEqual(
+            [(e["id"], e["attendees"]) for e in report["top_events"]],
+            [("event-0", 3), ("event-3", 3)],
+        )
+        self.assertEqual(
+            [(e["id"], e["overflow"]) for e in report["over_capacity"]],
+            [("event-0", 1), ("event-3", 1)],
+        )
+        self.assertEqual(
+            [
+                (slot["start_time"], slot["events"], slot["attendees"])
+                for slot in report["slots"]
+            ],
+            [
+                (CONFERENCE_START, 2, 4),
+                (CONFERENCE_START + timedelta(minutes=30), 1, 3),
+                (CONFERENCE_START + timedelta(days=2), 1, 0),
+            ],
+        )
+
+    def test_dashboard_is_for_staff(self):
+        self.client.force_login(self.attendees[0])
+        response = self.client.get(reverse("attendance"))
+        self.assertRedirects(
+            response, "/admin/login/?next=/attendance", fetch_redirect_response=False
+        )
+
+        toggle_selection(self.attendees[0], "event-0")
+        self.client.force_login(self.organizer)
+        response = self.client.get(reverse("attendance"))
+        self.assertContains(response, 'hx-trigger="every 30s"')
+        self.assertContains(response, "Every event fits its room.")
+
+        response = self.client.get(reverse("attendance"), HTTP_HX_REQUEST="true")
+        self.assertNotContains(response, "<nav")
+        self.assertContains(response, "<td>Event 0</td>")
+
+    def test_nav_links_the_dashboard_for_staff(self):
+        link = f'href="{reverse("attendance")}"'
+
+        self.client.force_login(self.attendees[0])
+        self.assertNotContains(self.client.get(reverse("select_events")), link)
+        self.client.force_login(self.organizer)
+        self.assertContains(self.client.get(reverse("select_events")), link)
+
+
+class SelectedEventsFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        make_events(3)
+        Event.objects.filter(id="event-1").update(
+            title="Commas, semicolons; and a very long title " * 3
+        )
+        bump_schedule_version()
+        set_selections(cls.user, {"event-0": True, "event-1": True})
+
+    def get_feed(self, **headers):
+        token = get_feed_token(self.user)
+        return self.client.get(
+            reverse("selected_events_feed"), {"token": token}, headers=headers
+        )
+
+    async def aget_feed(self):
+        token = get_feed_token(self.user)
+        return await self.async_client.get(
+            reverse("selected_events_feed"), {"token": token}
+        )
+
+    async def test_feed(self):
+        response = await self.aget_feed()
+        content = await read_streaming_content(response)
+
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertTrue(content.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(content.count("BEGIN:VEVENT"), 2)
+        self.assertIn("DTSTART:20240923T130000Z\r\n", content)
+        self.assertIn("SUMMARY:Commas\\, semicolons\\; and", content)
+        self.assertIn("DESCRIPTION:Presenters: P0\\n\\nDescription\r\n", content)
+        self.assertTrue(all(len(line) <= 75 for line in content.split("\r\n")))
+
+    async def test_feed_streams_under_asgi(self):
+        # Django warns when it has to buffer a streaming response's content
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            response = await self.aget_feed()
+            content = await read_streaming_content(response)
+
+        self.assertTrue(response.is_async)
+        self.assertTrue(content.endswith("END:VCALENDAR\r\n"))
+
+    def test_unchanged_feed_is_not_modified(self):
+        etag = self.get_feed()["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_feed(if_none_match=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any("main_event" in q["sql"] for q in queries))
+
+        toggle_selection(self.user, "event-2")
+        self.assertEqual(self.get_feed(if_none_match=etag).status_code, 200)
+
+    async def test_requires_login_or_valid_token(self):
+        url = reverse("selected_events_feed")
+
+        response = await self.async_client.get(url, {"token": "1:bad"})
+        self.assertEqual(response.status_code, 403)
+        await self.async_client.aforce_login(self.user)
+        self.assertEqual((await self.async_client.get(url)).status_code, 200)
+
+    def test_fold_line(self):
+        line = "DESCRIPTION:" + "é" * 100
+
+        folded = fold_line(line)
+
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded.split("\r\n")))
+        self.assertEqual(folded.replace("\r\n ", "").removesuffix("\r\n"), line)
+
+
+class IngestJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_user("admin")
+
+    def setUp(self):
+        clear_schedule_cache()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.talks = Path(tmp.name) / "talks"
+        self.presenters = Path(tmp.name) / "presenters"
+        self.talks.mkdir()
+        self.presenters.mkdir()
+
+        write_file(self.presenters, "ada.md", presenter("Ada"))
+        write_file(self.talks, "one.md", talk("One", ["ada", "nobody"]))
+
+    def test_only_one_job_runs_at_a_time(self):
+        job, created = claim_ingest_job()
+        other, other_created = claim_ingest_job()
+
+        self.assertTrue(created)
+        self.assertFalse(other_created)
+        self.assertEqual(other, job)
+
+        run_ingest_job(job, presenters_dir=str(self.presenters))
+        self.assertTrue(claim_ingest_job()[1])
+
+    def test_run_records_outcome(self):
+        job, _ = claim_ingest_job()
+
+        job = run_ingest_job(
+            job, presenters_dir=str(self.presenters), events_dir=str(self.talks)
+        )
+
+        self.assertEqual(job.status, IngestJob.DONE)
+        self.assertEqual(job.files_parsed, 2)
+        self.assertEqual(job.errors, ["Warning: one.md: Unknown presenter: nobody"])
+        self.assertIsNotNone(job.finished_at)
+
+    def test_timed_out_job_is_replaced(self):
+        job, _ = claim_ingest_job()
+        IngestJob.objects.filter(pk=job.pk).update(
+            started_at=job.started_at - timedelta(days=1)
+        )
+
+        _, created = claim_ingest_job()
+
+        self.assertTrue(created)
+        self.assertEqual(IngestJob.objects.get(pk=job.pk).status, IngestJob.FAILED)
+
+    def test_get_data_starts_job_and_polls_status(self):
+        self.client.force_login(self.admin)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.get(reverse("get_data"))
+        job = IngestJob.objects.get()
+        self.assertEqual(len(callbacks), 1)
+        self.assertContains(response, f'hx-get="/ingest_status/{job.pk}"')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.get(reverse("get_data"))
+        self.assertEqual(callbacks, [])
+        self.assertContains(response, "already being parsed")
+
+        run_ingest_job(
+            job, presenters_dir=str(self.presenters), events_dir=str(self.talks)
+        )
+        response = self.client.get(reverse("ingest_status", args=[job.pk]))
+        self.assertNotContains(response, "hx-trigger")
+        self.assertContains(response, "2 files parsed")
+
+    def test_ingest_only_runs_as_a_job(self):
+        # The old route parsed the data in the request, next to any running job
+        self.assertEqual(self.client.get("/parse_data").status_code, 404)
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "ingest_schedule",
+            presenters_dir=str(self.presenters),
+            talks_dir=str(self.talks),
+            stdout=out,
+            stderr=StringIO(),
+        )
+
+        self.assertIn("2 files parsed", out.getvalue())
+        self.assertTrue(Event.objects.filter(id="one").exists())
+
+
+class TimezoneTests(TestCase):
+    def test_registry(self):
+        registry = get_registry()
+
+        self.assertIs(get_registry(), registry)
+        self.assertEqual(registry.options[0], ("America/Los_Angeles", "US/Pacific"))
+        self.assertIn("Europe/Paris", registry.valid)
+        self.assertIn(
+            '<option value="America/Denver">US/Mountain</option>',
+            registry.options_html,
+        )
+
+    def test_zones_are_cached(self):
+        self.assertIs(get_zone("Europe/Paris"), get_zone("Europe/Paris"))
+        self.assertEqual(get_zone("Not/AZone"), ZoneInfo("UTC"))
+
+    def test_change_tz(self):
+        self.client.post(reverse("change_tz"), {"select-tz": "America/Chicago"})
+        self.assertEqual(self.client.session["django_timezone"], "America/Chicago")
+
+        self.client.post(reverse("change_tz"), {"select-tz": "Not/AZone"})
+        self.assertEqual(self.client.session["django_timezone"], "UTC")
+
+    def test_nav_shows_current_tz(self):
+        user = get_user_model().objects.create_user("attendee")
+        self.client.force_login(user)
+        self.client.post(reverse("change_tz"), {"select-tz": "America/Chicago"})
+
+        response = self.client.get(reverse("home"))
+
+        self.assertContains(
+            response, '<option value="America/Chicago" selected>US/Central</option>'
+        )
+        self.assertContains(
+            response, '<option value="Europe/Paris">Europe/Paris</option>'
+        )
+
+
+class UserPreferenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        make_events(3)
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.client.force_login(self.user)
+
+    def test_preferences_follow_the_user_to_other_devices(self):
+        self.client.post(reverse("change_tz"), {"select-tz": "America/Chicago"})
+        self.client.post(reverse("change_default_day"), {"default-day": "2024-09-24"})
+
+        preference = UserPreference.objects.get(user=self.user)
+        self.assertEqual(preference.time_zone, "America/Chicago")
+        self.assertEqual(preference.default_day, date(2024, 9, 24))
+
+        other_device = Client()
+        other_device.force_login(self.user)
+        self.assertEqual(other_device.session["django_timezone"], "America/Chicago")
+        self.assertEqual(other_device.session["default_day"], "2024-09-24")
+
+    def test_preferences_picked_before_logging_in_are_kept(self):
+        user = get_user_model().objects.create_user("newcomer")
+        client = Client()
+        client.post(reverse("change_tz"), {"select-tz": "Europe/Paris"})
+        client.force_login(user)
+
+        self.assertEqual(client.session["django_timezone"], "Europe/Paris")
+        self.assertEqual(
+            UserPreference.objects.get(user=user).time_zone, "Europe/Paris"
+        )
+
+    def test_unchanged_preferences_are_not_written(self):
+        self.client.post(reverse("change_tz"), {"select-tz": "America/Chicago"})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse("change_tz"), {"select-tz": "America/Chicago"})
+
+        writes = [q["sql"] for q in queries if not q["sql"].startswith("SELECT")]
+        self.assertEqual(writes, [])
+
+    def test_timezone_is_read_without_a_database_session_query(self):
+        self.client.post(reverse("change_tz"), {"select-tz": "America/Chicago"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("home"))
+
+        self.assertContains(response, '<option value="America/Chicago" selected>')
+        self.assertFalse(any("django_session" in q["sql"] for q in queries))
+
+    def test_default_day_is_shown_first(self):
+        self.client.post(reverse("change_default_day"), {"default-day": "2024-09-24"})
+
+        response = self.client.get(reverse("select_events"))
+
+        self.assertContains(response, 'value="2024-09-24" selected')
+        self.assertContains(response, reverse("select_events_day", args=["2024-09-23"]))
+        self.assertNotContains(
+            response, reverse("select_events_day", args=["2024-09-24"])
+        )
+
+        self.client.post(reverse("change_default_day"), {"default-day": ""})
+        self.assertIsNone(UserPreference.objects.get(user=self.user).default_day)
+
+
+class ParseFilesTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+
+    def test_parse_file(self):
+        write_file(self.directory, "one.md", talk("One", ["ada"]))
+
+        parsed = parse_file(str(self.directory / "one.md"))
+
+        self.assertTrue(parsed.ok)
+        self.assertEqual(parsed.attributes["title"], "One")
+        self.assertEqual(parsed.attributes["presenter_slugs"], ["ada"])
+        self.assertEqual(parsed.body, "About One")
+        self.assertEqual(parsed.errors, [])
+
+    def test_body_is_rendered_unless_unchanged(self):
+        write_file(
+            self.directory,
+            "one.md",
+            "---\ntitle: One\n---\nAbout **One** <script>alert(1)</script>\n",
+        )
+        path = str(self.directory / "one.md")
+
+        parsed = parse_file(path)
+        unchanged = parse_file(path, rendered_hash=parsed.body_hash)
+
+        self.assertEqual(parsed.html, "<p>About <strong>One</strong> </p>")
+        self.assertEqual(unchanged.body_hash, parsed.body_hash)
+        self.assertIsNone(unchanged.html)
+
+    def test_errors_are_collected(self):
+        write_file(self.directory, "bad.md", "---\ntitle: [unclosed\n---\n")
+
+        bad = parse_file(str(self.directory / "bad.md"))
+        missing = parse_file(str(self.directory / "missing.md"))
+
+        self.assertFalse(bad.ok)
+        self.assertEqual(bad.errors[0].filename, "bad.md")
+        self.assertIn("Invalid front matter", bad.errors[0].message)
+        self.assertEqual(missing.errors, [IngestError("missing.md", "File not found.")])
+
+    def test_worker_processes_match_serial_parsing(self):
+        for i in range(8):
+            write_file(self.directory, f"{i}.md", talk(f"Talk {i}", []))
+        paths = sorted(str(path) for path in self.directory.iterdir())
+
+        self.assertEqual(parse_files(paths, workers=2), parse_files(paths))
+
+
+class SyntheticDataTests(TestCase):
+    def setUp(self):
+        clear_schedule_cache()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.talks, self.presenters = generate_conference(
+            tmp.name, talks=60, presenters=20, paragraphs_per_file=2
+        )
+
+    def test_generated_conference_ingests_cleanly(self):
+        errors = ingest_schedule(self.presenters, self.talks, workers=1)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Event.objects.count(), 60)
+        self.assertEqual(Presenter.objects.count(), 20)
+        self.assertIn("\n", Event.objects.first().description)
+        # Rooms are added so no two talks share a room and a time
+        self.assertEqual(
+            Event.objects.values("location", "start_time").distinct().count(), 60
+        )
+
+    def test_generate_selections(self):
+        ingest_schedule(self.presenters, self.talks, workers=1)
+
+        self.assertEqual(generate_selections(users=5, selections_per_user=3), (5, 15))
+        self.assertEqual(generate_selections(users=5, selections_per_user=3), (0, 15))
+        self.assertEqual(SelectEvent.objects.count(), 15)
+        self.assertEqual(SelectionVersion.objects.count(), 5)
+
+    def test_benchmarks(self):
+        results = benchmark_ingest(self.talks, self.presenters, repeat=2, workers=1)
+        generate_selections(users=2, selections_per_user=3)
+        user = get_user_model().objects.order_by("username").first()
+        results.update(benchmark_requests(user, repeat=2))
+
+        self.assertEqual(results["parse_data (incremental)"]["runs"], 2)
+        self.assertEqual(results["get_context (events_exist)"]["queries"], 1)
+        self.assertIn("selected_events", results)
+
+
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("attendee")
+        make_events(3)
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.client.force_login(self.user)
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs("main.metrics", "INFO") as logs:
+            response = self.client.get(reverse("select_events"))
+
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+')
+        self.assertIn("total;dur=", timing)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "select_events")
+        self.assertEqual(line["status"], 200)
+        self.assertGreater(line["queries"], 0)
+        self.assertGreater(line["template_ms"], 0)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0)
+    async def test_slow_requests_log_their_slowest_query(self):
+        # Every query of the feed is made by the view, without a session
+        url = reverse("selected_events_feed")
+        with self.assertLogs("main.metrics", "WARNING") as logs:
+            response = await self.async_client.get(
+                url, {"token": get_feed_token(self.user)}
+            )
+            await read_streaming_content(response)
+
+        message = logs.records[0].getMessage()
+        self.assertIn(f"Slow request GET {url}", message)
+        self.assertIn("SELECT", message)
+        self.assertIn("main/views.py", message)
+
+    async def test_async_views_count_their_queries(self):
+        await self.async_client.aforce_login(self.user)
+        with self.assertLogs("main.metrics", "INFO") as logs:
+            await self.async_client.get(reverse("select_events"))
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["status"], 200)
+        self.assertGreater(line["queries"], 0)
+
+
+class UpstreamRepo:
+    """
+    Serves a fake conference repo like GitHub does: a tree listing with an ETag,
+    and the raw files. Records the paths requested.
+    """
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.requests: list[str] = []
+        repo = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                repo.requests.append(self.path)
+                if self.path.startswith("/api/"):
+                    body = json.dumps(repo.tree()).encode()
+                    etag = f'"{git_blob_hash(body)}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("ETag", etag)
+                else:
+                    path = self.path.removeprefix("/raw/org/repo/main/")
+                    if path not in repo.files:
+                        self.send_error(404)
+                        return
+                    body = repo.files[path]
+                    self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.upstream = Upstream(
+            repo="org/repo",
+            ref="main",
+            talks_path="talks",
+            presenters_path="presenters",
+            api_url=f"{base_url}/api",
+            raw_url=f"{base_url}/raw",
+        )
+
+    def tree(self) -> dict:
+        return {
+            "tree": [
+                {"path": path, "type": "blob", "sha": git_blob_hash(data)}
+                for path, data in sorted(self.files.items())
+            ],
+            "truncated": False,
+        }
+
+    def downloads(self) -> list[str]:
+        return [path for path in self.requests if path.startswith("/raw/")]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SyncScheduleTests(TestCase):
+    def setUp(self):
+        clear_schedule_cache()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.talks = Path(tmp.name) / "talks"
+        self.presenters = Path(tmp.name) / "presenters"
+
+        self.repo = UpstreamRepo()
+        self.addCleanup(self.repo.close)
+        self.repo.files = {
+            "presenters/ada.md": presenter("Ada").encode(),
+            "talks/one.md": talk("One", ["ada"]).encode(),
+            "talks/two.md": talk("Two", ["ada"]).encode(),
+            "README.md": b"Not schedule data",
+        }
+
+    def sync(self):
+        return sync_schedule(
+            str(self.talks), str(self.presenters), self.repo.upstream, concurrency=2
+        )
+
+    def test_only_changed_files_are_downloaded(self):
+        result = self.sync()
+        self.assertEqual(len(result.downloaded), 3)
+        self.assertEqual((self.talks / "one.md").read_text(), talk("One", ["ada"]))
+
+        self.repo.files["talks/two.md"] = talk("Two Updated", ["ada"]).encode()
+        self.repo.requests.clear()
+        result = self.sync()
+
+        self.assertEqual(result.downloaded, [str(self.talks / "two.md")])
+        self.assertEqual(self.repo.downloads(), ["/raw/org/repo/main/talks/two.md"])
+
+    def test_unchanged_tree_is_not_modified(self):
+        self.sync()
+        self.repo.requests.clear()
+
+        result = self.sync()
+
+        self.assertTrue(result.not_modified)
+        self.assertEqual(len(self.repo.requests), 1)
+        self.assertTrue(UpstreamSync.objects.get().etag)
+
+    def test_removed_files_are_deleted(self):
+        self.sync()
+        del self.repo.files["talks/two.md"]
+
+        result = self.sync()
+
+        self.assertEqual(result.removed, [str(self.talks / "two.md")])
+        self.assertFalse((self.talks / "two.md").exists())
+
+    def test_failed_downloads_are_retried(self):
+        self.sync()
+        self.repo.files["talks/two.md"] = talk("Two Updated", ["ada"]).encode()
+        self.repo.files["talks/three.md"] = talk("Three", ["ada"]).encode()
+        real_tree = self.repo.tree
+
+        def corrupt_tree():
+            data = real_tree()
+            # The last entry is talks/two.md
+            data["tree"][-1]["sha"] = git_blob_hash(b"Something else")
+            return data
+
+        self.repo.tree = corrupt_tree
+        result = self.sync()
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.downloaded, [str(self.talks / "three.md")])
+        self.assertEqual((self.talks / "two.md").read_text(), talk("Two", ["ada"]))
+
+        # The tree isn't skipped next time, so the failed file is downloaded again
+        self.repo.tree = real_tree
+        result = self.sync()
+        self.assertEqual(result.downloaded, [str(self.talks / "two.md")])
+
+    def call_command(self) -> tuple[str, str]:
+        with override_settings(
+            SCHEDULE_SYNC_REPO="org/repo",
+            SCHEDULE_SYNC_TALKS_PATH="talks",
+            SCHEDULE_SYNC_PRESENTERS_PATH="presenters",
+            SCHEDULE_SYNC_API_URL=self.repo.upstream.api_url,
+            SCHEDULE_SYNC_RAW_URL=self.repo.upstream.raw_url,
+        ):
+            out, err = StringIO(), StringIO()
+            call_command(
+                "sync_schedule",
+                f"--talks-dir={self.talks}",
+                f"--presenters-dir={self.presenters}",
+                stdout=out,
+                stderr=err,
+            )
+        return out.getvalue(), err.getvalue()
+
+    def test_command_ingests_changes(self):
+        out, _ = self.call_command()
+        self.assertIn("Downloaded 3 files", out)
+        self.assertEqual(Event.objects.count(), 2)
+
+        out, _ = self.call_command()
+        self.assertIn("not modified", out)
+        self.assertEqual(IngestJob.objects.count(), 1)
+
+    def test_command_ingests_changes_a_running_job_missed(self):
+        running = IngestJob.objects.create()
+
+        _, err = self.call_command()
+        self.assertIn(f"Ingest job {running.pk} is already running.", err)
+        self.assertEqual(Event.objects.count(), 0)
+
+        IngestJob.objects.filter(pk=running.pk).update(
+            status=IngestJob.DONE, finished_at=timezone.now()
+        )
+        out, _ = self.call_command()
+        self.assertIn("not modified", out)
+        self.assertEqual(Event.objects.count(), 2)
+
+        # Once the changes are ingested, unchanged runs don't ingest again
+        self.call_command()
+        self.assertEqual(IngestJob.objects.count(), 2)
+
+    def test_command_retries_failed_ingests(self):
+        with (
+            mock.patch("main.jobs.ingest_schedule", side_effect=OSError("Disk full")),
+            self.assertLogs("main.jobs", "ERROR"),
+        ):
+            _, err = self.call_command()
+        self.assertIn("failed", err)
+        self.assertEqual(Event.objects.count(), 0)
+
+        out, _ = self.call_command()
+        self.assertIn("not modified", out)
+        self.assertEqual(Event.objects.count(), 2)
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser("admin")
+        cls.attendees = [
+            get_user_model().objects.create_user(f"attendee-{i}") for i in range(3)
+        ]
+
+    def setUp(self):
+        clear_schedule_cache()
+        self.events = make_events(6)
+        Event.objects.filter(id="event-1").update(location="Room 2")
+        for user in self.attendees:
+            set_selections(user, {"event-0": True, "event-1": True, "event-2": False})
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, model: str) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f"admin:main_{model}_changelist"))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_dont_grow_with_rows(self):
+        counts = {
+            model: self.changelist_queries(model)
+            for model in ("event", "presenter", "selectevent")
+        }
+
+        make_events(20, start=6)
+        for user in self.attendees:
+            set_selections(user, {f"event-{i}": True for i in range(6, 26)})
+
+        for model, count in counts.items():
+            with self.subTest(model=model):
+                self.assertEqual(self.changelist_queries(model), count)
+
+    def test_event_changelist_counts_attendees(self):
+        response = self.client.get(reverse("admin:main_event_changelist"))
+
+        attendees = {
+            event.pk: event.attendee_count
+            for event in response.context["cl"].result_list
+        }
+        self.assertEqual(attendees["event-0"], 3)
+        self.assertEqual(attendees["event-1"], 3)
+        self.assertIsNone(attendees["event-2"])
+        self.assertContains(response, '<td class="field-attendees">0</td>')
+
+    def test_presenter_changelist_truncates_bios(self):
+        Presenter.objects.filter(id="presenter-0").update(bio="word " * 100)
+
+        response = self.client.get(reverse("admin:main_presenter_changelist"))
+
+        self.assertContains(response, "word word")
+        self.assertNotContains(response, "word " * 20)
+
+    def test_filters(self):
+        url = reverse("admin:main_selectevent_changelist")
+        for query, expected in (
+            ({"selected__exact": "1"}, 6),
+            ({"room": "Room 2"}, 3),
+            ({"day": "2024-09-24"}, 3),
+            ({"day": "2024-09-25"}, 3),
+            ({"day": "2024-09-26"}, 0),
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(url, query)
+                self.assertEqual(response.context["cl"].result_count, expected)
+
+        response = self.client.get(
+            reverse("admin:main_event_changelist"), {"day": "2024-09-23"}
+        )
+        self.assertEqual(
+            [event.pk for event in response.context["cl"].result_list],
+            ["event-0", "event-3"],
+        )
+
+    def test_clear_selections_of_events(self):
+        versions = dict(SelectionVersion.objects.values_list("user_id", "version"))
+
+        response = self.client.post(
+            reverse("admin:main_event_changelist"),
+            {"action": "clear_selections", "_selected_action": ["event-0"]},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            set(
+                SelectEvent.objects.filter(selected=True).values_list(
+                    "event_id", flat=True
+                )
+            ),
+            {"event-1"},
+        )
+        for user_id, version in SelectionVersion.objects.values_list(
+            "user_id", "version"
+        ):
+            self.assertEqual(version, versions[user_id] + 1)
+
+    def test_unselect_action(self):
+        selections = SelectEvent.objects.filter(user=self.attendees[0])
+
+        response = self.client.post(
+            reverse("admin:main_selectevent_changelist"),
+            {
+                "action": "unselect",
+                "_selected_action": list(selections.values_list("pk", flat=True)),
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(selections.filter(selected=True).exists())
+        self.assertEqual(SelectEvent.objects.filter(selected=True).count(), 4)
+        self.assertEqual(get_selection_version(self.attendees[0])[0], 2)
+        self.assertEqual(get_selection_version(self.attendees[1])[0], 1)
@@ -0,0 +1,67 @@
+import functools
+import zoneinfo
+from dataclasses import dataclass
+
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import SafeString
+
+# Common US timezones, shown at the top of the list with friendlier labels.
+COMMON_TZS = {
+    "America/Los_Angeles": "US/Pacific",
+    "America/Denver": "US/Mountain",
+    "America/Chicago": "US/Central",
+    "America/New_York": "US/Eastern",
+}
+
+
+@dataclass(frozen=True)
+class TimezoneRegistry:
+    """
+    The timezones users can pick from, computed once per process.
+    """
+
+    valid: frozenset[str]
+    options: tuple[tuple[str, str], ...]  # (Timezone, Label) in display order
+    labels: dict[str, str]
+    options_html: SafeString
+
+    def label(self, tz: str) -> str:
+        return self.labels.get(tz, tz)
+
+
+@functools.cache
+def get_registry() -> TimezoneRegistry:
+    """
+    Builds the timezone registry. Scanning the tzdata files is slow, so this only
+    happens once per process, when the app is loaded.
+    """
+    other_tzs = sorted(
+        tz for tz in zoneinfo.available_timezones() if tz not in COMMON_TZS
+    )
+    options = tuple(COMMON_TZS.items()) + tuple((tz, tz) for tz in other_tzs)
+
+    return TimezoneRegistry(
+        valid=frozenset(tz for tz, _ in options),
+        options=options,
+        labels=dict(options),
+        options_html=format_html_join("\n", '<option value="{}">{}</option>', options),
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def get_zone(tz: str) -> zoneinfo.ZoneInfo:
+    """
+    Gets the ZoneInfo for a timezone name, falling back to UTC for invalid names.
+    """
+    if tz not in get_registry().valid:
+        tz = "UTC"
+    return zoneinfo.ZoneInfo(tz)
+
+
+def current_tz_option(tz: str) -> SafeString:
+    """
+    Renders the selected option for the user's current timezone.
+    """
+    return format_html(
+        '<option value="{}" selected>{}</option>', tz, get_registry().label(tz)
+    )
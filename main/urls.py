@@ -5,9 +5,28 @@ from . import views
 urlpatterns = [
     path("", views.index, name="home"),
     path("get_data", views.get_data, name="get_data"),
-    path("parse_data", views.parse_data, name="parse_data"),
+    path("ingest_status/<int:job_id>", views.ingest_status, name="ingest_status"),
     path("change_tz", views.change_tz, name="change_tz"),
+    path("change_default_day", views.change_default_day, name="change_default_day"),
     path("select_events", views.select_events, name="select_events"),
     path("select_event/<event_id>", views.select_event, name="select_event"),
+    path("select_events/batch", views.select_events_batch, name="select_events_batch"),
+    path("select_events/day/<day>", views.select_events_day, name="select_events_day"),
+    path("search", views.search, name="search"),
+    path("event_details/<event_id>", views.event_details, name="event_details"),
     path("selected_events", views.selected_events, name="selected_events"),
+    path(
+        "selected_events.ics",
+        views.selected_events_feed,
+        name="selected_events_feed",
+    ),
+    path("schedule_status", views.schedule_status, name="schedule_status"),
+    path("attendance", views.attendance, name="attendance"),
+    path(
+        "api/schedule.json",
+        views.current_schedule_json,
+        name="current_schedule_json",
+    ),
+    path("api/schedule/<tag>.json", views.schedule_json, name="schedule_json"),
+    path("api/selections.json", views.selections_json, name="selections_json"),
 ]
@@ -1,317 +1,317 @@
-import os
-import zoneinfo
-from typing import Optional
-from zoneinfo import ZoneInfo
-
-import yaml
-from django.contrib.auth.decorators import login_required
+import functools
+import hashlib
+import json
+import re
+from collections.abc import Callable
+from datetime import date, datetime
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
 from django.core.handlers.wsgi import WSGIRequest
-from django.http import HttpResponse
+from django.db.models import Prefetch
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect, render
-from django.utils.timezone import activate, localtime
-from django.views.decorators.http import require_POST
-
-from .models import Event, Presenter, SelectEvent, TableUpdate
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import SimpleLazyObject
+from django.utils.timezone import (
+    activate,
+    get_current_timezone_name,
+    is_naive,
+    localdate,
+    make_aware,
+    now,
+)
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+
+from .api import get_schedule_json, schedule_tag
+from .attendance import get_attendance_report
+from .decorators import login_required, staff_member_required
+from .fragments import render_day
+from .ical import calendar
+from .intervals import get_schedule_status
+from .jobs import elapsed_seconds, files_parsed, start_ingest_job
+from .models import Event, IngestJob, Presenter, SelectEvent, TableUpdate
+from .preferences import get_default_day, set_preferences
+from .schedule import (
+    aget_schedule_version,
+    aget_selected_ids,
+    event_info,
+    get_initial_day,
+    get_schedule_days,
+    get_schedule_version,
+    get_selected_ids,
+    load_schedule,
+)
+from .search import search_events
+from .selections import (
+    aget_selection_version,
+    get_selection_version,
+    set_selections,
+    toggle_selection,
+)
+from .timezones import get_registry, get_zone
+
+
+def get_request_schedule_version(request: WSGIRequest) -> str:
+    """
+    Gets the schedule version, looking it up at most once per request.
+    """
+    if not hasattr(request, "schedule_version"):
+        request.schedule_version = get_schedule_version()
+    return request.schedule_version
 
 
-def get_valid_tzs(request: WSGIRequest) -> tuple[list[str], list[str]]:
+def get_page_state(request: WSGIRequest) -> tuple[str, int, Optional[datetime]]:
     """
-    Gets the valid timezones for the user to select from.
-    Puts common US timezones at the top of the list.
+    Gets what a user's schedule pages depend on, looking it up at most once per request.
 
-    :return: A tuple of valid timezones and common timezones.
+    :return: A tuple of the schedule version, the user's selection version
+        and when the user's selections last changed.
     """
-    common_tzs = [
-        "America/Los_Angeles",  # Pacific
-        "America/Denver",  # Mountain
-        "America/Chicago",  # Central
-        "America/New_York",  # Eastern
-    ]
-    other_valid_tzs = sorted(
-        [x for x in zoneinfo.available_timezones() if x not in common_tzs]
-    )
-    valid_tzs = common_tzs + other_valid_tzs
-
-    return valid_tzs, common_tzs
+    if not hasattr(request, "page_state"):
+        request.page_state = (
+            get_request_schedule_version(request),
+            *get_selection_version(request.user),
+        )
+    return request.page_state
 
 
-def get_context(request: WSGIRequest):
+async def aget_page_state(request: HttpRequest) -> tuple[str, int, Optional[datetime]]:
     """
-    Gets the context info needed to display various pages including:
-        - Whether events have been added to the database.
-        - A list of events from the database.
-        - A list of selected events from the database.
-        - A list of valid timezones.
+    Async version of get_page_state.
     """
-    events_exist = TableUpdate.objects.filter(table_name="EventsExist").exists()
-    events_data = Event.objects.all().order_by("start_time")
-    tzs, common_tzs = get_valid_tzs(request)
+    if not hasattr(request, "schedule_version"):
+        request.schedule_version = await aget_schedule_version()
+    if not hasattr(request, "page_state"):
+        request.page_state = (
+            request.schedule_version,
+            *await aget_selection_version(request.user),
+        )
+    return request.page_state
 
-    current_tz = request.session.get("django_timezone", "UTC")
 
-    all_events = {
-        "Monday": [],
-        "Tuesday": [],
-        "Wednesday": [],
-    }
+def with_page_state(view: Callable) -> Callable:
+    """
+    Loads the page state of an async view up front. condition() calls the ETag
+    and Last-Modified functions synchronously, which can't run queries from async code.
+    """
 
-    for event in events_data:
-        day = event.start_time.strftime("%A")
-        start_time = localtime(event.start_time)
-        end_time = localtime(event.end_time)
-        event_info = {
-            "id": event.id,
-            "title": event.title,
-            "description": event.description,
-            "day": day,
-            "start_time": start_time.strftime("%I:%M %p"),
-            "end_time": end_time.strftime("%I:%M %p"),
-            "location": event.location,
-            "presenters": event.presenter_names or "-",
-            "selected": (
-                "checked"
-                if SelectEvent.objects.filter(
-                    user=request.user, event=event, selected=True
-                ).exists()
-                else ""
-            ),
-        }
-        try:
-            all_events[day].append(event_info)
-        except IndexError:
-            print("Error: Day not found.")
-
-    all_selected_events_raw = SelectEvent.objects.filter(
-        user=request.user, selected=True
-    ).order_by("event__start_time")
-
-    all_selected_events = []
-    for event in all_selected_events_raw:
-        e = event.event
-        event_info = {
-            "id": e.id,
-            "title": e.title,
-            "description": e.description,
-            "day": e.start_time.strftime("%A"),
-            "start_time": localtime(e.start_time).strftime("%I:%M %p"),
-            "end_time": localtime(e.end_time).strftime("%I:%M %p"),
-            "location": e.location,
-            "presenters": e.presenter_names,
-        }
-        all_selected_events.append(event_info)
+    @functools.wraps(view)
+    async def wrapper(request: HttpRequest, *args, **kwargs):
+        await aget_page_state(request)
+        return await view(request, *args, **kwargs)
 
-    context = {
-        "all_events": all_events,
-        "all_selected_events": all_selected_events,
-        "events_exist": events_exist,
-        "tzs": tzs,
-        "common_tzs": common_tzs,
-        "current_tz": current_tz,
-    }
-    return context
+    return wrapper
 
 
-@login_required(login_url="/admin/login/?next=/get_data")
-def get_data(request: WSGIRequest) -> render:
+def with_schedule_version(view: Callable) -> Callable:
     """
-    Gets the latest data from talks folder saves the results.
-    If successful, also parses the data and fills the database.
+    Loads the schedule version of an async view up front, see with_page_state.
     """
-    errors = None
 
-    if errors:
-        message = errors
-        print(errors)
-    else:
-        errors = parse_data(request)
-        if errors:
-            message = errors
-        else:
-            message = "Latest schedule data downloaded and parsed successfully!"
-        TableUpdate.objects.update_or_create(table_name="EventsExist")
-
-    context = get_context(request)
-    context["message"] = message
+    @functools.wraps(view)
+    async def wrapper(request: HttpRequest, *args, **kwargs):
+        if not hasattr(request, "schedule_version"):
+            request.schedule_version = await aget_schedule_version()
+        return await view(request, *args, **kwargs)
 
-    return render(request, "index.html", context=context)
+    return wrapper
 
 
-def read_filenames(directory: str, extension: str = None) -> list[str]:
+def csrf_secret(request: WSGIRequest) -> str:
     """
-    Reads all filenames in a directory.
-
-    :param directory: Directory to read filenames from.
-    :param extension: Optional extension to filter by. Example: ".md"
-    :return: A list of filenames, if any.
+    Gets the CSRF secret the page's tokens are made from, creating it if the request
+    has none yet, so the page is rendered with the same one.
     """
-    if extension:
-        try:
-            return [f for f in os.listdir(directory) if f.endswith(extension)]
-        except FileNotFoundError:
-            return []
-
-    try:
-        return [f for f in os.listdir(directory)]
-    except FileNotFoundError:
-        return []
+    get_token(request)
+    return request.META["CSRF_COOKIE"]
 
 
-def parse_presenter_data(presenters_dir: str = "presenters") -> list:
+def page_etag(request: WSGIRequest, *extra: str) -> str:
     """
-    Parses the latest presenter data and adds to the database.
+    Gets an ETag for a user's schedule page, which changes when the schedule,
+    the user's selections or the user's timezone change.
+    Pages hold a CSRF token, so it also changes when the CSRF secret is rotated
+    at login, otherwise a cached page would send a token that's no longer valid.
 
-    :param presenters_dir: Directory where the presenter info is located.
-    :return: A list of errors if any occurred. Otherwise, an empty list.
-    TODO: Fix the issue with loading bio data for Jacob and Simon.
+    :param extra: Anything else the page depends on.
     """
-    errors = []
+    version, selection_version, _ = get_page_state(request)
+    state = "|".join(
+        [
+            request.path,
+            str(request.user.pk),
+            version,
+            str(selection_version),
+            get_current_timezone_name(),
+            csrf_secret(request),
+            *extra,
+        ]
+    )
+    return hashlib.sha256(state.encode()).hexdigest()
 
-    current_dir = os.path.abspath(presenters_dir)
-    files = read_filenames("presenters", ".md")
-    if not files:
-        return ["Error: No files found in the presenters directory."]
 
-    presenters = []
-    for file in files:
-        try:
-            presenter_id = file.split(".md")[0]
-        except ValueError:
-            presenter_id = "0"
+def select_events_etag(request: WSGIRequest) -> str:
+    # The day shown first depends on the date and the user's default day
+    return page_etag(request, localdate().isoformat(), str(get_default_day(request)))
 
-        filename = os.path.join(current_dir, file)
-        print(f"Parsing: {filename}")
 
-        try:
-            with open(filename, "r") as f:
-                data = yaml.safe_load_all(f)
-                attributes = next(data)
-                name = attributes.get("name", "ERROR")
-                try:
-                    bio = next(data)
-                except Exception as e:
-                    print(e)
-                    bio = "ERROR"
-        except FileNotFoundError:
-            errors.append(f"Error: File not found: {filename}")
-            continue
-        except yaml.YAMLError as e:
-            errors.append(f"Error: {e}")
-            continue
-
-        presenters.append(Presenter(id=presenter_id, name=name, bio=bio))
-
-    if presenters:
-        Presenter.objects.all().delete()
-        Presenter.objects.bulk_create(presenters)
-        TableUpdate.objects.update_or_create(table_name="PresentersExist")
-    else:
-        errors.append("Error: No presenter data found.")
+def select_events_day_etag(request: WSGIRequest, day: str) -> str:
+    return page_etag(request)
 
-    return errors
 
+def event_details_etag(request: WSGIRequest, event_id: str) -> str:
+    state = f"{request.path}|{get_request_schedule_version(request)}"
+    return hashlib.sha256(state.encode()).hexdigest()
+
+
+def selected_events_etag(request: WSGIRequest) -> str:
+    # What's happening now changes over time, even if nothing else does
+    return page_etag(request, now().strftime("%Y-%m-%dT%H:%M"))
 
-def parse_event_data(events_dir: str = "talks") -> list:
-    """
-    Parses the latest event data and adds to the database.
 
-    :param events_dir: Directory where the event info is located.
-    :return: A list of errors if any occurred. Otherwise, an empty list.
-    TODO: Fix parsing issues with descriptions with things like colons.
+def context_loaders(request: HttpRequest) -> dict[str, Callable[[], Any]]:
+    """
+    Gets the loaders of the context info pages can ask for:
+        - events_exist: Whether events have been added to the database.
+        - all_events: Events from the database, grouped by day.
+        - schedule_days: Days with events, in the user's timezone.
+        - default_day: The day the user picked to show first, if any.
+        - schedule_tag: Tag of the schedule version, for the schedule JSON URL.
+        - initial_day: The day whose events are shown first.
+        - initial_day_html: Events table of the initial day.
+        - all_selected_events: The user's selected events.
+        - conflicts: Pairs of the user's selected events that overlap.
+        - happening_now: Events happening right now.
+        - up_next: The next event in each room.
+    Loaders share what they look up, so each lookup runs at most once per request.
     """
-    errors = []
 
-    current_dir = os.path.abspath(events_dir)
-    files = read_filenames("talks", ".md")
-    if not files:
-        return ["Error: No files found in the talks directory."]
+    @functools.cache
+    def version():
+        return get_request_schedule_version(request)
+
+    @functools.cache
+    def selected_ids():
+        return get_selected_ids(request.user)
+
+    @functools.cache
+    def schedule():
+        return load_schedule(request.user, version(), selected_ids())
+
+    @functools.cache
+    def days():
+        return get_schedule_days(version())
+
+    @functools.cache
+    def initial_day():
+        return get_initial_day(days(), get_default_day(request))
+
+    @functools.cache
+    def status():
+        return get_schedule_status(selected_ids(), version())
+
+    def localized(events):
+        return [event_info(event, selected_ids()) for event in events]
+
+    return {
+        "events_exist": lambda: TableUpdate.objects.filter(
+            table_name="EventsExist"
+        ).exists(),
+        "all_events": lambda: schedule()[0],
+        "schedule_days": days,
+        "default_day": lambda: get_default_day(request),
+        "schedule_tag": lambda: schedule_tag(version()),
+        "initial_day": initial_day,
+        "initial_day_html": lambda: (
+            render_day(initial_day(), version(), selected_ids())
+            if initial_day()
+            else ""
+        ),
+        "all_selected_events": lambda: schedule()[1],
+        "conflicts": lambda: [localized(pair) for pair in status()["conflicts"]],
+        "happening_now": lambda: localized(status()["happening_now"]),
+        "up_next": lambda: localized(status()["up_next"].values()),
+    }
 
-    events = []
-    event_presenter_map = []
-    for file in files:
-        try:
-            event_id = file.split(".md")[0]
-        except ValueError:
-            event_id = "0"
 
-        filename = os.path.join(current_dir, file)
-        print(f"Parsing: {filename}")
+def get_context(request: WSGIRequest, *pieces: str) -> dict:
+    """
+    Gets the context info needed to display a page. Pages list the pieces they need,
+    see context_loaders. Each piece is only loaded when the template first uses it.
+    Timezone info is added to every page by the timezones context processor.
+    """
+    loaders = context_loaders(request)
+    return {piece: SimpleLazyObject(loaders[piece]) for piece in pieces}
 
-        try:
-            with open(filename, "r") as f:
-                data = yaml.safe_load_all(f)
-                attributes = next(data)
-                title = attributes.get("title", "ERROR")
-                start_time = attributes.get("start_datetime", "ERROR")
-                end_time = attributes.get("end_datetime", "ERROR")
-                location = attributes.get("room", "ERROR")
-                presenter_slugs = attributes.get("presenter_slugs", [])
-                try:
-                    description = next(data)
-                except Exception as e:
-                    print(e)
-                    description = "ERROR"
-
-        except FileNotFoundError:
-            errors.append(f"Error: File not found: {filename}")
-            continue
-        except yaml.YAMLError as e:
-            errors.append(f"Error: {e}")
-            continue
-
-        start_time = start_time.replace(tzinfo=ZoneInfo("America/New_York"))
-        end_time = end_time.replace(tzinfo=ZoneInfo("America/New_York"))
-
-        event = Event(
-            id=event_id,
-            title=title,
-            description=description,
-            start_time=start_time,
-            end_time=end_time,
-            location=location,
-        )
-        events.append(event)
-        event_presenter_map.append((event, presenter_slugs))
 
-    if events:
-        Event.objects.all().delete()
-        Event.objects.bulk_create(events)
+async def aget_context(request: HttpRequest, *pieces: str) -> dict:
+    """
+    Gets the context info needed to display a page from an async view.
+    Templates can't run queries from async code, so the pieces are loaded up front,
+    together in one worker thread.
+    """
+    loaders = context_loaders(request)
 
-        for event, presenter_slugs in event_presenter_map:
-            presenters = Presenter.objects.filter(
-                id__in=presenter_slugs
-            )  # Fetch all presenters at once
-            event.presenters.add(*presenters)  # Add multiple presenters to the event
+    def load():
+        return {piece: loaders[piece]() for piece in pieces}
 
-        TableUpdate.objects.update_or_create(table_name="EventsExist")
-    else:
-        errors.append("Error: No event data found.")
+    return await sync_to_async(load)()
 
-    return errors
 
+def get_ingest_status(job: IngestJob) -> dict:
+    """
+    Gets the context needed to display the status of an ingest job.
+    """
+    return {
+        "job": job,
+        "files_parsed": files_parsed(job),
+        "elapsed": elapsed_seconds(job),
+    }
 
-def parse_data(request: WSGIRequest) -> Optional[list[str]]:
+
+@login_required(login_url="/admin/login/?next=/get_data")
+def get_data(request: WSGIRequest) -> render:
     """
-    Parses the latest schedule data for all files in the talks directory.
+    Starts parsing the latest data from the talks and presenters folders in the background.
+    The page then polls the status of the job until it's finished.
+    Only one job runs at a time, later requests show the status of the running job.
     """
-    errors = []
+    job, started = start_ingest_job()
+    if started:
+        message = "Parsing the latest schedule data..."
+    else:
+        message = "The latest schedule data is already being parsed."
 
-    presenter_errors = parse_presenter_data()
-    if presenter_errors:
-        errors.extend(presenter_errors)
+    context = get_context(request, "events_exist")
+    context.update(get_ingest_status(job))
+    context["message"] = message
 
-    events_errors = parse_event_data()
-    if events_errors:
-        errors.extend(events_errors)
+    return render(request, "index.html", context=context)
 
-    # Note when event data was last updated
-    TableUpdate.objects.update_or_create(table_name="Event")
 
-    if errors:
-        print("Errors parsing schedule data:")
-        for error in errors:
-            print(f"\t{error}")
+@login_required(login_url="/admin/login/?next=/get_data")
+def ingest_status(request: WSGIRequest, job_id: int) -> render:
+    """
+    Loads the status of an ingest job. Polled by the page while the job is running.
+    """
+    job = get_object_or_404(IngestJob, pk=job_id)
 
-    return errors
+    return render(request, "ingest_status.html", context=get_ingest_status(job))
 
 
 def change_tz(request: WSGIRequest) -> redirect:
@@ -319,40 +319,139 @@ def change_tz(request: WSGIRequest) -> redirect:
     Changes the timezone for the user. Sets UTC as the default if an unsupported timezone is passed.
     Redirects to the homepage.
     """
-    valid_tzs, _ = get_valid_tzs(request)
-
     tz = request.POST.get("select-tz")
 
-    if tz and tz not in valid_tzs:
+    if tz and tz not in get_registry().valid:
         tz = "UTC"
-    request.session["django_timezone"] = tz
+    set_preferences(request, time_zone=tz or "")
 
     print(f"Timezone set to: {tz}")
-    activate(tz)
+    activate(get_zone(tz))
 
     return redirect("home")
 
 
 @login_required(login_url="/admin/login/?next=/select_events")
-def select_events(request: WSGIRequest):
+@require_POST
+def change_default_day(request: WSGIRequest) -> redirect:
+    """
+    Changes the day the select events page opens on. An empty or invalid day
+    goes back to opening on today during the conference, otherwise its first day.
+    Redirects to the select events page.
+    """
+    try:
+        day = date.fromisoformat(request.POST.get("default-day", ""))
+    except ValueError:
+        day = None
+    set_preferences(request, default_day=day)
+
+    return redirect("select_events")
+
+
+@login_required(login_url="/admin/login/?next=/select_events")
+@cache_control(private=True, no_cache=True)
+@with_page_state
+@condition(etag_func=select_events_etag)
+async def select_events(request: HttpRequest):
     """
     Loads the page where all events are shown that can then be added to favorites.
+    Only the events of the initial day are sent, other days load as they're scrolled to.
+    Unchanged pages get a 304 response before anything is rendered.
     """
-    context = get_context(request)
+    context = await aget_context(
+        request,
+        "schedule_days",
+        "default_day",
+        "schedule_tag",
+        "initial_day",
+        "initial_day_html",
+    )
     return render(request, "select_events.html", context=context)
 
 
-@require_POST
-def select_event(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
-    user_event, _ = SelectEvent.objects.get_or_create(user=request.user, event=event)
+@login_required(login_url="/admin/login/?next=/select_events")
+@cache_control(private=True, no_cache=True)
+@with_page_state
+@condition(etag_func=select_events_day_etag)
+async def select_events_day(request: HttpRequest, day: str):
+    """
+    Loads the events table of one day of the select events page.
+    """
+    try:
+        day = date.fromisoformat(day)
+    except ValueError:
+        raise Http404("Invalid day.")
+
+    version = request.schedule_version
+    if day not in await sync_to_async(get_schedule_days)(version):
+        raise Http404("No events on this day.")
 
-    # Toggle the selection status
-    user_event.selected = not user_event.selected
-    user_event.save()
+    selected_ids = await aget_selected_ids(request.user)
+    return HttpResponse(await sync_to_async(render_day)(day, version, selected_ids))
+
+
+@login_required(login_url="/admin/login/?next=/select_events")
+@cache_control(private=True, no_cache=True)
+async def search(request: HttpRequest):
+    """
+    Loads a page of search results for the live search of the select events page.
+    The first page is a table, later pages are rows added to it.
+    """
+    query = request.GET.get("q", "").strip()
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        raise Http404("Invalid page.")
+    if not query:
+        return HttpResponse()
+
+    events, has_more = await sync_to_async(search_events)(query, page)
+    selected_ids = await aget_selected_ids(request.user) if events else set()
+    context = {
+        "query": query,
+        "page": page,
+        "next_page": page + 1 if has_more else None,
+        "events": events,
+        "selected_ids": selected_ids,
+    }
+    return render(request, "search_results.html", context=context)
+
+
+@cache_control(max_age=0)
+@with_schedule_version
+@condition(etag_func=event_details_etag)
+async def event_details(request: HttpRequest, event_id: str):
+    """
+    Loads the rendered description of an event and the bios of its presenters,
+    which are left out of the events tables until they're opened.
+    """
+    events = Event.objects.only("id", "description_html").prefetch_related(
+        Prefetch(
+            "presenters",
+            queryset=Presenter.objects.only("id", "name", "bio_html"),
+        )
+    )
+    try:
+        event = await events.aget(id=event_id)
+    except Event.DoesNotExist:
+        raise Http404("Event not found.")
 
-    # Return a new checkbox based on the new selection status
-    checked_attribute = "checked" if user_event.selected else ""
+    return render(request, "event_details.html", {"event": event})
+
+
+@login_required(login_url="/admin/login/?next=/select_events")
+@require_POST
+async def select_event(request: HttpRequest, event_id: str) -> HttpResponse:
+    """
+    Toggles whether the user has selected an event.
+    Returns a new checkbox based on the new selection status.
+    The toggle runs in a worker thread, as the async ORM can't run transactions.
+    """
+    selected = await sync_to_async(toggle_selection)(request.user, event_id)
+    if selected is None:
+        raise Http404("Event not found.")
+
+    checked_attribute = "checked" if selected else ""
     html = f"""<input type="checkbox" hx-post="/select_event/{event_id}" hx-trigger="change"
                       hx-target="#event{event_id}" hx-swap="outerHTML"
                       id="event{event_id}" {checked_attribute}>"""
@@ -360,21 +459,273 @@ def select_event(request, event_id):
     return HttpResponse(html)
 
 
+@login_required(login_url="/admin/login/?next=/select_events")
+@require_POST
+async def select_events_batch(request: HttpRequest) -> JsonResponse:
+    """
+    Sets the selection status of many events at once.
+    Accepts either a JSON object of event ID -> selected,
+    or form data with "select" and "unselect" lists of event IDs.
+    At most SELECTION_BATCH_MAX events can be set at once.
+    Returns the new selection status of every event that exists.
+    """
+    if request.content_type == "application/json":
+        try:
+            states = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON."}, status=400)
+        if not isinstance(states, dict):
+            return JsonResponse({"error": "Expected an object."}, status=400)
+        if not all(isinstance(selected, bool) for selected in states.values()):
+            return JsonResponse({"error": "Expected true or false."}, status=400)
+    else:
+        states = {event_id: True for event_id in request.POST.getlist("select")}
+        states.update(
+            {event_id: False for event_id in request.POST.getlist("unselect")}
+        )
+
+    # Each event is a parameter of the statement, which databases limit
+    if len(states) > settings.SELECTION_BATCH_MAX:
+        return JsonResponse(
+            {"error": f"Expected at most {settings.SELECTION_BATCH_MAX} events."},
+            status=400,
+        )
+
+    selections = await sync_to_async(set_selections)(request.user, states)
+    return JsonResponse({"events": selections})
+
+
 @login_required(login_url="/admin/login/?next=/selected_events")
-def selected_events(request: WSGIRequest):
+@cache_control(private=True, no_cache=True)
+@with_page_state
+@condition(etag_func=selected_events_etag)
+async def selected_events(request: HttpRequest):
     """
     Loads the page where all selected events are shown.
+    Unchanged pages get a 304 response before anything is rendered.
     """
-    context = get_context(request)
+    context = await aget_context(
+        request, "all_selected_events", "conflicts", "happening_now", "up_next"
+    )
+    feed_url = f"{reverse('selected_events_feed')}?token={get_feed_token(request.user)}"
+    context["feed_url"] = request.build_absolute_uri(feed_url)
 
     return render(request, "selected_events.html", context=context)
 
 
+@staff_member_required
+@cache_control(private=True, no_cache=True)
+async def attendance(request: HttpRequest):
+    """
+    Shows organizers how many users plan to attend each event, which events have
+    outgrown their rooms and how many attendees each time slot has.
+    The page refreshes the report itself, which is sent alone to htmx requests.
+    """
+    context = await sync_to_async(get_attendance_report)()
+    if request.headers.get("HX-Request"):
+        return render(request, "attendance_report.html", context=context)
+    return render(request, "attendance.html", context=context)
+
+
+@login_required(login_url="/admin/login/?next=/selected_events")
+async def schedule_status(request: HttpRequest) -> JsonResponse:
+    """
+    Gets the user's conflicting events, what's happening now and what's next in each room.
+    An ISO 8601 "at" parameter checks another moment than now.
+    """
+    moment = None
+    if at := request.GET.get("at"):
+        try:
+            moment = parse_datetime(at)
+        except ValueError:
+            moment = None
+        if moment is None:
+            return JsonResponse({"error": "Invalid date and time."}, status=400)
+        if is_naive(moment):
+            moment = make_aware(moment)
+
+    moment = moment or now()
+    selected_ids = await aget_selected_ids(request.user)
+    status = await sync_to_async(get_schedule_status)(selected_ids, moment=moment)
+
+    def as_json(event):
+        return {
+            "id": event["id"],
+            "title": event["title"],
+            "location": event["location"],
+            "start_time": event["start_time"].isoformat(),
+            "end_time": event["end_time"].isoformat(),
+        }
+
+    return JsonResponse(
+        {
+            "at": moment.isoformat(),
+            "conflicts": [
+                [first["id"], second["id"]] for first, second in status["conflicts"]
+            ],
+            "happening_now": [as_json(event) for event in status["happening_now"]],
+            "up_next": {
+                room: as_json(event) for room, event in status["up_next"].items()
+            },
+        }
+    )
+
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+@with_schedule_version
+async def current_schedule_json(request: HttpRequest) -> HttpResponse:
+    """
+    Redirects to the schedule JSON of the current version.
+    """
+    response = redirect(
+        "schedule_json", tag=schedule_tag(request.schedule_version), permanent=False
+    )
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+@with_schedule_version
+async def schedule_json(request: HttpRequest, tag: str) -> HttpResponse:
+    """
+    Gets the shown conference's schedule as compact JSON, shared by all users,
+    for the browser to render and localize. Each version has its own URL,
+    so browsers and proxies can cache it for good. Outdated versions redirect
+    to the current one. Sent gzipped when the browser accepts it.
+    """
+    version = request.schedule_version
+    if tag != schedule_tag(version):
+        return await current_schedule_json(request)
+
+    data, gzipped = await sync_to_async(get_schedule_json)(version)
+    if ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")):
+        response = HttpResponse(gzipped, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(data, content_type="application/json")
+
+    patch_vary_headers(response, ["Accept-Encoding"])
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+@login_required(login_url="/admin/login/?next=/select_events")
+@cache_control(private=True, no_cache=True)
+@with_page_state
+@condition(etag_func=page_etag)
+async def selections_json(request: HttpRequest) -> JsonResponse:
+    """
+    Gets the IDs of the events the user has selected, to layer on the schedule JSON.
+    """
+    _, selection_version, _ = request.page_state
+    selected_ids = await aget_selected_ids(request.user)
+    return JsonResponse(
+        {"version": selection_version, "selected": sorted(selected_ids)}
+    )
+
+
+FEED_SIGNER = signing.Signer(salt="main.selected_events_feed")
+
+
+def get_feed_token(user) -> str:
+    """
+    Gets the token that lets calendar apps read a user's selected events feed.
+    """
+    return FEED_SIGNER.sign(str(user.pk))
+
+
+def get_feed_user(request: WSGIRequest):
+    """
+    Gets the user whose feed is requested, from the token or the logged-in user.
+    Calendar apps can't log in, so they pass the token instead.
+
+    :return: The user, or None if there's no valid token and no one is logged in.
+    """
+    if not hasattr(request, "feed_user"):
+        request.feed_user = None
+        if token := request.GET.get("token"):
+            try:
+                user_id = FEED_SIGNER.unsign(token)
+            except signing.BadSignature:
+                user_id = None
+            request.feed_user = get_user_model().objects.filter(pk=user_id).first()
+        elif request.user.is_authenticated:
+            request.feed_user = request.user
+
+    return request.feed_user
+
+
+def selected_events_feed_etag(request: WSGIRequest) -> Optional[str]:
+    """
+    Gets the ETag of a user's feed, which only changes when the schedule or the
+    user's selections change. Doesn't read the event tables, and is looked up at
+    most once per request.
+    """
+    if not hasattr(request, "feed_etag"):
+        request.feed_etag = None
+        if (user := get_feed_user(request)) is not None:
+            selection_version, _ = get_selection_version(user)
+            version = get_request_schedule_version(request)
+            state = f"{version}|{user.pk}|{selection_version}"
+            request.feed_etag = hashlib.sha256(state.encode()).hexdigest()
+    return request.feed_etag
+
+
+def with_feed_etag(view: Callable) -> Callable:
+    """
+    Loads the feed's user and ETag of an async view up front, see with_page_state.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request: HttpRequest, *args, **kwargs):
+        await sync_to_async(selected_events_feed_etag)(request)
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@with_feed_etag
+@condition(etag_func=selected_events_feed_etag)
+async def selected_events_feed(request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Streams the user's selected events as an iCalendar feed calendar apps can subscribe to.
+    Unchanged feeds get a 304 response based on the ETag.
+    The events are read a chunk at a time while the feed is sent, so an ASGI server
+    streams it instead of loading it all first.
+    """
+    user = get_feed_user(request)
+    if user is None:
+        return HttpResponseForbidden("Log in or pass a valid token.")
+
+    selections = (
+        SelectEvent.objects.filter(user=user, selected=True)
+        .select_related("event")
+        .defer("event__description_html", "event__description_hash")
+        .order_by("event__start_time")
+    )
+
+    async def events():
+        async for selection in selections.aiterator(chunk_size=200):
+            yield selection.event
+
+    version = request.schedule_version
+    stamp = datetime.fromisoformat(version) if version != "0" else now()
+
+    response = StreamingHttpResponse(
+        calendar(events(), "Selected Events", stamp, request.get_host().split(":")[0]),
+        content_type="text/calendar; charset=utf-8",
+    )
+    response["Content-Disposition"] = 'inline; filename="selected_events.ics"'
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
 @login_required(login_url="/admin/login/?next=/home")
-def index(request: WSGIRequest):
+async def index(request: HttpRequest):
     """
     Loads the home page.
     """
-    context = get_context(request)
+    context = await aget_context(request, "events_exist")
 
     return render(request, "index.html", context=context)
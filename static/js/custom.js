@@ -0,0 +1,160 @@
+// Renders the days of the select events page in the browser, from the schedule JSON
+// shared by all users and the IDs of the events the user selected.
+// Times are localized to the timezone picked in the nav, like the server does.
+// Days are rendered once they're scrolled into view. If the JSON can't be loaded,
+// the day's HTML is loaded from the server instead.
+(function () {
+    "use strict";
+
+    const schedule = document.getElementById("schedule");
+    if (!schedule) {
+        return;
+    }
+
+    const timeZone = schedule.dataset.timeZone || "UTC";
+    const dateKey = new Intl.DateTimeFormat("en-CA", {
+        timeZone, year: "numeric", month: "2-digit", day: "2-digit",
+    });
+    const timeOfDay = new Intl.DateTimeFormat("en-US", {
+        timeZone, hour: "2-digit", minute: "2-digit", hour12: true,
+    });
+    const weekday = new Intl.DateTimeFormat("en-US", {timeZone, weekday: "long"});
+
+    function escapeHtml(text) {
+        return String(text).replace(/[&<>"']/g, (c) => ({
+            "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;",
+        })[c]);
+    }
+
+    function fetchJson(url) {
+        return fetch(url, {credentials: "same-origin"}).then((response) => {
+            if (!response.ok) {
+                throw new Error(`${url}: ${response.status}`);
+            }
+            return response.json();
+        });
+    }
+
+    // Groups the events by day in the picked timezone, resolving rooms and presenters
+    function eventsByDay(data, selections) {
+        const selected = new Set(selections.selected);
+        const days = new Map();
+        for (const [id, title, start, end, room, presenters] of data.events) {
+            const startDate = new Date(start * 1000);
+            const day = dateKey.format(startDate);
+            if (!days.has(day)) {
+                days.set(day, []);
+            }
+            days.get(day).push({
+                id,
+                title,
+                startDate,
+                startTime: timeOfDay.format(startDate),
+                endTime: timeOfDay.format(new Date(end * 1000)),
+                location: data.rooms[room],
+                presenters: presenters.map((p) => data.presenters[p]).join(", ") || "-",
+                selected: selected.has(id),
+            });
+        }
+        return days;
+    }
+
+    // Same markup as schedule_table.html
+    function renderDay(day, events) {
+        const eid = `events-${day}`;
+        const first = events[0].startDate;
+        const [, month, date] = day.split("-");
+        const caption = `${weekday.format(first)} (${month}/${date})`;
+
+        const rows = events.map((event) => {
+            const id = escapeHtml(event.id);
+            const url = encodeURIComponent(event.id);
+            return `
+            <tr>
+                <td>${event.startTime} - ${event.endTime}</td>
+                <td>
+                    <div class="accordion-item">
+                        <h4 class="accordion-header">
+                            <button class="accordion-button collapsed" type="button" data-bs-toggle="collapse"
+                                    aria-expanded="false"
+                                    data-bs-target="#e${id}" aria-controls="e${id}"
+                                    hx-get="/event_details/${url}" hx-trigger="click once"
+                                    hx-target="#e${id} .accordion-body">
+                                ${escapeHtml(event.title)}
+                            </button>
+                        </h4>
+                        <div id="e${id}" class="accordion-collapse collapse" data-bs-parent="#${eid}">
+                            <div class="accordion-body">
+                                Loading...
+                            </div>
+                        </div>
+                    </div>
+                </td>
+                <td>${escapeHtml(event.location)}</td>
+                <td>${escapeHtml(event.presenters)}</td>
+                <td>
+                    <label for="event${id}"></label>
+                    <input type="checkbox" hx-post="/select_event/${url}" hx-trigger="change"
+                           hx-target="#event${id}" hx-swap="outerHTML"
+                           id="event${id}" ${event.selected ? "checked" : ""}>
+                </td>
+            </tr>`;
+        });
+
+        return `
+        <div class="accordion" id="${eid}">
+            <table id="select-events" class="table table-striped schedule-table caption-top">
+                <caption>${caption}</caption>
+                <thead>
+                <tr>
+                    <th>Time</th>
+                    <th>Event</th>
+                    <th>Location</th>
+                    <th>Presenters</th>
+                    <th>Going?</th>
+                </tr>
+                </thead>
+                <tbody>${rows.join("")}</tbody>
+            </table>
+        </div>`;
+    }
+
+    function replace(placeholder, html) {
+        const template = document.createElement("template");
+        template.innerHTML = html.trim();
+        const element = template.content.firstElementChild;
+        placeholder.replaceWith(element);
+        htmx.process(element);
+    }
+
+    const days = Promise.all([
+        fetchJson(schedule.dataset.scheduleUrl),
+        fetchJson(schedule.dataset.selectionsUrl),
+    ]).then(([data, selections]) => eventsByDay(data, selections));
+
+    function show(placeholder) {
+        days.then((byDay) => {
+            const events = byDay.get(placeholder.dataset.day);
+            if (!events) {
+                throw new Error(`No events on ${placeholder.dataset.day}`);
+            }
+            replace(placeholder, renderDay(placeholder.dataset.day, events));
+        }).catch(() => {
+            htmx.ajax("GET", placeholder.dataset.fallbackUrl, {
+                target: placeholder, swap: "outerHTML",
+            });
+        });
+    }
+
+    const observer = new IntersectionObserver((entries) => {
+        for (const entry of entries) {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                show(entry.target);
+            }
+        }
+    });
+    for (const placeholder of schedule.querySelectorAll(".schedule-day-placeholder")) {
+        observer.observe(placeholder);
+    }
+})();